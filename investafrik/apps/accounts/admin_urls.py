@@ -6,4 +6,5 @@ from . import admin_views
 
 urlpatterns = [
     path('', admin_views.admin_dashboard, name='admin_dashboard'),
+    path('refresh/', admin_views.refresh_admin_dashboard, name='admin_dashboard_refresh'),
 ]
\ No newline at end of file
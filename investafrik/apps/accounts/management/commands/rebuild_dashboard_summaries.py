@@ -0,0 +1,13 @@
+"""
+Management command to recompute the dashboard summaries of every user.
+"""
+from django.core.management.base import BaseCommand
+from apps.accounts.summaries import rebuild_summaries
+
+
+class Command(BaseCommand):
+    help = 'Recompute the dashboard summaries (totals and counts by status) of every active user'
+
+    def handle(self, *args, **options):
+        count = rebuild_summaries()
+        self.stdout.write(self.style.SUCCESS(f'{count} summary(ies) rebuilt'))
@@ -0,0 +1,35 @@
+# Generated by Django 5.0.8 on 2026-10-18 11:52
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DashboardSummary',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='dashboard_summary', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('projects_count', models.PositiveIntegerField(default=0)),
+                ('project_status_counts', models.JSONField(default=dict)),
+                ('total_raised', models.DecimalField(decimal_places=2, default=0, max_digits=15)),
+                ('backers_count', models.PositiveIntegerField(default=0)),
+                ('investments_count', models.PositiveIntegerField(default=0)),
+                ('investment_status_counts', models.JSONField(default=dict)),
+                ('total_invested', models.DecimalField(decimal_places=2, default=0, max_digits=15)),
+                ('invested_projects_count', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Résumé du tableau de bord',
+                'verbose_name_plural': 'Résumés des tableaux de bord',
+                'db_table': 'accounts_dashboardsummary',
+            },
+        ),
+    ]
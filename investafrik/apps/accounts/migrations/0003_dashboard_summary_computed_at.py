@@ -0,0 +1,18 @@
+# Generated by Django 5.0.8 on 2026-10-18 12:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0002_dashboard_summaries'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='dashboardsummary',
+            name='computed_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
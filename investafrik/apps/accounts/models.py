@@ -179,4 +179,41 @@ class UserProfile(models.Model):
         verbose_name_plural = 'Profils utilisateurs'
     
     def __str__(self):
-        return f"Profil de {self.user.get_full_name()}"
\ No newline at end of file
+        return f"Profil de {self.user.get_full_name()}"
+
+class DashboardSummary(models.Model):
+    """Dashboard totals of a user, kept current by summaries.py."""
+    
+    user = models.OneToOneField(
+        User, on_delete=models.CASCADE, primary_key=True, related_name='dashboard_summary'
+    )
+    
+    # As a project owner
+    projects_count = models.PositiveIntegerField(default=0)
+    project_status_counts = models.JSONField(default=dict)
+    total_raised = models.DecimalField(max_digits=15, decimal_places=2, default=0)
+    backers_count = models.PositiveIntegerField(default=0)
+    
+    # As an investor
+    investments_count = models.PositiveIntegerField(default=0)
+    investment_status_counts = models.JSONField(default=dict)
+    total_invested = models.DecimalField(max_digits=15, decimal_places=2, default=0)
+    invested_projects_count = models.PositiveIntegerField(default=0)
+    
+    # Start of the computation stored in the row
+    computed_at = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        db_table = 'accounts_dashboardsummary'
+        verbose_name = 'Résumé du tableau de bord'
+        verbose_name_plural = 'Résumés des tableaux de bord'
+    
+    def __str__(self):
+        return f"Tableau de bord de {self.user.get_full_name()}"
+    
+    def projects_with_status(self, status):
+        return self.project_status_counts.get(status, 0)
+    
+    def investments_with_status(self, status):
+        return self.investment_status_counts.get(status, 0)
@@ -1,8 +1,12 @@
 """
 Signals for accounts app.
 """
-from django.db.models.signals import post_save
+from django.db.models.signals import post_save, pre_delete
 from django.dispatch import receiver
+from apps.investments.signals import payment_status_changed
+from apps.projects.models import Project
+from apps.projects.signals import project_status_changed
+from . import summaries
 from .models import User, UserProfile
 
 
@@ -17,4 +21,27 @@ def create_user_profile(sender, instance, created, **kwargs):
 def save_user_profile(sender, instance, **kwargs):
     """Save UserProfile when User is saved."""
     if hasattr(instance, 'profile'):
-        instance.profile.save()
\ No newline at end of file
+        instance.profile.save()
+
+@receiver(payment_status_changed)
+def refresh_payment_summaries(sender, investment, **kwargs):
+    """Recompute the dashboards of the investor and of the project owner."""
+    summaries.refresh_on_commit(user_ids=[investment.investor_id], project_ids=[investment.project_id])
+
+
+@receiver(project_status_changed)
+def refresh_project_summaries(sender, project_ids, **kwargs):
+    """Recompute the dashboards of the owners of projects changing status."""
+    summaries.refresh_on_commit(project_ids=project_ids)
+
+
+@receiver(pre_delete, sender=Project)
+def refresh_deleted_project_summary(sender, instance, **kwargs):
+    """
+    Recompute the dashboards of the owner and the investors of a deleted
+    project, whose investments are deleted with it.
+    """
+    from apps.investments.models import Investment
+
+    investor_ids = Investment.objects.filter(project=instance).values_list('investor_id', flat=True).distinct()
+    summaries.refresh_on_commit(user_ids=[instance.owner_id, *investor_ids])
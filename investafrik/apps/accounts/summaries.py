@@ -0,0 +1,151 @@
+"""
+Per-user dashboard summaries.
+
+Dashboards read their totals from one ``DashboardSummary`` row per user:
+projects and funds raised as a project owner, investments and amounts invested
+as an investor. Rows are recomputed by a task, a few grouped queries for any
+number of users, once a payment or project status change is committed (see
+signals.py), and can be rebuilt at any time with ``manage.py rebuild_dashboard_summaries``.
+
+Refreshes of the same user may run concurrently. Each row records when its
+computation started (``computed_at``) and is only overwritten by a computation
+that started later: that one has seen every change committed before it, while
+changes committed afterwards queue a refresh of their own.
+"""
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Count, Sum
+from django.utils import timezone
+
+SUMMARY_FIELDS = [
+    'projects_count', 'project_status_counts', 'total_raised', 'backers_count',
+    'investments_count', 'investment_status_counts', 'total_invested',
+    'invested_projects_count', 'computed_at', 'updated_at',
+]
+REBUILD_BATCH_SIZE = 500
+
+
+def refresh_summaries(user_ids):
+    """Recompute the summaries of ``user_ids``. Return the number of rows written."""
+    from apps.investments.models import Investment
+    from apps.projects.models import Project
+    from .models import DashboardSummary, User
+
+    user_ids = {User._meta.pk.to_python(user_id) for user_id in user_ids}
+    if not user_ids:
+        return 0
+    started = timezone.now()
+    summaries = {
+        user_id: DashboardSummary(
+            user_id=user_id, project_status_counts={}, investment_status_counts={}, computed_at=started
+        )
+        for user_id in user_ids
+    }
+
+    for row in (
+        Project.objects.filter(owner_id__in=user_ids)
+        .values('owner_id', 'status').annotate(count=Count('pk')).order_by()
+    ):
+        summary = summaries[row['owner_id']]
+        summary.project_status_counts[row['status']] = row['count']
+        summary.projects_count += row['count']
+
+    for row in (
+        Investment.objects.filter(project__owner_id__in=user_ids, payment_status='completed')
+        .values('project__owner_id')
+        .annotate(total=Sum('amount'), backers=Count('investor', distinct=True)).order_by()
+    ):
+        summary = summaries[row['project__owner_id']]
+        summary.total_raised = row['total'] or Decimal('0')
+        summary.backers_count = row['backers']
+
+    for row in (
+        Investment.objects.filter(investor_id__in=user_ids)
+        .values('investor_id', 'payment_status')
+        .annotate(count=Count('pk'), total=Sum('amount'), projects=Count('project', distinct=True))
+        .order_by()
+    ):
+        summary = summaries[row['investor_id']]
+        summary.investment_status_counts[row['payment_status']] = row['count']
+        summary.investments_count += row['count']
+        if row['payment_status'] == 'completed':
+            summary.total_invested = row['total'] or Decimal('0')
+            summary.invested_projects_count = row['projects']
+
+    return write_summaries(summaries.values(), started)
+
+
+def write_summaries(summaries, started):
+    """
+    Upsert ``summaries`` computed from ``started``, except over rows of a
+    computation that started later. Return the number of rows written.
+    """
+    from .models import DashboardSummary
+
+    summaries = {summary.user_id: summary for summary in summaries}
+    with transaction.atomic():
+        # Every row exists and is locked, in key order, before it is compared.
+        DashboardSummary.objects.bulk_create(
+            [DashboardSummary(user_id=user_id) for user_id in summaries], ignore_conflicts=True
+        )
+        stored = DashboardSummary.objects.select_for_update().filter(
+            user_id__in=summaries
+        ).order_by('pk').values_list('user_id', 'computed_at')
+        stale = [
+            summaries[user_id] for user_id, computed_at in stored
+            if computed_at is None or computed_at <= started
+        ]
+        DashboardSummary.objects.bulk_create(
+            stale,
+            update_conflicts=True,
+            unique_fields=['user'],
+            update_fields=SUMMARY_FIELDS,
+        )
+    return len(stale)
+
+
+def refresh_users(user_ids=(), project_ids=()):
+    """Recompute the summaries of ``user_ids`` and of the owners of ``project_ids``."""
+    from apps.projects.models import Project
+
+    owner_ids = set(user_ids)
+    if project_ids:
+        owner_ids.update(Project.objects.filter(pk__in=project_ids).values_list('owner_id', flat=True))
+    return refresh_summaries(owner_ids)
+
+
+def refresh_on_commit(user_ids=(), project_ids=()):
+    """Queue ``refresh_users`` once the current transaction commits."""
+    from .tasks import refresh_dashboard_summaries
+
+    user_ids = sorted({str(user_id) for user_id in user_ids if user_id is not None})
+    project_ids = sorted({str(project_id) for project_id in project_ids if project_id is not None})
+    if user_ids or project_ids:
+        transaction.on_commit(lambda: refresh_dashboard_summaries.delay(user_ids, project_ids))
+
+
+def get_summary(user):
+    """The dashboard summary of ``user``, computed on first use."""
+    from .models import DashboardSummary
+
+    summary = DashboardSummary.objects.filter(user=user).first()
+    if summary is None:
+        refresh_summaries([user.pk])
+        summary = DashboardSummary.objects.get(user=user)
+    return summary
+
+
+def rebuild_summaries(batch_size=REBUILD_BATCH_SIZE):
+    """Recompute the summaries of every active user. Return the number of rows written."""
+    from .models import User
+
+    user_ids = User.objects.filter(is_active=True).order_by('pk').values_list('pk', flat=True)
+    batch = []
+    written = 0
+    for user_id in user_ids.iterator(chunk_size=batch_size):
+        batch.append(user_id)
+        if len(batch) == batch_size:
+            written += refresh_summaries(batch)
+            batch = []
+    return written + refresh_summaries(batch)
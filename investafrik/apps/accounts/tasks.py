@@ -0,0 +1,13 @@
+"""
+Celery tasks for accounts app.
+"""
+from celery import shared_task
+from django.db import OperationalError
+
+from . import summaries
+
+
+@shared_task(autoretry_for=(OperationalError,), retry_backoff=True, max_retries=5)
+def refresh_dashboard_summaries(user_ids, project_ids=()):
+    """Recompute the dashboard summaries of users and of project owners."""
+    return summaries.refresh_users(user_ids, project_ids)
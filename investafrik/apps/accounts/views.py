@@ -126,36 +126,18 @@ class UserViewSet(viewsets.ReadOnlyModelViewSet):
     def dashboard_stats(self, request):
         """Get dashboard statistics for current user."""
         from apps.projects.models import Project
-        from apps.investments.models import Investment
-        from django.db.models import Sum, Count
+        from .summaries import get_summary
         
         user = request.user
         
         if user.user_type == 'porteur':
             # Statistiques pour porteur
-            user_projects = Project.objects.filter(owner=user)
-            
-            total_projects = user_projects.count()
-            active_projects = user_projects.filter(status='active').count()
-            
-            total_raised = Investment.objects.filter(
-                project__owner=user,
-                payment_status='completed'
-            ).aggregate(total=Sum('amount'))['total'] or 0
-            
-            total_investors = Investment.objects.filter(
-                project__owner=user,
-                payment_status='completed'
-            ).values('investor').distinct().count()
+            summary = get_summary(user)
             
             # Projets récents avec leurs statistiques
             recent_projects = []
+            user_projects = Project.objects.filter(owner=user).select_related('category')
             for project in user_projects.order_by('-created_at')[:5]:
-                project_raised = Investment.objects.filter(
-                    project=project,
-                    payment_status='completed'
-                ).aggregate(total=Sum('amount'))['total'] or 0
-                
                 recent_projects.append({
                     'id': project.id,
                     'slug': project.slug,
@@ -163,46 +145,37 @@ class UserViewSet(viewsets.ReadOnlyModelViewSet):
                     'short_description': project.short_description,
                     'status': project.status,
                     'goal_amount': float(project.goal_amount),
-                    'current_amount': float(project_raised),
+                    'current_amount': float(project.current_amount),
                     'category': {
                         'name': project.category.name,
                         'slug': project.category.slug
                     } if project.category else None,
                     'featured_image': project.featured_image.url if project.featured_image else None,
                     'created_at': project.created_at.isoformat(),
-                    'funding_percentage': (project_raised / project.goal_amount * 100) if project.goal_amount > 0 else 0
+                    'funding_percentage': (project.current_amount / project.goal_amount * 100) if project.goal_amount > 0 else 0
                 })
             
             return Response({
                 'user_type': 'porteur',
                 'stats': {
-                    'total_projects': total_projects,
-                    'active_projects': active_projects,
-                    'total_raised': float(total_raised),
-                    'total_investors': total_investors
+                    'total_projects': summary.projects_count,
+                    'active_projects': summary.projects_with_status('active'),
+                    'total_raised': float(summary.total_raised),
+                    'total_investors': summary.backers_count
                 },
                 'recent_projects': recent_projects
             })
             
         elif user.user_type == 'investisseur':
             # Statistiques pour investisseur
-            user_investments = Investment.objects.filter(
-                investor=user,
-                payment_status='completed'
-            )
-            
-            total_invested = user_investments.aggregate(
-                total=Sum('amount')
-            )['total'] or 0
-            
-            total_projects = user_investments.values('project').distinct().count()
+            summary = get_summary(user)
             
             return Response({
                 'user_type': 'investisseur',
                 'stats': {
-                    'total_invested': float(total_invested),
-                    'total_projects': total_projects,
-                    'total_investments': user_investments.count()
+                    'total_invested': float(summary.total_invested),
+                    'total_projects': summary.invested_projects_count,
+                    'total_investments': summary.investments_with_status('completed')
                 }
             })
         
@@ -352,35 +325,18 @@ class DashboardPorteurView(LoginRequiredMixin, TemplateView):
         
         # Récupérer les projets de l'utilisateur
         from apps.projects.models import Project
-        from apps.investments.models import Investment
-        from django.db.models import Sum, Count
-        
-        user_projects = Project.objects.filter(owner=self.request.user)
-        
-        # Statistiques
-        total_projects = user_projects.count()
-        active_projects = user_projects.filter(status='active').count()
+        from .summaries import get_summary
         
-        # Montant total levé
-        total_raised = Investment.objects.filter(
-            project__owner=self.request.user,
-            payment_status='completed'
-        ).aggregate(total=Sum('amount'))['total'] or 0
-        
-        # Nombre d'investisseurs uniques
-        total_investors = Investment.objects.filter(
-            project__owner=self.request.user,
-            payment_status='completed'
-        ).values('investor').distinct().count()
+        summary = get_summary(self.request.user)
         
         # Projets récents
-        recent_projects = user_projects.order_by('-created_at')[:5]
+        recent_projects = Project.objects.filter(owner=self.request.user).order_by('-created_at')[:5]
         
         context.update({
-            'total_projects': total_projects,
-            'active_projects': active_projects,
-            'total_raised': total_raised,
-            'total_investors': total_investors,
+            'total_projects': summary.projects_count,
+            'active_projects': summary.projects_with_status('active'),
+            'total_raised': summary.total_raised,
+            'total_investors': summary.backers_count,
             'recent_projects': recent_projects,
         })
         
@@ -402,23 +358,15 @@ class DashboardInvestisseurView(LoginRequiredMixin, TemplateView):
         # Récupérer les investissements de l'utilisateur
         from apps.investments.models import Investment
         from apps.projects.models import Project
-        from django.db.models import Sum, Count
-        
-        user_investments = Investment.objects.filter(
-            investor=self.request.user,
-            payment_status='completed'
-        )
-        
-        # Statistiques
-        total_invested = user_investments.aggregate(
-            total=Sum('amount')
-        )['total'] or 0
+        from .summaries import get_summary
         
-        total_projects = user_investments.values('project').distinct().count()
-        total_investments = user_investments.count()
+        summary = get_summary(self.request.user)
         
         # Investissements récents
-        recent_investments = user_investments.select_related('project').order_by('-invested_at')[:5]
+        recent_investments = Investment.objects.filter(
+            investor=self.request.user,
+            payment_status='completed'
+        ).select_related('project').order_by('-invested_at')[:5]
         
         # Projets disponibles pour investissement
         available_projects = Project.objects.filter(
@@ -428,9 +376,9 @@ class DashboardInvestisseurView(LoginRequiredMixin, TemplateView):
         ).order_by('-created_at')[:5]
         
         context.update({
-            'total_invested': total_invested,
-            'total_projects': total_projects,
-            'total_investments': total_investments,
+            'total_invested': summary.total_invested,
+            'total_projects': summary.invested_projects_count,
+            'total_investments': summary.investments_with_status('completed'),
             'recent_investments': recent_investments,
             'available_projects': available_projects,
         })
@@ -5,6 +5,21 @@ from django.db import models
 from django.utils.text import slugify
 
 
+class CategoryQuerySet(models.QuerySet):
+    """Custom queryset for categories."""
+    
+    def with_project_stats(self):
+        """Annotate active project counts and funded amounts in one grouped query."""
+        return self.annotate(
+            active_project_count=models.Count(
+                'projects', filter=models.Q(projects__status='active')
+            ),
+            funded_amount=models.Sum(
+                'projects__current_amount', filter=models.Q(projects__status='successful')
+            ),
+        )
+
+
 class Category(models.Model):
     """Project categories model."""
     
@@ -24,6 +39,8 @@ class Category(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    objects = CategoryQuerySet.as_manager()
+    
     class Meta:
         db_table = 'categories_category'
         verbose_name = 'Catégorie'
@@ -41,11 +58,15 @@ class Category(models.Model):
     @property
     def project_count(self):
         """Get the number of active projects in this category."""
+        if hasattr(self, 'active_project_count'):
+            return self.active_project_count
         return self.projects.filter(status='active').count()
     
     @property
     def total_funded_amount(self):
         """Get total amount funded in this category."""
+        if hasattr(self, 'funded_amount'):
+            return self.funded_amount or 0
         from django.db.models import Sum
         result = self.projects.filter(status='successful').aggregate(
             total=Sum('current_amount')
@@ -4,24 +4,36 @@ API views for categories app.
 from rest_framework import viewsets
 from rest_framework.decorators import action
 from rest_framework.response import Response
+from django.db.models import Count
 from django_filters.rest_framework import DjangoFilterBackend
+from apps.core.conditional import ConditionalGetMixin
 from .models import Category
 from .serializers import CategorySerializer
 
 
-class CategoryViewSet(viewsets.ReadOnlyModelViewSet):
+class CategoryViewSet(ConditionalGetMixin, viewsets.ReadOnlyModelViewSet):
     """ViewSet for categories."""
-    queryset = Category.objects.filter(is_active=True)
+    queryset = Category.objects.filter(is_active=True).with_project_stats()
     serializer_class = CategorySerializer
     filter_backends = [DjangoFilterBackend]
     filterset_fields = ['is_active']
     lookup_field = 'slug'
+    # Project stats are part of the payload.
+    conditional_fields = ('updated_at', 'projects__updated_at')
+    
+    def get_conditional_queryset(self):
+        return self.filter_queryset(Category.objects.filter(is_active=True))
+    
+    def get_fingerprint_aggregates(self):
+        aggregates = super().get_fingerprint_aggregates()
+        aggregates['project_count'] = Count('projects', distinct=True)
+        return aggregates
     
     @action(detail=True, methods=['get'])
     def projects(self, request, slug=None):
         """Get projects in this category."""
         category = self.get_object()
-        projects = category.projects.filter(status='active')
+        projects = category.projects.filter(status='active').for_list()
         
         # Import here to avoid circular imports
         from apps.projects.serializers import ProjectListSerializer
@@ -30,7 +42,7 @@ class CategoryViewSet(viewsets.ReadOnlyModelViewSet):
         return Response({
             'category': CategorySerializer(category).data,
             'projects': serializer.data,
-            'count': projects.count()
+            'count': len(serializer.data)
         })
     
     @action(detail=False, methods=['get'])
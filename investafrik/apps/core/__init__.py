@@ -0,0 +1 @@
+# Shared helpers (not an installed app)
\ No newline at end of file
@@ -0,0 +1,86 @@
+"""
+Conditional GET (ETag / Last-Modified) for DRF viewsets.
+
+Validators are computed with one aggregate query over the filtered queryset,
+before anything is serialized: ``MAX()`` of the ``conditional_fields`` and the
+row count. When the client already holds the current version, the view
+answers ``304 Not Modified`` and skips loading and serializing the objects.
+
+Only changes to the ``conditional_fields`` (and, for lists, rows appearing or
+disappearing) invalidate the validators. Denormalized values that are written
+without touching them (e.g. ``Project.views_count``) may be served stale to a
+revalidating client until the next tracked change.
+"""
+import hashlib
+
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
+
+
+class ConditionalGetMixin:
+    """
+    Add ``ETag`` (list and retrieve) and ``Last-Modified`` (retrieve)
+    validators to a viewset, and answer ``304`` to conditional requests.
+    """
+    conditional_fields = ('updated_at',)
+
+    def get_conditional_queryset(self):
+        """Queryset the validators are computed from (filters applied)."""
+        return self.filter_queryset(self.get_queryset())
+
+    def get_fingerprint_aggregates(self):
+        aggregates = {f'max_{field}': Max(field) for field in self.conditional_fields}
+        aggregates['count'] = Count('pk', distinct=True)
+        return aggregates
+
+    def get_fingerprint(self, queryset):
+        return queryset.order_by().aggregate(**self.get_fingerprint_aggregates())
+
+    def make_etag(self, request, *parts):
+        user = request.user.pk if request.user.is_authenticated else None
+        renderer = getattr(request, 'accepted_renderer', None)
+        source = repr((
+            self.get_queryset().model._meta.label, user, getattr(renderer, 'format', None), *parts
+        ))
+        return quote_etag(hashlib.md5(source.encode()).hexdigest())
+
+    def list(self, request, *args, **kwargs):
+        fingerprint = self.get_fingerprint(self.get_conditional_queryset())
+        etag = self.make_etag(request, request.get_full_path(), sorted(fingerprint.items()))
+        not_modified = get_conditional_response(request, etag=etag)
+        if not_modified is not None:
+            return self.add_validators(not_modified, etag)
+        response = super().list(request, *args, **kwargs)
+        return self.add_validators(response, etag)
+
+    def retrieve(self, request, *args, **kwargs):
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        queryset = self.get_conditional_queryset().filter(
+            **{self.lookup_field: kwargs[lookup_url_kwarg]}
+        )
+        fingerprint = self.get_fingerprint(queryset)
+        if not fingerprint['count']:
+            # Let the regular lookup raise the 404.
+            return super().retrieve(request, *args, **kwargs)
+
+        etag = self.make_etag(request, kwargs[lookup_url_kwarg], sorted(fingerprint.items()))
+        dates = [
+            fingerprint[f'max_{field}'] for field in self.conditional_fields if fingerprint[f'max_{field}']
+        ]
+        last_modified = int(max(dates).timestamp()) if dates else None
+        not_modified = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if not_modified is not None:
+            return self.add_validators(not_modified, etag, last_modified)
+        response = super().retrieve(request, *args, **kwargs)
+        return self.add_validators(response, etag, last_modified)
+
+    def add_validators(self, response, etag, last_modified=None):
+        if response.status_code not in (200, 304):
+            return response
+        response['ETag'] = etag
+        if last_modified is not None:
+            response['Last-Modified'] = http_date(last_modified)
+        # Clients may keep the payload but must revalidate it.
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
@@ -0,0 +1,241 @@
+"""
+Keyset (cursor) pagination shared by list views and API endpoints.
+
+Pages are fetched with ``WHERE (field, pk) < (value, last_pk)`` on an indexed
+ordering instead of ``OFFSET``, so deep pages cost the same as the first one.
+Totals come from a cached ``COUNT`` (or the planner estimate for unfiltered
+PostgreSQL tables) unless an exact count is explicitly requested.
+"""
+import base64
+import binascii
+import datetime
+import hashlib
+import json
+from collections import OrderedDict
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.core.exceptions import EmptyResultSet, ValidationError
+from django.db import connections
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+COUNT_CACHE_TIMEOUT = 300
+
+
+class InvalidCursor(Exception):
+    """Raised when a cursor cannot be decoded."""
+
+
+def encode_cursor(value, pk, reverse=False):
+    if isinstance(value, (datetime.datetime, datetime.date)):
+        value = value.isoformat()
+    elif isinstance(value, (Decimal, float)):
+        value = str(value)
+    payload = {'v': value, 'pk': str(pk)}
+    if reverse:
+        payload['r'] = 1
+    raw = json.dumps(payload, separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        payload = json.loads(raw)
+        return payload['v'], payload['pk'], bool(payload.get('r'))
+    except (binascii.Error, ValueError, TypeError, KeyError):
+        raise InvalidCursor(cursor)
+
+
+def cached_count(queryset, exact=False, timeout=COUNT_CACHE_TIMEOUT):
+    """
+    Return ``(count, is_exact)`` for ``queryset``.
+
+    Unless ``exact`` is true, counts are cached per SQL query for ``timeout``
+    seconds, and unfiltered PostgreSQL tables use the planner estimate.
+    """
+    if exact:
+        return queryset.count(), True
+    try:
+        sql, params = queryset.order_by().query.sql_with_params()
+    except EmptyResultSet:
+        return 0, True
+
+    connection = connections[queryset.db]
+    if connection.vendor == 'postgresql' and not queryset.query.where:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass',
+                [queryset.model._meta.db_table],
+            )
+            row = cursor.fetchone()
+        if row and row[0] >= 0:
+            return row[0], False
+
+    key = 'keyset_count:' + hashlib.md5(f'{sql}{params}'.encode()).hexdigest()
+    count = cache.get(key)
+    if count is None:
+        count = queryset.count()
+        cache.set(key, count, timeout)
+        return count, True
+    return count, False
+
+
+class KeysetPage:
+    """A page of results with the cursors to its neighbours."""
+
+    def __init__(self, object_list, next_cursor, previous_cursor):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __bool__(self):
+        return bool(self.object_list)
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    @property
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    @property
+    def has_other_pages(self):
+        return self.has_next or self.has_previous
+
+
+class KeysetPaginator:
+    """
+    Paginate ``queryset`` on ``ordering`` (e.g. ``'-created_at'``) with the
+    primary key as tie-breaker.
+    """
+
+    def __init__(self, queryset, ordering, page_size):
+        self.queryset = queryset
+        self.field = ordering.lstrip('-')
+        self.descending = ordering.startswith('-')
+        self.page_size = page_size
+
+    def order_by(self, reverse=False):
+        descending = self.descending != reverse
+        prefix = '-' if descending else ''
+        return [f'{prefix}{self.field}', f'{prefix}pk']
+
+    def after(self, value, pk, reverse=False):
+        """Filter selecting the rows after (value, pk) in fetch direction."""
+        lookup = 'lt' if self.descending != reverse else 'gt'
+        return (
+            Q(**{f'{self.field}__{lookup}': value})
+            | Q(**{self.field: value, f'pk__{lookup}': pk})
+        )
+
+    def position(self, obj):
+        value = obj
+        for part in self.field.split('__'):
+            value = getattr(value, part)
+        return value, obj.pk
+
+    def page(self, cursor=None):
+        reverse = False
+        queryset = self.queryset
+        if cursor:
+            value, pk, reverse = decode_cursor(cursor)
+            queryset = queryset.filter(self.after(value, pk, reverse))
+        rows = list(queryset.order_by(*self.order_by(reverse))[:self.page_size + 1])
+        has_more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        if reverse:
+            rows.reverse()
+
+        next_cursor = previous_cursor = None
+        if rows:
+            if has_more or reverse:
+                next_cursor = encode_cursor(*self.position(rows[-1]))
+            if cursor and (has_more or not reverse):
+                previous_cursor = encode_cursor(*self.position(rows[0]), reverse=True)
+        return KeysetPage(rows, next_cursor, previous_cursor)
+
+
+class KeysetPagination(BasePagination):
+    """
+    DRF pagination over ``(ordering field, pk)``.
+
+    The first ordering applied to the queryset by the filter backends is used,
+    otherwise the view's ``ordering``; the primary key breaks ties.
+    Totals are cached; pass ``?exact_count=1`` for an exact ``COUNT``.
+    """
+    page_size = 20
+    max_page_size = 100
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    exact_count_query_param = 'exact_count'
+    default_ordering = '-created_at'
+
+    def get_ordering(self, request, queryset, view):
+        # Reuse the ordering applied by the filter backends (``OrderingFilter``,
+        # relevance ordering of a search) so the pages follow it.
+        applied = queryset.query.order_by
+        if applied and isinstance(applied[0], str):
+            return applied[0]
+        ordering = getattr(view, 'ordering', None)
+        if isinstance(ordering, (list, tuple)):
+            ordering = ordering[0] if ordering else None
+        return ordering or self.default_ordering
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return max(1, min(size, self.max_page_size))
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        paginator = KeysetPaginator(
+            queryset, self.get_ordering(request, queryset, view), self.get_page_size(request)
+        )
+        exact = request.query_params.get(self.exact_count_query_param) in ('1', 'true')
+        self.count, self.count_is_exact = cached_count(queryset, exact=exact)
+        try:
+            self.page = paginator.page(request.query_params.get(self.cursor_query_param))
+        except (InvalidCursor, ValidationError, ValueError):
+            raise NotFound('Curseur invalide.')
+        return list(self.page)
+
+    def get_link(self, cursor):
+        if cursor is None:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, cursor)
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('count', self.count),
+            ('count_is_exact', self.count_is_exact),
+            ('next', self.get_link(self.page.next_cursor)),
+            ('previous', self.get_link(self.page.previous_cursor)),
+            ('results', data),
+        ]))
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'properties': {
+                'count': {'type': 'integer'},
+                'count_is_exact': {'type': 'boolean'},
+                'next': {'type': 'string', 'nullable': True},
+                'previous': {'type': 'string', 'nullable': True},
+                'results': schema,
+            },
+        }
@@ -0,0 +1,72 @@
+"""
+Tabular renderers (CSV, JSON Lines) for exports.
+
+Exports are streamed: views pick the negotiated renderer and feed its
+``stream(header, rows)`` generator to a ``StreamingHttpResponse``, so rows are
+encoded one at a time. ``render`` only handles regular (error) responses.
+
+CSV text cells that a spreadsheet would evaluate as a formula (starting with
+``=``, ``+``, ``-``, ``@``, a tab or a carriage return) are prefixed with
+``'`` so they are shown as text.
+"""
+import csv
+import io
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from rest_framework.renderers import BaseRenderer
+
+FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+
+def neutralize_formula(value):
+    """Return ``value``, as text if a spreadsheet would run it as a formula."""
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        return f"'{value}"
+    return value
+
+
+class CSVRenderer(BaseRenderer):
+    media_type = 'text/csv'
+    format = 'csv'
+    charset = 'utf-8'
+
+    def stream(self, header, rows):
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+
+        def flush(row):
+            writer.writerow([neutralize_formula(value) for value in row])
+            value = buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+            return value.encode(self.charset)
+
+        # Byte order mark, so spreadsheet software reads the file as UTF-8.
+        yield '\ufeff'.encode(self.charset)
+        yield flush(header)
+        for row in rows:
+            yield flush(row)
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        if isinstance(data, dict):
+            return b''.join(self.stream(list(data), [[data[key] for key in data]]))
+        return str(data).encode(self.charset)
+
+
+class JSONLinesRenderer(BaseRenderer):
+    media_type = 'application/x-ndjson'
+    format = 'jsonl'
+    charset = 'utf-8'
+
+    def stream(self, header, rows):
+        for row in rows:
+            line = json.dumps(dict(zip(header, row)), cls=DjangoJSONEncoder, ensure_ascii=False)
+            yield f'{line}\n'.encode(self.charset)
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return f'{json.dumps(data, cls=DjangoJSONEncoder, ensure_ascii=False)}\n'.encode(self.charset)
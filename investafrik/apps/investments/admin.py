@@ -3,7 +3,9 @@ Admin configuration for investments app.
 """
 from django.contrib import admin
 from django.utils.html import format_html
-from .models import Investment, InvestmentReward, InvestmentRewardChoice
+from .models import (
+    Investment, InvestmentReward, InvestmentRewardChoice, PaymentCallback, RewardReservation
+)
 
 
 @admin.register(Investment)
@@ -56,4 +58,25 @@ class InvestmentRewardChoiceAdmin(admin.ModelAdmin):
     """Admin for InvestmentRewardChoice model."""
     list_display = ['investment', 'reward', 'is_delivered']
     list_filter = ['is_delivered']
-    search_fields = ['investment__transaction_id', 'reward__title']
\ No newline at end of file
+    search_fields = ['investment__transaction_id', 'reward__title']
+
+
+@admin.register(RewardReservation)
+class RewardReservationAdmin(admin.ModelAdmin):
+    """Admin for RewardReservation model."""
+    list_display = ['reward', 'investment', 'status', 'expires_at', 'created_at']
+    list_filter = ['status']
+    search_fields = ['investment__transaction_id', 'reward__title']
+    raw_id_fields = ['reward', 'investment']
+
+
+@admin.register(PaymentCallback)
+class PaymentCallbackAdmin(admin.ModelAdmin):
+    """Read-only admin for the payment callbacks inbox."""
+    list_display = ['provider', 'reference', 'status', 'outcome', 'received_at', 'processed_at']
+    list_filter = ['provider', 'status', 'outcome']
+    search_fields = ['reference']
+    readonly_fields = ['provider', 'reference', 'status', 'payload', 'received_at', 'processed_at', 'outcome']
+    
+    def has_add_permission(self, request):
+        return False
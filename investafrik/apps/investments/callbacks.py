@@ -0,0 +1,167 @@
+"""
+Payment provider callbacks.
+
+Providers notify payment status changes by POSTing signed JSON
+(``{"reference": ..., "status": ...}``, HMAC-SHA256 of the body in
+``X-Signature``) to ``/api/investments/callbacks/<provider>/``.
+
+Ingestion does the minimum: check the signature, map the provider status and
+append the callback to the ``PaymentCallback`` inbox with one insert that
+ignores conflicts, so the aggressive retries of a notification already stored
+cost nothing. A worker drains the inbox in batches: each batch locks its
+callbacks and the matching investments, applies the allowed status
+transitions in one short transaction and marks the callbacks processed. Each
+transition runs in its own savepoint: a callback that fails is rolled back
+alone and recorded with the ``error`` outcome, the rest of the batch goes on.
+"""
+import hashlib
+import hmac
+import json
+import logging
+from collections import Counter
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 200
+# One worker run is queued per burst of callbacks.
+SCHEDULE_KEY = 'payment_callbacks:scheduled'
+SCHEDULE_DELAY = 1
+
+# Provider wording -> Investment.payment_status
+STATUS_ALIASES = {
+    'pending': 'pending',
+    'initiated': 'pending',
+    'processing': 'processing',
+    'completed': 'completed',
+    'success': 'completed',
+    'successful': 'completed',
+    'succeeded': 'completed',
+    'failed': 'failed',
+    'failure': 'failed',
+    'rejected': 'failed',
+    'expired': 'failed',
+    'cancelled': 'cancelled',
+    'canceled': 'cancelled',
+    'refunded': 'refunded',
+    'reversed': 'refunded',
+}
+
+# Allowed payment status transitions
+TRANSITIONS = {
+    'pending': {'processing', 'completed', 'failed', 'cancelled'},
+    'processing': {'completed', 'failed', 'cancelled'},
+    'completed': {'refunded'},
+}
+
+
+class UnknownProvider(Exception):
+    pass
+
+
+class InvalidCallback(Exception):
+    pass
+
+
+def signature(secret, body):
+    return hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+
+
+def parse_callback(provider, body, received_signature):
+    """Check and decode a callback body. Return an unsaved ``PaymentCallback``."""
+    from .models import PaymentCallback
+
+    secret = getattr(settings, 'PAYMENT_CALLBACK_SECRETS', {}).get(provider)
+    if not secret:
+        raise UnknownProvider(provider)
+    if not hmac.compare_digest(signature(secret, body), received_signature or ''):
+        raise InvalidCallback('Signature invalide')
+
+    try:
+        payload = json.loads(body)
+    except ValueError:
+        raise InvalidCallback('Corps JSON invalide')
+    if not isinstance(payload, dict):
+        raise InvalidCallback('Corps JSON invalide')
+    reference = str(payload.get('reference') or '').strip()
+    if not reference or len(reference) > 100:
+        raise InvalidCallback('Référence de paiement invalide')
+    status = STATUS_ALIASES.get(str(payload.get('status') or '').strip().lower())
+    if status is None:
+        raise InvalidCallback('Statut de paiement inconnu')
+    return PaymentCallback(provider=provider, reference=reference, status=status, payload=payload)
+
+
+def ingest(callback):
+    """Append ``callback`` to the inbox (once) and schedule the worker."""
+    from .models import PaymentCallback
+
+    PaymentCallback.objects.bulk_create([callback], ignore_conflicts=True)
+    transaction.on_commit(schedule_processing)
+
+
+def schedule_processing():
+    from .tasks import process_payment_callbacks
+
+    if cache.add(SCHEDULE_KEY, True, SCHEDULE_DELAY * 10):
+        process_payment_callbacks.apply_async(countdown=SCHEDULE_DELAY)
+
+
+def process_callbacks(batch_size=BATCH_SIZE):
+    """Drain the inbox batch by batch. Return a ``Counter`` of outcomes."""
+    from .models import PaymentCallback
+
+    # Callbacks arriving from now on schedule another run.
+    cache.delete(SCHEDULE_KEY)
+    outcomes = Counter()
+    while True:
+        with transaction.atomic():
+            callbacks = list(
+                PaymentCallback.objects.filter(processed_at__isnull=True)
+                .select_for_update(skip_locked=True).order_by('id')[:batch_size]
+            )
+            if not callbacks:
+                return outcomes
+            outcomes.update(apply_callbacks(callbacks))
+
+
+def apply_callbacks(callbacks):
+    """Apply a batch of callbacks to their investments, in arrival order."""
+    from .models import Investment, PaymentCallback
+
+    investments = {
+        (investment.payment_provider, investment.payment_reference): investment
+        for investment in Investment.objects.select_for_update().filter(
+            payment_provider__in={callback.provider for callback in callbacks},
+            payment_reference__in={callback.reference for callback in callbacks},
+        )
+    }
+    now = timezone.now()
+    outcomes = Counter()
+    for callback in callbacks:
+        investment = investments.get((callback.provider, callback.reference))
+        if investment is None:
+            callback.outcome = 'unknown'
+        elif callback.status in TRANSITIONS.get(investment.payment_status, ()):
+            try:
+                with transaction.atomic():
+                    investment.payment_status = callback.status
+                    investment.save(update_fields=['payment_status', 'payment_completed_at', 'refunded_at'])
+            except Exception:
+                logger.exception('Échec de la notification de paiement %s', callback.pk)
+                # Later callbacks of the batch see the investment as stored
+                investment.refresh_from_db()
+                callback.outcome = 'error'
+            else:
+                callback.outcome = 'applied'
+        else:
+            # Duplicate, stale or out of order notification
+            callback.outcome = 'ignored'
+        callback.processed_at = now
+        outcomes[callback.outcome] += 1
+    PaymentCallback.objects.bulk_update(callbacks, ['processed_at', 'outcome'])
+    return outcomes
@@ -0,0 +1,81 @@
+"""
+Streaming exports of investments (backer lists) for project owners.
+
+Rows are read as plain tuples in ``(invested_at, id)`` order, one keyset batch
+of ``BATCH_SIZE`` rows at a time, each batch through ``QuerySet.iterator()``.
+No model instance or result cache is kept, so memory stays flat however many
+investments a campaign has.
+"""
+from datetime import datetime, time, timedelta
+
+from django.db.models import Q
+from django.utils import timezone
+
+BATCH_SIZE = 2000
+
+# (column header, field path)
+COLUMNS = [
+    ('id', 'id'),
+    ('transaction_id', 'transaction_id'),
+    ('project', 'project__slug'),
+    ('project_title', 'project__title'),
+    ('investor_first_name', 'investor__first_name'),
+    ('investor_last_name', 'investor__last_name'),
+    ('investor_email', 'investor__email'),
+    ('amount', 'amount'),
+    ('currency', 'project__currency'),
+    ('payment_method', 'payment_method'),
+    ('payment_status', 'payment_status'),
+    ('payment_reference', 'payment_reference'),
+    ('invested_at', 'invested_at'),
+    ('payment_completed_at', 'payment_completed_at'),
+    ('refunded_at', 'refunded_at'),
+]
+HEADER = [header for header, _ in COLUMNS]
+
+
+def export_queryset(user, project=None, status=None, date_from=None, date_to=None):
+    """Investments of ``project`` (or of every project owned by ``user``) matching the filters."""
+    from .models import Investment
+
+    queryset = Investment.objects.all()
+    if project is not None:
+        queryset = queryset.filter(project=project)
+    else:
+        queryset = queryset.filter(project__owner=user)
+    if status:
+        queryset = queryset.filter(payment_status=status)
+    # Datetime bounds rather than ``__date`` lookups, so the index can be used.
+    if date_from:
+        queryset = queryset.filter(invested_at__gte=start_of_day(date_from))
+    if date_to:
+        queryset = queryset.filter(invested_at__lt=start_of_day(date_to + timedelta(days=1)))
+    return queryset
+
+
+def start_of_day(day):
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def iter_rows(queryset, batch_size=None):
+    """Yield the export rows of ``queryset``, one keyset batch at a time."""
+    batch_size = batch_size or BATCH_SIZE
+    queryset = queryset.order_by('invested_at', 'id').values_list(
+        *(path for _, path in COLUMNS)
+    )
+    id_index = HEADER.index('id')
+    date_index = HEADER.index('invested_at')
+    position = None
+    while True:
+        batch = queryset
+        if position is not None:
+            invested_at, pk = position
+            batch = batch.filter(Q(invested_at__gt=invested_at) | Q(invested_at=invested_at, id__gt=pk))
+        row = None
+        count = 0
+        for row in batch[:batch_size].iterator(chunk_size=batch_size):
+            count += 1
+            yield row
+        if count < batch_size:
+            return
+        position = (row[date_index], row[id_index])
@@ -0,0 +1,20 @@
+# Generated by Django 5.0.8 on 2026-10-18 11:17
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('investments', '0001_initial'),
+        ('projects', '0002_project_investor_count'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='investment',
+            index=models.Index(fields=['project', 'payment_status', 'investor'], name='investments_project_dd6d96_idx'),
+        ),
+    ]
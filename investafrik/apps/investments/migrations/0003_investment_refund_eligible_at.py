@@ -0,0 +1,18 @@
+# Generated by Django 5.0.8 on 2026-10-18 11:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('investments', '0002_investment_investments_project_dd6d96_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='investment',
+            name='refund_eligible_at',
+            field=models.DateTimeField(blank=True, help_text='Date à laquelle le remboursement est devenu possible (campagne échouée)', null=True),
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.0.8 on 2026-10-18 11:39
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('investments', '0003_investment_refund_eligible_at'),
+        ('projects', '0007_project_trends'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='investment',
+            index=models.Index(fields=['project', 'invested_at', 'id'], name='investments_project_d3430f_idx'),
+        ),
+    ]
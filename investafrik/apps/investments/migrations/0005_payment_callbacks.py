@@ -0,0 +1,47 @@
+# Generated by Django 5.0.8 on 2026-10-18 11:40
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('investments', '0004_export_index'),
+        ('projects', '0007_project_trends'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PaymentCallback',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('provider', models.CharField(max_length=50)),
+                ('reference', models.CharField(max_length=100)),
+                ('status', models.CharField(choices=[('pending', 'En attente'), ('processing', 'En cours de traitement'), ('completed', 'Complété'), ('failed', 'Échec'), ('cancelled', 'Annulé'), ('refunded', 'Remboursé')], max_length=20)),
+                ('payload', models.JSONField(default=dict)),
+                ('received_at', models.DateTimeField(auto_now_add=True)),
+                ('processed_at', models.DateTimeField(blank=True, null=True)),
+                ('outcome', models.CharField(blank=True, choices=[('applied', 'Appliqué'), ('ignored', 'Ignoré'), ('unknown', 'Investissement introuvable')], max_length=20)),
+            ],
+            options={
+                'verbose_name': 'Notification de paiement',
+                'verbose_name_plural': 'Notifications de paiement',
+                'db_table': 'investments_paymentcallback',
+                'ordering': ['id'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='investment',
+            index=models.Index(fields=['payment_provider', 'payment_reference'], name='investments_payment_d1398d_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='paymentcallback',
+            index=models.Index(condition=models.Q(('processed_at__isnull', True)), fields=['id'], name='payment_callback_pending_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='paymentcallback',
+            constraint=models.UniqueConstraint(fields=('provider', 'reference', 'status'), name='unique_payment_callback'),
+        ),
+    ]
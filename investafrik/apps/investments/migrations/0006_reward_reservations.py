@@ -0,0 +1,31 @@
+# Generated by Django 5.0.8 on 2026-10-18 11:49
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('investments', '0005_payment_callbacks'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RewardReservation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('held', 'Réservée'), ('confirmed', 'Confirmée'), ('released', 'Libérée')], default='held', max_length=10)),
+                ('expires_at', models.DateTimeField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('investment', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='reward_reservation', to='investments.investment')),
+                ('reward', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='reservations', to='investments.investmentreward')),
+            ],
+            options={
+                'verbose_name': 'Réservation de récompense',
+                'verbose_name_plural': 'Réservations de récompenses',
+                'db_table': 'investments_rewardreservation',
+                'indexes': [models.Index(condition=models.Q(('status', 'held')), fields=['expires_at'], name='reward_reservation_held_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.0.8 on 2026-10-18 12:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('investments', '0006_reward_reservations'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='paymentcallback',
+            name='outcome',
+            field=models.CharField(blank=True, choices=[('applied', 'Appliqué'), ('ignored', 'Ignoré'), ('unknown', 'Investissement introuvable'), ('error', 'Erreur')], max_length=20),
+        ),
+    ]
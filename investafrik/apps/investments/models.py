@@ -2,9 +2,10 @@
 Investment models for InvestAfrik platform.
 """
 import uuid
-from django.db import models
+from django.db import models, transaction
 from django.core.validators import MinValueValidator
 from django.utils import timezone
+from .signals import payment_status_changed
 
 
 class Investment(models.Model):
@@ -63,6 +64,11 @@ class Investment(models.Model):
     invested_at = models.DateTimeField(auto_now_add=True)
     payment_completed_at = models.DateTimeField(null=True, blank=True)
     refunded_at = models.DateTimeField(null=True, blank=True)
+    refund_eligible_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text="Date à laquelle le remboursement est devenu possible (campagne échouée)"
+    )
     
     # Metadata
     ip_address = models.GenericIPAddressField(null=True, blank=True)
@@ -73,10 +79,26 @@ class Investment(models.Model):
         verbose_name = 'Investissement'
         verbose_name_plural = 'Investissements'
         ordering = ['-invested_at']
+        indexes = [
+            models.Index(fields=['project', 'payment_status', 'investor']),
+            # Keyset batches of exports
+            models.Index(fields=['project', 'invested_at', 'id']),
+            # Payment callbacks lookup
+            models.Index(fields=['payment_provider', 'payment_reference']),
+        ]
+    
+    # Payment status as last loaded from or written to the database.
+    _saved_payment_status = None
     
     def __str__(self):
         return f"{self.investor.get_full_name()} - {self.amount} FCFA dans {self.project.title}"
     
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._saved_payment_status = instance.__dict__.get('payment_status', models.DEFERRED)
+        return instance
+    
     def save(self, *args, **kwargs):
         # Generate transaction ID if not provided
         if not self.transaction_id:
@@ -90,11 +112,27 @@ class Investment(models.Model):
         if self.payment_status == 'refunded' and not self.refunded_at:
             self.refunded_at = timezone.now()
         
-        super().save(*args, **kwargs)
+        old_status = None if self._state.adding else self._saved_payment_status
+        
+        with transaction.atomic():
+            if old_status is models.DEFERRED:
+                # Loaded without its status: compare with the stored one.
+                old_status = Investment.objects.filter(pk=self.pk).values_list(
+                    'payment_status', flat=True
+                ).first()
+            super().save(*args, **kwargs)
+            
+            # Project counters and other denormalized data only move on
+            # status transitions, never on plain re-saves.
+            if old_status != self.payment_status:
+                payment_status_changed.send(
+                    sender=Investment,
+                    investment=self,
+                    old_status=old_status,
+                    new_status=self.payment_status,
+                )
         
-        # Update project current amount if payment is completed
-        if self.payment_status == 'completed':
-            self.project.update_current_amount()
+        self._saved_payment_status = self.payment_status
     
     @property
     def is_successful(self):
@@ -111,6 +149,18 @@ class Investment(models.Model):
         )
 
 
+class InvestmentRewardQuerySet(models.QuerySet):
+    """Custom queryset for investment rewards."""
+    
+    def with_backers_count(self):
+        """Annotate completed backers of each reward in one grouped query."""
+        return self.annotate(
+            completed_backers=models.Count(
+                'chosen_by', filter=models.Q(chosen_by__investment__payment_status='completed')
+            )
+        )
+
+
 class InvestmentReward(models.Model):
     """Rewards/perks offered to investors at different investment levels."""
     
@@ -133,6 +183,8 @@ class InvestmentReward(models.Model):
     is_active = models.BooleanField(default=True)
     created_at = models.DateTimeField(auto_now_add=True)
     
+    objects = InvestmentRewardQuerySet.as_manager()
+    
     class Meta:
         db_table = 'investments_investmentreward'
         verbose_name = 'Récompense d\'investissement'
@@ -147,14 +199,16 @@ class InvestmentReward(models.Model):
         """Check if reward is still available."""
         if not self.is_active:
             return False
-        if self.is_limited and self.quantity_available:
+        if self.is_limited and self.quantity_available is not None:
             return self.quantity_claimed < self.quantity_available
         return True
     
     @property
     def backers_count(self):
         """Get number of backers who chose this reward."""
-        return self.chosen_by.filter(payment_status='completed').count()
+        if hasattr(self, 'completed_backers'):
+            return self.completed_backers
+        return self.chosen_by.filter(investment__payment_status='completed').count()
 
 
 class InvestmentRewardChoice(models.Model):
@@ -181,4 +235,82 @@ class InvestmentRewardChoice(models.Model):
         verbose_name_plural = 'Choix de récompenses'
     
     def __str__(self):
-        return f"{self.investment.investor.get_full_name()} - {self.reward.title}"
\ No newline at end of file
+        return f"{self.investment.investor.get_full_name()} - {self.reward.title}"
+
+
+class RewardReservation(models.Model):
+    """Unit of reward stock held for an investment (see placement.py)."""
+    
+    STATUS_CHOICES = [
+        ('held', 'Réservée'),
+        ('confirmed', 'Confirmée'),
+        ('released', 'Libérée'),
+    ]
+    
+    reward = models.ForeignKey(
+        InvestmentReward,
+        on_delete=models.CASCADE,
+        related_name='reservations'
+    )
+    investment = models.OneToOneField(
+        Investment,
+        on_delete=models.CASCADE,
+        related_name='reward_reservation'
+    )
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='held')
+    expires_at = models.DateTimeField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        db_table = 'investments_rewardreservation'
+        verbose_name = 'Réservation de récompense'
+        verbose_name_plural = 'Réservations de récompenses'
+        indexes = [
+            models.Index(
+                fields=['expires_at'], condition=models.Q(status='held'),
+                name='reward_reservation_held_idx'
+            ),
+        ]
+    
+    def __str__(self):
+        return f"{self.reward.title} - {self.investment.transaction_id} ({self.status})"
+
+
+class PaymentCallback(models.Model):
+    """Append-only inbox of payment provider callbacks (see callbacks.py)."""
+    
+    OUTCOME_CHOICES = [
+        ('applied', 'Appliqué'),
+        ('ignored', 'Ignoré'),
+        ('unknown', 'Investissement introuvable'),
+        ('error', 'Erreur'),
+    ]
+    
+    provider = models.CharField(max_length=50)
+    reference = models.CharField(max_length=100)
+    status = models.CharField(max_length=20, choices=Investment.PAYMENT_STATUS_CHOICES)
+    payload = models.JSONField(default=dict)
+    received_at = models.DateTimeField(auto_now_add=True)
+    processed_at = models.DateTimeField(null=True, blank=True)
+    outcome = models.CharField(max_length=20, choices=OUTCOME_CHOICES, blank=True)
+    
+    class Meta:
+        db_table = 'investments_paymentcallback'
+        verbose_name = 'Notification de paiement'
+        verbose_name_plural = 'Notifications de paiement'
+        ordering = ['id']
+        constraints = [
+            # Provider retries of the same notification are stored once.
+            models.UniqueConstraint(
+                fields=['provider', 'reference', 'status'], name='unique_payment_callback'
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=['id'], condition=models.Q(processed_at__isnull=True),
+                name='payment_callback_pending_idx'
+            ),
+        ]
+    
+    def __str__(self):
+        return f"{self.provider} {self.reference} -> {self.status}"
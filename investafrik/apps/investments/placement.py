@@ -0,0 +1,171 @@
+"""
+Investment placement.
+
+Placing an investment checks the investor, the funding window of the project
+and the chosen reward, then writes in one short transaction:
+
+* the investment, its reward choice and a ``RewardReservation`` of the
+  reward unit are inserted;
+* the reward stock is claimed last, with a single conditional ``UPDATE``
+  (``quantity_claimed < quantity_available``), so concurrent investors can
+  never oversell it and the reward row is only locked until the commit that
+  follows. When no unit is left, ``ValidationError`` rolls the inserts back.
+
+The project row is neither locked nor written: ``current_amount`` and
+``investor_count`` only move when a payment completes (see
+``apps.projects.counters``), through atomic ``F()`` updates.
+
+A reservation is ``held`` for ``REWARD_RESERVATION_TTL`` seconds. It is
+confirmed when the payment completes; failed, cancelled and refunded payments,
+and held reservations past their expiry (``expire_reservations``), give the
+unit back to the stock. Every reservation status change is a conditional
+``UPDATE``, so a unit is never given back twice.
+"""
+from collections import Counter
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import F, Q
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+RELEASED_STATUSES = {'failed', 'cancelled', 'refunded'}
+ACTIVE_RESERVATION_STATUSES = ['held', 'confirmed']
+EXPIRY_BATCH_SIZE = 500
+
+
+def claimable_rewards():
+    """Rewards with stock left, as a filter usable in a conditional ``UPDATE``."""
+    from .models import InvestmentReward
+
+    return InvestmentReward.objects.filter(is_active=True).filter(
+        Q(is_limited=False)
+        | Q(quantity_available__isnull=True)
+        | Q(quantity_claimed__lt=F('quantity_available'))
+    )
+
+
+def claim_reward(reward_id):
+    """Take one unit of the reward stock. Return whether one was left."""
+    return bool(claimable_rewards().filter(pk=reward_id).update(
+        quantity_claimed=F('quantity_claimed') + 1
+    ))
+
+
+def give_back(reward_counts):
+    """Return ``{reward_id: units}`` to the reward stock."""
+    from .models import InvestmentReward
+
+    for reward_id, units in reward_counts.items():
+        InvestmentReward.objects.filter(pk=reward_id).update(
+            quantity_claimed=Greatest(F('quantity_claimed') - units, 0)
+        )
+
+
+def validate_placement(investor, project, amount, reward=None):
+    """Raise ``ValidationError`` unless ``investor`` may put ``amount`` in ``project``."""
+    errors = {}
+    today = timezone.localdate()
+    if not investor.is_investisseur:
+        errors['investor'] = "Seuls les investisseurs peuvent investir."
+    elif project.owner_id == investor.pk:
+        errors['investor'] = "Vous ne pouvez pas investir dans votre propre projet."
+    if project.status != 'active' or not project.start_date <= today <= project.end_date:
+        errors['project'] = "Ce projet n'accepte pas d'investissements."
+    if reward is not None:
+        if reward.project_id != project.pk:
+            errors['reward'] = "Cette récompense n'appartient pas au projet."
+        elif not reward.is_active:
+            errors['reward'] = "Cette récompense n'est plus proposée."
+        elif amount < reward.minimum_amount:
+            errors['amount'] = f"Le montant minimum pour cette récompense est de {reward.minimum_amount} FCFA."
+    if errors:
+        raise ValidationError(errors)
+
+
+def place_investment(investor, project, amount, payment_method, reward=None, **fields):
+    """
+    Create a pending investment of ``investor`` in ``project`` and claim one
+    unit of ``reward``. Return the investment.
+    """
+    from .models import Investment, InvestmentRewardChoice, RewardReservation
+
+    validate_placement(investor, project, amount, reward)
+    with transaction.atomic():
+        investment = Investment.objects.create(
+            investor=investor,
+            project=project,
+            amount=amount,
+            payment_method=payment_method,
+            **fields
+        )
+        if reward is not None:
+            InvestmentRewardChoice.objects.create(investment=investment, reward=reward)
+            RewardReservation.objects.create(
+                reward=reward,
+                investment=investment,
+                expires_at=timezone.now() + timedelta(seconds=settings.REWARD_RESERVATION_TTL),
+            )
+            # Last statement: the reward row stays locked until the commit only.
+            if not claim_reward(reward.pk):
+                raise ValidationError({'reward': "Cette récompense est épuisée."})
+    return investment
+
+
+def settle_reservation(investment, old_status, new_status):
+    """Confirm or release the reward reservation of ``investment`` on a payment transition."""
+    if new_status == 'completed':
+        confirm_reservation(investment)
+    elif new_status in RELEASED_STATUSES:
+        release_reservation(investment)
+
+
+def confirm_reservation(investment):
+    from .models import InvestmentRewardChoice, RewardReservation
+
+    reservations = RewardReservation.objects.filter(investment=investment)
+    if reservations.filter(status='held').update(status='confirmed'):
+        return
+    released = reservations.filter(status='released').values_list('reward_id', flat=True).first()
+    if released is None:
+        return
+    # Paid after the reservation expired: claim the reward again if any is left.
+    if claim_reward(released):
+        reservations.filter(status='released').update(status='confirmed')
+    else:
+        InvestmentRewardChoice.objects.filter(investment=investment).delete()
+
+
+def release_reservation(investment):
+    from .models import RewardReservation
+
+    reservations = RewardReservation.objects.filter(
+        investment=investment, status__in=ACTIVE_RESERVATION_STATUSES
+    )
+    reward_id = reservations.values_list('reward_id', flat=True).first()
+    if reward_id is not None and reservations.update(status='released'):
+        give_back({reward_id: 1})
+
+
+def expire_reservations(now=None, batch_size=EXPIRY_BATCH_SIZE):
+    """Release held reservations past their expiry. Return the number released."""
+    from .models import RewardReservation
+
+    now = now or timezone.now()
+    released = 0
+    while True:
+        with transaction.atomic():
+            expired = list(
+                RewardReservation.objects.filter(status='held', expires_at__lte=now)
+                .select_for_update(skip_locked=True)
+                .values_list('pk', 'reward_id')[:batch_size]
+            )
+            if not expired:
+                return released
+            RewardReservation.objects.filter(
+                pk__in=[pk for pk, _ in expired], status='held'
+            ).update(status='released')
+            give_back(Counter(reward_id for _, reward_id in expired))
+            released += len(expired)
@@ -1,8 +1,11 @@
 """
 Serializers for investments app.
 """
+from django.core.exceptions import ValidationError as DjangoValidationError
 from rest_framework import serializers
+from apps.projects.models import Project
 from .models import Investment, InvestmentReward
+from .placement import place_investment
 from apps.accounts.serializers import UserSerializer
 from apps.projects.serializers import ProjectListSerializer
 
@@ -23,10 +26,56 @@ class InvestmentSerializer(serializers.ModelSerializer):
             'payment_completed_at', 'is_successful', 'can_be_refunded'
         ]
         read_only_fields = [
-            'id', 'transaction_id', 'invested_at', 'payment_completed_at'
+            'id', 'payment_status', 'transaction_id', 'invested_at', 'payment_completed_at'
         ]
 
 
+class InvestmentPlacementSerializer(serializers.Serializer):
+    """Input of a new investment; the project may come from the context."""
+    project = serializers.PrimaryKeyRelatedField(queryset=Project.objects.all(), required=False)
+    amount = serializers.DecimalField(max_digits=15, decimal_places=2, min_value=1000)
+    payment_method = serializers.ChoiceField(choices=Investment.PAYMENT_METHOD_CHOICES)
+    payment_provider = serializers.CharField(max_length=50, required=False, allow_blank=True)
+    reward = serializers.PrimaryKeyRelatedField(
+        queryset=InvestmentReward.objects.all(), required=False, allow_null=True
+    )
+    message = serializers.CharField(required=False, allow_blank=True)
+    
+    def validate(self, attrs):
+        project = self.context.get('project') or attrs.get('project')
+        if project is None:
+            raise serializers.ValidationError({'project': 'Ce champ est obligatoire.'})
+        attrs['project'] = project
+        return attrs
+    
+    def create(self, validated_data):
+        request = self.context['request']
+        try:
+            return place_investment(
+                investor=request.user,
+                ip_address=request.META.get('REMOTE_ADDR'),
+                user_agent=request.META.get('HTTP_USER_AGENT', ''),
+                **validated_data
+            )
+        except DjangoValidationError as error:
+            raise serializers.ValidationError(error.message_dict)
+    
+    def to_representation(self, instance):
+        return InvestmentSerializer(instance, context=self.context).data
+
+
+class InvestmentExportParamsSerializer(serializers.Serializer):
+    """Query parameters of investment exports."""
+    status = serializers.ChoiceField(choices=Investment.PAYMENT_STATUS_CHOICES, required=False)
+    date_from = serializers.DateField(required=False)
+    date_to = serializers.DateField(required=False)
+    
+    def validate(self, attrs):
+        if attrs.get('date_from') and attrs.get('date_to') and attrs['date_from'] > attrs['date_to']:
+            raise serializers.ValidationError("La date de début doit précéder la date de fin.")
+        return attrs
+
+
 class InvestmentRewardSerializer(serializers.ModelSerializer):
     """Serializer for InvestmentReward model."""
     is_available = serializers.ReadOnlyField()
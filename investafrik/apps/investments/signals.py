@@ -0,0 +1,17 @@
+"""
+Signals for investments app.
+"""
+from django.dispatch import Signal, receiver
+
+
+# Sent inside the saving transaction whenever an investment's payment_status
+# changes. Receivers get ``investment``, ``old_status`` (None for a new
+# investment) and ``new_status``.
+payment_status_changed = Signal()
+
+
+@receiver(payment_status_changed)
+def settle_reward_reservation(sender, investment, old_status, new_status, **kwargs):
+    """Confirm the reward of a completed payment, give back the others' to the stock."""
+    from .placement import settle_reservation
+    settle_reservation(investment, old_status, new_status)
@@ -0,0 +1,18 @@
+"""
+Celery tasks for investments app.
+"""
+from celery import shared_task
+
+from . import callbacks, placement
+
+
+@shared_task
+def process_payment_callbacks():
+    """Apply the pending payment provider callbacks."""
+    return dict(callbacks.process_callbacks())
+
+
+@shared_task
+def expire_reward_reservations():
+    """Give the stock of expired reward reservations back."""
+    return placement.expire_reservations()
@@ -10,5 +10,8 @@ router.register(r'', views.InvestmentViewSet, basename='investment')
 
 urlpatterns = [
     path('my-investments/', views.MyInvestmentsView.as_view(), name='my_investments'),
+    path('export/', views.InvestmentExportView.as_view(), name='investment_export'),
+    path('export/<slug:slug>/', views.InvestmentExportView.as_view(), name='project_investment_export'),
+    path('callbacks/<slug:provider>/', views.PaymentCallbackView.as_view(), name='payment_callback'),
     path('', include(router.urls)),
 ]
\ No newline at end of file
@@ -1,23 +1,38 @@
 """
 API views for investments app.
 """
-from rest_framework import viewsets, generics
-from rest_framework.permissions import IsAuthenticated
+from rest_framework import viewsets, generics, status
+from rest_framework.exceptions import NotFound, PermissionDenied
+from rest_framework.permissions import AllowAny, IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from django.http import StreamingHttpResponse
+from django.shortcuts import get_object_or_404
+from django.utils import timezone
 from django_filters.rest_framework import DjangoFilterBackend
+from apps.core.renderers import CSVRenderer, JSONLinesRenderer
+from apps.projects.models import Project
+from . import callbacks, exports
 from .models import Investment
-from .serializers import InvestmentSerializer
+from .serializers import InvestmentExportParamsSerializer, InvestmentPlacementSerializer, InvestmentSerializer
 
 
 class InvestmentViewSet(viewsets.ModelViewSet):
-    """ViewSet for investments."""
-    queryset = Investment.objects.all()
+    """ViewSet for the current user's investments."""
     serializer_class = InvestmentSerializer
     permission_classes = [IsAuthenticated]
     filter_backends = [DjangoFilterBackend]
     filterset_fields = ['payment_status', 'payment_method']
+    # Payment statuses only move through the provider callbacks.
+    http_method_names = ['get', 'post', 'head', 'options']
     
-    def perform_create(self, serializer):
-        serializer.save(investor=self.request.user)
+    def get_queryset(self):
+        return Investment.objects.filter(investor=self.request.user)
+    
+    def get_serializer_class(self):
+        if self.action == 'create':
+            return InvestmentPlacementSerializer
+        return InvestmentSerializer
 
 
 class MyInvestmentsView(generics.ListAPIView):
@@ -29,6 +44,50 @@ class MyInvestmentsView(generics.ListAPIView):
         return Investment.objects.filter(investor=self.request.user)
 
 
+class InvestmentExportView(generics.GenericAPIView):
+    """Stream the investments of one project, or of all the user's projects, as CSV or JSON Lines."""
+    permission_classes = [IsAuthenticated]
+    renderer_classes = [CSVRenderer, JSONLinesRenderer]
+    
+    def get(self, request, slug=None):
+        params = InvestmentExportParamsSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        
+        project = None
+        if slug is not None:
+            project = get_object_or_404(Project, slug=slug)
+            if project.owner_id != request.user.pk and not request.user.is_staff:
+                raise PermissionDenied("Vous n'êtes pas le porteur de ce projet.")
+        queryset = exports.export_queryset(request.user, project, **params.validated_data)
+        
+        renderer = request.accepted_renderer
+        response = StreamingHttpResponse(
+            renderer.stream(exports.HEADER, exports.iter_rows(queryset)),
+            content_type=f'{renderer.media_type}; charset={renderer.charset}',
+        )
+        filename = f"investissements-{slug or 'projets'}-{timezone.localdate():%Y%m%d}.{renderer.format}"
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
+
+
+class PaymentCallbackView(APIView):
+    """Receive a payment provider callback into the inbox."""
+    authentication_classes = []
+    permission_classes = [AllowAny]
+    
+    def post(self, request, provider):
+        try:
+            callback = callbacks.parse_callback(
+                provider, request.body, request.headers.get('X-Signature')
+            )
+        except callbacks.UnknownProvider:
+            raise NotFound('Fournisseur de paiement inconnu')
+        except callbacks.InvalidCallback as error:
+            return Response({'error': str(error)}, status=status.HTTP_400_BAD_REQUEST)
+        callbacks.ingest(callback)
+        return Response({'status': 'accepted'}, status=status.HTTP_202_ACCEPTED)
+
+
 # Frontend Views
 from django.views.generic import TemplateView
 from django.contrib.auth.mixins import LoginRequiredMixin
@@ -55,19 +114,8 @@ class MyInvestmentsPageView(LoginRequiredMixin, TemplateView):
         ).select_related('project', 'project__owner').order_by('-invested_at')
         
         # Statistiques
-        from django.db.models import Sum, Count
-        
-        total_invested = user_investments.filter(
-            payment_status='completed'
-        ).aggregate(total=Sum('amount'))['total'] or 0
-        
-        total_projects = user_investments.filter(
-            payment_status='completed'
-        ).values('project').distinct().count()
-        
-        pending_investments = user_investments.filter(
-            payment_status='pending'
-        ).count()
+        from apps.accounts.summaries import get_summary
+        summary = get_summary(self.request.user)
         
         # Investissements par statut
         completed_investments = user_investments.filter(payment_status='completed')
@@ -77,9 +125,9 @@ class MyInvestmentsPageView(LoginRequiredMixin, TemplateView):
             'investments': user_investments,
             'completed_investments': completed_investments,
             'pending_investments': pending_investments_list,
-            'total_invested': total_invested,
-            'total_projects': total_projects,
-            'pending_count': pending_investments,
+            'total_invested': summary.total_invested,
+            'total_projects': summary.invested_projects_count,
+            'pending_count': summary.investments_with_status('pending'),
         })
         
         return context
\ No newline at end of file
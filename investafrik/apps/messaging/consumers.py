@@ -3,14 +3,62 @@ WebSocket consumers for real-time messaging.
 """
 import json
 import uuid
+from urllib.parse import parse_qs
 from channels.generic.websocket import AsyncWebsocketConsumer
 from channels.db import database_sync_to_async
 from django.contrib.auth.models import AnonymousUser
-from .models import Conversation, Message
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from apps.core.pagination import InvalidCursor
+from .history import MAX_REPLAY_MESSAGES, message_history, messages_after, replay_cursor
+from .models import Conversation
+from .posting import post_message
+from .write_behind import message_buffer
+
+
+def sender_payload(user):
+    """Identity of a message sender, as broadcast to clients."""
+    return {
+        'id': str(user.id),
+        'name': user.get_full_name(),
+        'avatar': user.profile_picture.url if user.profile_picture else None,
+    }
+
+
+def message_payload(message, sender):
+    """A message, as sent to clients."""
+    return {
+        'id': str(message.id),
+        'content': message.content,
+        'sender': sender,
+        'sent_at': message.sent_at.isoformat(),
+        'is_read': message.is_read,
+    }
 
 
 class ChatConsumer(AsyncWebsocketConsumer):
-    """WebSocket consumer for chat functionality."""
+    """
+    WebSocket consumer for chat functionality.
+
+    The conversation is loaded once, at connect, and kept as a compact state
+    on the connection: the participant ids, the unread counter of each side
+    and the sender's broadcast identity. Sending a message is then a single
+    trip to the database (or none with the write-behind queue, see
+    write_behind.py) and marking as read a single ``UPDATE``.
+
+    Clients load the history with ``load_older`` frames: without ``cursor``
+    the latest page, else the page before it (see history.py). The answer is
+    a ``history`` frame with the messages in chronological order and the
+    ``cursor`` of the older page, ``null`` at the start of the conversation.
+
+    Reconnecting clients pass the last message they saw (its id or its
+    ``sent_at``) as ``?since=`` on the socket URL, or in a ``sync`` frame. The
+    messages that followed are sent in ``replay`` frames of bounded batches,
+    then an ``unread`` frame with the current unread count; ``complete`` is
+    false when the gap exceeded ``MAX_REPLAY_MESSAGES`` and the client should
+    reload the latest page instead. Messages broadcast meanwhile may arrive
+    twice; clients match them by id.
+    """
     
     async def connect(self):
         """Handle WebSocket connection."""
@@ -23,10 +71,18 @@ class ChatConsumer(AsyncWebsocketConsumer):
             return
         
         # Check if user is participant in this conversation
-        if not await self.is_participant():
+        self.conversation = await self.load_conversation()
+        if self.conversation is None:
             await self.close()
             return
         
+        user = self.scope['user']
+        self.unread_field = self.conversation.unread_field_for_user(user)
+        self.recipient_unread_field = (
+            'unread_count_p2' if self.unread_field == 'unread_count_p1' else 'unread_count_p1'
+        )
+        self.sender = sender_payload(user)
+        
         # Join room group
         await self.channel_layer.group_add(
             self.room_group_name,
@@ -34,6 +90,11 @@ class ChatConsumer(AsyncWebsocketConsumer):
         )
         
         await self.accept()
+        
+        # Catch up on missed messages
+        since = parse_qs(self.scope.get('query_string', b'').decode()).get('since')
+        if since:
+            await self.replay(since[0])
     
     async def disconnect(self, close_code):
         """Handle WebSocket disconnection."""
@@ -55,6 +116,10 @@ class ChatConsumer(AsyncWebsocketConsumer):
                 await self.handle_typing(text_data_json)
             elif message_type == 'mark_read':
                 await self.handle_mark_read(text_data_json)
+            elif message_type == 'load_older':
+                await self.handle_load_older(text_data_json)
+            elif message_type == 'sync':
+                await self.replay(text_data_json.get('since'))
                 
         except json.JSONDecodeError:
             await self.send(text_data=json.dumps({
@@ -67,27 +132,21 @@ class ChatConsumer(AsyncWebsocketConsumer):
         if not content:
             return
         
-        # Save message to database
-        message = await self.save_message(content)
-        if not message:
-            return
+        # Queue the message, or save it to database
+        message = None
+        if message_buffer.enabled:
+            message = message_buffer.enqueue(
+                self.conversation.pk, self.scope['user'].pk, self.recipient_unread_field, content
+            )
+        if message is None:
+            message = await self.save_message(content)
         
         # Send message to room group
         await self.channel_layer.group_send(
             self.room_group_name,
             {
                 'type': 'chat_message',
-                'message': {
-                    'id': str(message.id),
-                    'content': message.content,
-                    'sender': {
-                        'id': str(message.sender.id),
-                        'name': message.sender.get_full_name(),
-                        'avatar': message.sender.profile_picture.url if message.sender.profile_picture else None,
-                    },
-                    'sent_at': message.sent_at.isoformat(),
-                    'is_read': message.is_read,
-                }
+                'message': message_payload(message, self.sender),
             }
         )
     
@@ -99,8 +158,8 @@ class ChatConsumer(AsyncWebsocketConsumer):
             self.room_group_name,
             {
                 'type': 'typing_indicator',
-                'user_id': str(self.scope['user'].id),
-                'user_name': self.scope['user'].get_full_name(),
+                'user_id': self.sender['id'],
+                'user_name': self.sender['name'],
                 'is_typing': is_typing,
             }
         )
@@ -113,10 +172,52 @@ class ChatConsumer(AsyncWebsocketConsumer):
             self.room_group_name,
             {
                 'type': 'messages_read',
-                'user_id': str(self.scope['user'].id),
+                'user_id': self.sender['id'],
             }
         )
     
+    async def handle_load_older(self, data):
+        """Send a page of history to this client only."""
+        try:
+            messages, cursor = await self.load_history(data.get('cursor'), data.get('page_size'))
+        except InvalidCursor:
+            await self.send(text_data=json.dumps({
+                'error': 'Invalid cursor'
+            }))
+            return
+        
+        await self.send(text_data=json.dumps({
+            'type': 'history',
+            'messages': messages,
+            'cursor': cursor,
+        }))
+    
+    async def replay(self, since):
+        """Send the messages after ``since`` in batches, then the unread state."""
+        try:
+            cursor = await self.load_replay_cursor(since)
+        except InvalidCursor:
+            await self.send(text_data=json.dumps({
+                'error': 'Invalid since'
+            }))
+            return
+        
+        replayed = 0
+        while cursor and replayed < MAX_REPLAY_MESSAGES:
+            messages, cursor = await self.load_messages_after(cursor)
+            if messages:
+                replayed += len(messages)
+                await self.send(text_data=json.dumps({
+                    'type': 'replay',
+                    'messages': messages,
+                }))
+        
+        await self.send(text_data=json.dumps({
+            'type': 'unread',
+            'unread_count': await self.load_unread_count(),
+            'complete': cursor is None,
+        }))
+    
     async def chat_message(self, event):
         """Send chat message to WebSocket."""
         await self.send(text_data=json.dumps({
@@ -127,7 +228,7 @@ class ChatConsumer(AsyncWebsocketConsumer):
     async def typing_indicator(self, event):
         """Send typing indicator to WebSocket."""
         # Don't send typing indicator to the sender
-        if event['user_id'] != str(self.scope['user'].id):
+        if event['user_id'] != self.sender['id']:
             await self.send(text_data=json.dumps({
                 'type': 'typing_indicator',
                 'user_id': event['user_id'],
@@ -143,39 +244,63 @@ class ChatConsumer(AsyncWebsocketConsumer):
         }))
     
     @database_sync_to_async
-    def is_participant(self):
-        """Check if current user is participant in conversation."""
+    def load_conversation(self):
+        """Load the conversation if the current user takes part in it, else None."""
+        user = self.scope['user']
         try:
-            conversation = Conversation.objects.get(id=self.conversation_id)
-            return (
-                conversation.participant_1 == self.scope['user'] or 
-                conversation.participant_2 == self.scope['user']
-            )
-        except Conversation.DoesNotExist:
-            return False
+            participants = Conversation.objects.filter(
+                Q(participant_1=user) | Q(participant_2=user), pk=self.conversation_id
+            ).values_list('participant_1_id', 'participant_2_id').first()
+        except ValidationError:
+            return None
+        if participants is None:
+            return None
+        return Conversation(
+            pk=self.conversation_id, participant_1_id=participants[0], participant_2_id=participants[1]
+        )
     
     @database_sync_to_async
     def save_message(self, content):
         """Save message to database."""
-        try:
-            conversation = Conversation.objects.get(id=self.conversation_id)
-            message = Message.objects.create(
-                conversation=conversation,
-                sender=self.scope['user'],
-                content=content
-            )
-            return message
-        except Conversation.DoesNotExist:
-            return None
+        return post_message(self.conversation, self.scope['user'], content)
+    
+    @database_sync_to_async
+    def load_history(self, cursor, page_size):
+        """A page of history, with the cursor of the older page."""
+        # The latest page includes the queued messages
+        if message_buffer.enabled and not cursor:
+            message_buffer.flush()
+        messages, older = message_history(self.conversation.pk, cursor, page_size)
+        return [message_payload(message, sender_payload(message.sender)) for message in messages], older
+    
+    @database_sync_to_async
+    def load_replay_cursor(self, since):
+        """Cursor right after ``since``."""
+        # Queued messages are part of the replay
+        if message_buffer.enabled:
+            message_buffer.flush()
+        return replay_cursor(self.conversation.pk, since)
+    
+    @database_sync_to_async
+    def load_messages_after(self, cursor):
+        """A batch of missed messages, with the cursor of the next batch."""
+        messages, cursor = messages_after(self.conversation.pk, cursor)
+        return [message_payload(message, sender_payload(message.sender)) for message in messages], cursor
+    
+    @database_sync_to_async
+    def load_unread_count(self):
+        """Current unread count of the current user."""
+        return Conversation.objects.filter(pk=self.conversation.pk).values_list(
+            self.unread_field, flat=True
+        ).first() or 0
     
     @database_sync_to_async
     def mark_conversation_as_read(self):
         """Mark conversation as read for current user."""
-        try:
-            conversation = Conversation.objects.get(id=self.conversation_id)
-            conversation.mark_as_read_for_user(self.scope['user'])
-        except Conversation.DoesNotExist:
-            pass
+        # Queued messages must not count as unread afterwards
+        if message_buffer.enabled:
+            message_buffer.flush()
+        Conversation.objects.filter(pk=self.conversation.pk).update(**{self.unread_field: 0})
 
 
 class NotificationConsumer(AsyncWebsocketConsumer):
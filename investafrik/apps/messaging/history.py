@@ -0,0 +1,109 @@
+"""
+Message history.
+
+A conversation is read backwards, newest messages first, one page at a time
+on the ``(sent_at, id)`` keyset covered by the partial index
+``message_history_idx`` (non-deleted messages only). Loading older messages
+costs the same at any depth of a thread. Each page comes in chronological
+order with the cursor of the older page, ``None`` at the start of the
+conversation.
+
+Reconnecting clients catch up forwards on the same keyset: ``replay_cursor``
+positions a cursor right after the last message they saw (its id, or a
+timestamp) and ``messages_after`` reads what followed in batches of
+``REPLAY_BATCH_SIZE``, so a replay costs one query per batch of the gap,
+whatever the length of the conversation.
+"""
+import uuid
+
+from django.core.exceptions import ValidationError
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from apps.core.pagination import InvalidCursor, KeysetPaginator, encode_cursor
+
+HISTORY_PAGE_SIZE = 30
+MAX_HISTORY_PAGE_SIZE = 100
+REPLAY_BATCH_SIZE = 100
+# Beyond this gap, clients reload the latest page instead
+MAX_REPLAY_MESSAGES = 1000
+
+# Sorts after any message id sharing a timestamp
+LAST_ID = uuid.UUID(int=(1 << 128) - 1)
+
+
+def history_page_size(value=None):
+    """Requested page size, capped to ``MAX_HISTORY_PAGE_SIZE``."""
+    try:
+        size = int(value)
+    except (TypeError, ValueError):
+        return HISTORY_PAGE_SIZE
+    return max(1, min(size, MAX_HISTORY_PAGE_SIZE))
+
+
+def message_history(conversation_id, cursor=None, page_size=HISTORY_PAGE_SIZE):
+    """
+    Return ``(messages, older_cursor)``: the latest messages of a conversation,
+    or those before ``cursor``. Raise ``InvalidCursor`` for a malformed cursor.
+    """
+    from .models import Message
+
+    queryset = Message.objects.filter(
+        conversation_id=conversation_id, is_deleted=False
+    ).select_related('sender')
+    paginator = KeysetPaginator(queryset, '-sent_at', history_page_size(page_size))
+    try:
+        page = paginator.page(cursor or None)
+    except (ValidationError, ValueError):
+        raise InvalidCursor(cursor)
+    return page.object_list[::-1], page.next_cursor
+
+
+def replay_cursor(conversation_id, since):
+    """
+    Cursor positioned right after ``since``: the id of a message of the
+    conversation, or an ISO 8601 timestamp. Raise ``InvalidCursor`` otherwise.
+    """
+    from .models import Message
+
+    since = str(since or '').strip()
+    try:
+        message_id = uuid.UUID(since)
+    except ValueError:
+        pass
+    else:
+        # Deleted messages still mark a position
+        position = Message.objects.filter(
+            conversation_id=conversation_id, pk=message_id
+        ).values_list('sent_at', 'pk').first()
+        if position is None:
+            raise InvalidCursor(since)
+        return encode_cursor(*position)
+
+    try:
+        moment = parse_datetime(since)
+    except ValueError:
+        moment = None
+    if moment is None:
+        raise InvalidCursor(since)
+    if timezone.is_naive(moment):
+        moment = timezone.make_aware(moment)
+    return encode_cursor(moment, LAST_ID)
+
+
+def messages_after(conversation_id, cursor, batch_size=REPLAY_BATCH_SIZE):
+    """
+    Return ``(messages, next_cursor)``: the messages following ``cursor`` in
+    chronological order, and the cursor of the next batch (``None`` when
+    caught up).
+    """
+    from .models import Message
+
+    queryset = Message.objects.filter(
+        conversation_id=conversation_id, is_deleted=False
+    ).select_related('sender')
+    try:
+        page = KeysetPaginator(queryset, 'sent_at', batch_size).page(cursor)
+    except (ValidationError, ValueError):
+        raise InvalidCursor(cursor)
+    return page.object_list, page.next_cursor
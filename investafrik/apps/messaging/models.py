@@ -3,9 +3,30 @@ Messaging models for InvestAfrik platform.
 """
 import uuid
 from django.db import models
+from django.db.models import F
 from django.utils import timezone
 
 
+class ConversationQuerySet(models.QuerySet):
+    """Custom queryset for conversations."""
+    
+    def for_user(self, user):
+        """
+        Conversations of a user, as ``id IN (... UNION ALL ...)`` of one query per
+        participant column so each side uses its own index, instead of an
+        ``OR`` across both columns.
+        """
+        as_p1 = Conversation.objects.filter(participant_1=user).order_by().values('pk')
+        as_p2 = Conversation.objects.filter(participant_2=user).order_by().values('pk')
+        return self.filter(pk__in=as_p1.union(as_p2, all=True))
+    
+    def for_inbox(self):
+        """Load what an inbox row renders (participants, last message) in the same query."""
+        return self.select_related(
+            'participant_1__profile', 'participant_2__profile', 'last_message__sender__profile'
+        )
+
+
 class Conversation(models.Model):
     """Conversation between two users."""
     
@@ -41,6 +62,15 @@ class Conversation(models.Model):
     # Last message info (for quick display)
     last_message_at = models.DateTimeField(null=True, blank=True)
     last_message_preview = models.CharField(max_length=100, blank=True)
+    last_message = models.ForeignKey(
+        'Message',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='+'
+    )
+    
+    objects = ConversationQuerySet.as_manager()
     
     class Meta:
         db_table = 'messaging_conversation'
@@ -58,6 +88,12 @@ class Conversation(models.Model):
             return self.participant_2
         return self.participant_1
     
+    def unread_field_for_user(self, user):
+        """Name of the unread counter of a specific user."""
+        if user.pk == self.participant_1_id:
+            return 'unread_count_p1'
+        return 'unread_count_p2'
+    
     def get_unread_count_for_user(self, user):
         """Get unread message count for a specific user."""
         if user == self.participant_1:
@@ -66,19 +102,15 @@ class Conversation(models.Model):
     
     def mark_as_read_for_user(self, user):
         """Mark all messages as read for a specific user."""
-        if user == self.participant_1:
-            self.unread_count_p1 = 0
-        else:
-            self.unread_count_p2 = 0
-        self.save(update_fields=['unread_count_p1', 'unread_count_p2'])
+        field = self.unread_field_for_user(user)
+        Conversation.objects.filter(pk=self.pk).update(**{field: 0})
+        setattr(self, field, 0)
     
     def increment_unread_for_user(self, user):
         """Increment unread count for a specific user."""
-        if user == self.participant_1:
-            self.unread_count_p1 += 1
-        else:
-            self.unread_count_p2 += 1
-        self.save(update_fields=['unread_count_p1', 'unread_count_p2'])
+        field = self.unread_field_for_user(user)
+        Conversation.objects.filter(pk=self.pk).update(**{field: F(field) + 1})
+        self.refresh_from_db(fields=[field])
     
     @classmethod
     def get_or_create_conversation(cls, user1, user2, project=None):
@@ -96,7 +128,7 @@ class Conversation(models.Model):
 
 
 class Message(models.Model):
-    """Individual message in a conversation."""
+    """Individual message in a conversation (posted with posting.post_message)."""
     
     MESSAGE_TYPE_CHOICES = [
         ('text', 'Texte'),
@@ -139,24 +171,18 @@ class Message(models.Model):
         verbose_name = 'Message'
         verbose_name_plural = 'Messages'
         ordering = ['sent_at']
+        indexes = [
+            # History pages (see history.py)
+            models.Index(
+                fields=['conversation', 'sent_at', 'id'],
+                name='message_history_idx',
+                condition=models.Q(is_deleted=False),
+            ),
+        ]
     
     def __str__(self):
         return f"Message de {self.sender.get_full_name()} - {self.content[:50]}..."
     
-    def save(self, *args, **kwargs):
-        is_new = self.pk is None
-        super().save(*args, **kwargs)
-        
-        if is_new:
-            # Update conversation's last message info
-            self.conversation.last_message_at = self.sent_at
-            self.conversation.last_message_preview = self.content[:100]
-            self.conversation.updated_at = timezone.now()
-            
-            # Increment unread count for the recipient
-            recipient = self.conversation.get_other_participant(self.sender)
-            self.conversation.increment_unread_for_user(recipient)
-    
     def mark_as_read(self):
         """Mark message as read."""
         if not self.is_read:
@@ -0,0 +1,36 @@
+"""
+Message posting.
+
+Posting a message is two statements in one transaction: the ``INSERT`` of the
+message and a single ``UPDATE`` of its conversation that sets the last message
+(reference, time and preview) and increments the recipient's unread counter with ``F()``.
+Concurrent senders never overwrite each other's increments and the other
+participant's counter is left untouched.
+"""
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+PREVIEW_LENGTH = 100
+
+
+def post_message(conversation, sender, content, **fields):
+    """Post a message of ``sender`` in ``conversation``. Return the message."""
+    from .models import Conversation, Message
+
+    # The recipient's counter is the one the sender does not own.
+    unread_field = 'unread_count_p2' if sender.pk == conversation.participant_1_id else 'unread_count_p1'
+    preview = content[:PREVIEW_LENGTH]
+    with transaction.atomic():
+        message = Message.objects.create(conversation=conversation, sender=sender, content=content, **fields)
+        Conversation.objects.filter(pk=conversation.pk).update(
+            last_message=message,
+            last_message_at=message.sent_at,
+            last_message_preview=preview,
+            updated_at=timezone.now(),
+            **{unread_field: F(unread_field) + 1}
+        )
+    conversation.last_message = message
+    conversation.last_message_at = message.sent_at
+    conversation.last_message_preview = preview
+    return message
@@ -70,7 +70,8 @@ class ConversationSerializer(serializers.ModelSerializer):
         return 0
     
     def get_last_message(self, obj):
-        last_message = obj.messages.filter(is_deleted=False).last()
-        if last_message:
+        # Denormalized on the conversation, loaded with Conversation.objects.for_inbox()
+        last_message = obj.last_message
+        if last_message and not last_message.is_deleted:
             return MessageSerializer(last_message).data
         return None
\ No newline at end of file
@@ -5,8 +5,12 @@ from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
-from django.db import models
-from .models import Conversation, Message
+from rest_framework.exceptions import NotFound
+from rest_framework.utils.urls import replace_query_param
+from apps.core.pagination import InvalidCursor
+from .history import message_history
+from .models import Conversation
+from .posting import post_message
 from .serializers import ConversationSerializer, MessageSerializer
 
 
@@ -17,9 +21,7 @@ class ConversationViewSet(viewsets.ModelViewSet):
     
     def get_queryset(self):
         user = self.request.user
-        return Conversation.objects.filter(
-            models.Q(participant_1=user) | models.Q(participant_2=user)
-        ).order_by('-last_message_at')
+        return Conversation.objects.for_user(user).for_inbox().order_by('-last_message_at')
     
     def create(self, request, *args, **kwargs):
         """Create a new conversation."""
@@ -64,11 +66,25 @@ class ConversationViewSet(viewsets.ModelViewSet):
     
     @action(detail=True, methods=['get'])
     def messages(self, request, pk=None):
-        """Get messages in a conversation."""
+        """
+        Get messages in a conversation, latest page first.
+
+        ``next`` links to the older page (``?cursor=``), ``null`` at the start
+        of the conversation; ``page_size`` is capped.
+        """
         conversation = self.get_object()
-        messages = conversation.messages.filter(is_deleted=False)
+        try:
+            messages, cursor = message_history(
+                conversation.pk, request.query_params.get('cursor'), request.query_params.get('page_size')
+            )
+        except InvalidCursor:
+            raise NotFound('Curseur invalide.')
+        
         serializer = MessageSerializer(messages, many=True)
-        return Response(serializer.data)
+        return Response({
+            'next': replace_query_param(request.build_absolute_uri(), 'cursor', cursor) if cursor else None,
+            'results': serializer.data,
+        })
     
     @action(detail=True, methods=['post'])
     def send_message(self, request, pk=None):
@@ -82,11 +98,7 @@ class ConversationViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        message = Message.objects.create(
-            conversation=conversation,
-            sender=request.user,
-            content=content
-        )
+        message = post_message(conversation, request.user, content)
         
         serializer = MessageSerializer(message)
         return Response(serializer.data, status=status.HTTP_201_CREATED)
@@ -114,9 +126,9 @@ class ConversationsPageView(LoginRequiredMixin, TemplateView):
         
         # Récupérer les conversations de l'utilisateur
         user = self.request.user
-        conversations = Conversation.objects.filter(
-            models.Q(participant_1=user) | models.Q(participant_2=user)
-        ).select_related('participant_1', 'participant_2').order_by('-last_message_at')
+        conversations = Conversation.objects.for_user(user).select_related(
+            'participant_1', 'participant_2'
+        ).order_by('-last_message_at')
         
         # Récupérer tous les utilisateurs pour démarrer de nouvelles conversations
         from apps.accounts.models import User
@@ -136,10 +148,10 @@ class ConversationsPageView(LoginRequiredMixin, TemplateView):
             except Conversation.DoesNotExist:
                 pass
         
-        # Messages de la conversation sélectionnée
-        messages = []
+        # Derniers messages de la conversation sélectionnée
+        messages, older_cursor = [], None
         if selected_conversation:
-            messages = selected_conversation.messages.filter(is_deleted=False).select_related('sender').order_by('sent_at')
+            messages, older_cursor = message_history(selected_conversation.pk)
         
         context.update({
             'conversations': conversations,
@@ -147,6 +159,7 @@ class ConversationsPageView(LoginRequiredMixin, TemplateView):
             'unread_count': unread_count,
             'selected_conversation': selected_conversation,
             'messages': messages,
+            'older_cursor': older_cursor,
         })
         
         return context
@@ -163,12 +176,15 @@ class ConversationDetailView(LoginRequiredMixin, TemplateView):
         user = self.request.user
         
         try:
-            conversation = Conversation.objects.filter(
-                models.Q(participant_1=user) | models.Q(participant_2=user)
+            conversation = Conversation.objects.for_user(user).select_related(
+                'participant_1', 'participant_2'
             ).get(id=conversation_id)
             
-            # Messages de la conversation
-            messages = conversation.messages.filter(is_deleted=False).select_related('sender').order_by('sent_at')
+            # Messages de la conversation, page par page (?before= pour les plus anciens)
+            try:
+                messages, older_cursor = message_history(conversation.pk, self.request.GET.get('before'))
+            except InvalidCursor:
+                messages, older_cursor = message_history(conversation.pk)
             
             # Marquer comme lu
             conversation.mark_as_read_for_user(user)
@@ -176,6 +192,7 @@ class ConversationDetailView(LoginRequiredMixin, TemplateView):
             context.update({
                 'conversation': conversation,
                 'messages': messages,
+                'older_cursor': older_cursor,
                 'other_user': conversation.participant_2 if conversation.participant_1 == user else conversation.participant_1,
             })
             
@@ -193,16 +210,10 @@ class ConversationDetailView(LoginRequiredMixin, TemplateView):
             return redirect(f'/messaging/conversations/{conversation_id}/')
         
         try:
-            conversation = Conversation.objects.filter(
-                models.Q(participant_1=request.user) | models.Q(participant_2=request.user)
-            ).get(id=conversation_id)
+            conversation = Conversation.objects.for_user(request.user).get(id=conversation_id)
             
             # Créer le message
-            Message.objects.create(
-                conversation=conversation,
-                sender=request.user,
-                content=content
-            )
+            post_message(conversation, request.user, content)
             
         except Conversation.DoesNotExist:
             pass
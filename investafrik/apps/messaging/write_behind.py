@@ -0,0 +1,180 @@
+"""
+Write-behind queue for chat messages.
+
+With ``CHAT_WRITE_BEHIND`` enabled, messages sent over the chat WebSocket are
+built in memory (id and ``sent_at`` included), broadcast right away and
+queued in a process-local buffer. Every ``CHAT_WRITE_BEHIND_INTERVAL``
+seconds a daemon thread writes the burst in one transaction: one
+``bulk_create`` of the messages and one ``UPDATE`` per conversation for the
+last message and the unread counters, as ``posting.post_message`` does for a
+single message.
+
+``sent_at`` is stamped again when the message is inserted (the field is
+``auto_now_add``), in the order the messages were queued; clients match
+messages by id. When the buffer holds ``CHAT_WRITE_BEHIND_MAX_PENDING``
+messages, new ones are posted directly instead.
+
+When the burst cannot be written, its messages are written one at a time so
+that a bad message does not take the others down. Those that still fail go
+back to the head of the queue for the next flush, and are only dropped (and
+counted as failed) after ``MAX_FLUSH_ATTEMPTS`` flushes.
+"""
+import atexit
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.db import DatabaseError, close_old_connections, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .posting import PREVIEW_LENGTH
+
+logger = logging.getLogger(__name__)
+
+MAX_FLUSH_ATTEMPTS = 3
+
+
+class MessageBuffer:
+    """Process-local buffer of chat messages waiting to be inserted."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pending = []
+        self._flusher = None
+        self._stats = {
+            'queued': 0,
+            'flushed': 0,
+            'flushes': 0,
+            'failed': 0,
+            'last_flush_at': None,
+        }
+
+    @property
+    def enabled(self):
+        return getattr(settings, 'CHAT_WRITE_BEHIND', False)
+
+    @property
+    def flush_interval(self):
+        return getattr(settings, 'CHAT_WRITE_BEHIND_INTERVAL', 0.5)
+
+    @property
+    def max_pending(self):
+        return getattr(settings, 'CHAT_WRITE_BEHIND_MAX_PENDING', 5000)
+
+    def enqueue(self, conversation_id, sender_id, unread_field, content):
+        """
+        Queue a message of ``sender_id`` that increments ``unread_field`` of
+        its conversation. Return the unsaved message, or None if the buffer is
+        full.
+        """
+        from .models import Message
+
+        message = Message(
+            conversation_id=conversation_id, sender_id=sender_id, content=content, sent_at=timezone.now()
+        )
+        with self._lock:
+            if len(self._pending) >= self.max_pending:
+                return None
+            self._pending.append((message, unread_field, 0))
+            self._stats['queued'] += 1
+
+        self._ensure_flusher()
+        return message
+
+    def flush(self):
+        """Insert the queued messages. Return the messages written."""
+        with self._lock:
+            pending, self._pending = self._pending, []
+        if not pending:
+            return 0
+
+        now = timezone.now()
+        try:
+            self._write(pending, now)
+            written, retry, failed = len(pending), [], 0
+        except DatabaseError:
+            logger.warning("Écriture groupée de %d messages impossible, écriture un par un", len(pending))
+            written, retry, failed = self._write_each(pending, now)
+
+        with self._lock:
+            # Failed messages keep their place, ahead of those queued since.
+            self._pending[:0] = retry
+            self._stats['flushed'] += written
+            self._stats['failed'] += failed
+            if written:
+                self._stats['flushes'] += 1
+                self._stats['last_flush_at'] = now
+        return written
+
+    def _write_each(self, pending, now):
+        """Write ``pending`` one message at a time. Return ``(written, to_retry, dropped)``."""
+        written, retry, failed = 0, [], 0
+        for message, unread_field, attempts in pending:
+            try:
+                self._write([(message, unread_field, attempts)], now)
+                written += 1
+            except DatabaseError:
+                if attempts + 1 < MAX_FLUSH_ATTEMPTS:
+                    retry.append((message, unread_field, attempts + 1))
+                else:
+                    logger.exception("Impossible d'enregistrer le message %s", message.pk)
+                    failed += 1
+        return written, retry, failed
+
+    def _write(self, pending, now):
+        """Insert ``pending`` and update their conversations in one transaction."""
+        from .models import Conversation, Message
+
+        # Last message and counter increments, per conversation, in queue order
+        updates = OrderedDict()
+        for message, unread_field, _ in pending:
+            update = updates.setdefault(message.conversation_id, {'increments': {}})
+            update['last'] = message
+            update['increments'][unread_field] = update['increments'].get(unread_field, 0) + 1
+
+        with transaction.atomic():
+            Message.objects.bulk_create([message for message, _, _ in pending])
+            for conversation_id, update in updates.items():
+                last = update['last']
+                Conversation.objects.filter(pk=conversation_id).update(
+                    last_message=last,
+                    last_message_at=last.sent_at,
+                    last_message_preview=last.content[:PREVIEW_LENGTH],
+                    updated_at=now,
+                    **{field: F(field) + count for field, count in update['increments'].items()}
+                )
+
+    def metrics(self):
+        """Return buffer metrics."""
+        with self._lock:
+            data = dict(self._stats)
+            data['pending'] = len(self._pending)
+        return data
+
+    def _ensure_flusher(self):
+        if self._flusher is not None or self.flush_interval <= 0:
+            return
+        with self._lock:
+            if self._flusher is not None:
+                return
+            self._flusher = threading.Thread(
+                target=self._run_flusher, name='chat-messages-flusher', daemon=True
+            )
+            self._flusher.start()
+        atexit.register(self.flush)
+
+    def _run_flusher(self):
+        while True:
+            time.sleep(self.flush_interval)
+            try:
+                self.flush()
+            except Exception:
+                logger.exception('Échec du flush des messages')
+            finally:
+                close_old_connections()
+
+
+message_buffer = MessageBuffer()
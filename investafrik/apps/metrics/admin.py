@@ -0,0 +1,18 @@
+"""
+Admin configuration for metrics app.
+"""
+from django.contrib import admin
+from .models import DailyMetric
+
+
+@admin.register(DailyMetric)
+class DailyMetricAdmin(admin.ModelAdmin):
+    """Read-only admin for the daily metric buckets."""
+    list_display = ['metric', 'dimension', 'day', 'count', 'amount']
+    list_filter = ['metric']
+    search_fields = ['dimension']
+    date_hierarchy = 'day'
+    readonly_fields = ['metric', 'dimension', 'day', 'count', 'amount']
+    
+    def has_add_permission(self, request):
+        return False
@@ -0,0 +1,10 @@
+from django.apps import AppConfig
+
+
+class MetricsConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'apps.metrics'
+    verbose_name = 'Statistiques'
+    
+    def ready(self):
+        import apps.metrics.signals
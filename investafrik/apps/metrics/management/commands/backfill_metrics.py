@@ -0,0 +1,28 @@
+"""
+Management command to recompute the daily metric buckets from the source tables.
+"""
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from apps.metrics.rollups import backfill
+
+
+class Command(BaseCommand):
+    help = 'Recompute the daily metric buckets (signups, projects, investments, funding) of a range of days'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=365, help='Number of days up to today (default 365)')
+        parser.add_argument('--since', help='First day (YYYY-MM-DD), instead of --days')
+
+    def handle(self, *args, **options):
+        last_day = timezone.localdate()
+        if options['since']:
+            try:
+                first_day = date.fromisoformat(options['since'])
+            except ValueError:
+                raise CommandError('--since doit être une date AAAA-MM-JJ')
+        else:
+            first_day = last_day - timedelta(days=max(options['days'], 1) - 1)
+        count = backfill(first_day, last_day)
+        self.stdout.write(self.style.SUCCESS(f'{count} bucket(s) written from {first_day} to {last_day}'))
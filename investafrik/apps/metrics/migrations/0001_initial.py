@@ -0,0 +1,35 @@
+# Generated by Django 5.0.8 on 2026-10-18 11:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyMetric',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('metric', models.CharField(choices=[('signups', 'Inscriptions'), ('projects', 'Projets créés'), ('investments', 'Investissements'), ('funding', 'Fonds levés')], max_length=20)),
+                ('dimension', models.CharField(blank=True, default='', max_length=60)),
+                ('day', models.DateField()),
+                ('count', models.IntegerField(default=0)),
+                ('amount', models.DecimalField(decimal_places=2, default=0, max_digits=18)),
+            ],
+            options={
+                'verbose_name': 'Statistique journalière',
+                'verbose_name_plural': 'Statistiques journalières',
+                'db_table': 'metrics_dailymetric',
+                'ordering': ['metric', 'dimension', 'day'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='dailymetric',
+            constraint=models.UniqueConstraint(fields=('metric', 'dimension', 'day'), name='unique_daily_metric'),
+        ),
+    ]
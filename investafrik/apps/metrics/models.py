@@ -0,0 +1,38 @@
+"""
+Metrics models for InvestAfrik platform.
+"""
+from django.db import models
+
+
+class DailyMetric(models.Model):
+    """Daily bucket of a platform metric, whole or for one dimension (see rollups.py)."""
+    
+    METRIC_CHOICES = [
+        ('signups', 'Inscriptions'),
+        ('projects', 'Projets créés'),
+        ('investments', 'Investissements'),
+        ('funding', 'Fonds levés'),
+    ]
+    
+    metric = models.CharField(max_length=20, choices=METRIC_CHOICES)
+    # '' for the whole metric, else "name=value" (country=CM, category=3, status=completed...)
+    dimension = models.CharField(max_length=60, blank=True, default='')
+    day = models.DateField()
+    count = models.IntegerField(default=0)
+    amount = models.DecimalField(max_digits=18, decimal_places=2, default=0)
+    
+    class Meta:
+        db_table = 'metrics_dailymetric'
+        verbose_name = 'Statistique journalière'
+        verbose_name_plural = 'Statistiques journalières'
+        ordering = ['metric', 'dimension', 'day']
+        constraints = [
+            # Also the index of the range reads of a series.
+            models.UniqueConstraint(
+                fields=['metric', 'dimension', 'day'], name='unique_daily_metric'
+            ),
+        ]
+    
+    def __str__(self):
+        label = f"{self.metric} {self.dimension}".strip()
+        return f"{label} {self.day}: {self.count} / {self.amount}"
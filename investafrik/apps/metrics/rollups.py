@@ -0,0 +1,217 @@
+"""
+Daily metric rollups.
+
+``DailyMetric`` keeps one row per metric, dimension and day:
+
+* ``signups``: new users, whole and by ``country`` and ``user_type``;
+* ``projects``: new projects, whole and by ``country`` and ``category``;
+* ``investments``: investments by ``status``, on the day they were placed;
+* ``funding``: completed payments (count and amount), whole and by project
+  ``country`` and ``category``, on the day they completed. Refunds and other
+  reversals are taken back from that day.
+
+Buckets are moved incrementally by tasks queued once the change is committed
+(see signals.py), with one ``UPDATE ... SET count = count + n`` per bucket;
+the tasks retry on database errors. ``backfill`` recomputes any range of days
+from the source tables (``manage.py backfill_metrics``), and yesterday and
+today every night. ``load_series`` reads any number of series over any period
+in one range query.
+"""
+from collections import defaultdict
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+ZERO = Decimal('0')
+
+
+def dimension(name, value):
+    return f'{name}={value}'
+
+
+def local_day(value):
+    return timezone.localdate(value)
+
+
+def signup_deltas(user):
+    """Buckets moved by a new user, as ``(metric, dimension, day, count, amount)``."""
+    day = local_day(user.date_joined)
+    return [
+        ('signups', dim, day, 1, ZERO)
+        for dim in ('', dimension('country', user.country), dimension('user_type', user.user_type))
+    ]
+
+
+def project_deltas(project):
+    """Buckets moved by a new project."""
+    day = local_day(project.created_at)
+    dims = ['', dimension('country', project.country)]
+    if project.category_id:
+        dims.append(dimension('category', project.category_id))
+    return [('projects', dim, day, 1, ZERO) for dim in dims]
+
+
+def payment_deltas(investment, old_status, new_status):
+    """Buckets moved by a payment status transition."""
+    amount = investment.amount
+    day = local_day(investment.invested_at)
+    deltas = [('investments', dimension('status', new_status), day, 1, amount)]
+    if old_status:
+        deltas.append(('investments', dimension('status', old_status), day, -1, -amount))
+
+    sign = (new_status == 'completed') - (old_status == 'completed')
+    if sign and investment.payment_completed_at:
+        project = investment.project
+        day = local_day(investment.payment_completed_at)
+        dims = ['', dimension('country', project.country)]
+        if project.category_id:
+            dims.append(dimension('category', project.category_id))
+        deltas.extend(('funding', dim, day, sign, sign * amount) for dim in dims)
+    return deltas
+
+
+def apply_deltas(deltas):
+    """
+    Add ``deltas`` to their buckets, one ``UPDATE`` (or insert) per bucket,
+    all or nothing so that a retried task never counts twice.
+    """
+    from .models import DailyMetric
+
+    merged = defaultdict(lambda: [0, ZERO])
+    for metric, dim, day, count, amount in deltas:
+        merged[metric, dim, day][0] += count
+        merged[metric, dim, day][1] += amount
+
+    with transaction.atomic():
+        for (metric, dim, day), (count, amount) in merged.items():
+            if not count and not amount:
+                continue
+            bucket = DailyMetric.objects.filter(metric=metric, dimension=dim, day=day)
+            changes = {'count': F('count') + count, 'amount': F('amount') + amount}
+            if bucket.update(**changes):
+                continue
+            try:
+                with transaction.atomic():
+                    DailyMetric.objects.create(metric=metric, dimension=dim, day=day, count=count, amount=amount)
+            except IntegrityError:
+                # Created concurrently
+                bucket.update(**changes)
+
+
+def start_of_day(day):
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def backfill(first_day, last_day):
+    """
+    Recompute the buckets of ``first_day`` to ``last_day`` (included). Return
+    the rows written.
+
+    The buckets of those days are locked before the source tables are read,
+    so increments applied meanwhile wait and land on top of the rewritten
+    buckets instead of being wiped by it. A bucket created concurrently makes
+    the backfill fail with ``IntegrityError``, to be run again.
+    """
+    from .models import DailyMetric
+
+    with transaction.atomic():
+        list(DailyMetric.objects.select_for_update().filter(
+            day__gte=first_day, day__lte=last_day
+        ).values_list('pk', flat=True))
+        buckets = source_buckets(first_day, last_day)
+        DailyMetric.objects.filter(day__gte=first_day, day__lte=last_day).delete()
+        DailyMetric.objects.bulk_create([
+            DailyMetric(metric=metric, dimension=dim, day=day, count=count, amount=amount)
+            for (metric, dim, day), (count, amount) in buckets.items()
+        ], batch_size=1000)
+    return len(buckets)
+
+
+def source_buckets(first_day, last_day):
+    """Return ``{(metric, dimension, day): [count, amount]}`` computed from the source tables."""
+    from apps.accounts.models import User
+    from apps.investments.models import Investment
+    from apps.projects.models import Project
+
+    start, end = start_of_day(first_day), start_of_day(last_day + timedelta(days=1))
+    buckets = defaultdict(lambda: [0, ZERO])
+
+    def add(metric, dims, day, count, amount=ZERO):
+        for dim in dims:
+            buckets[metric, dim, day][0] += count
+            buckets[metric, dim, day][1] += amount or ZERO
+
+    for row in (
+        User.objects.filter(date_joined__gte=start, date_joined__lt=end)
+        .annotate(day=TruncDate('date_joined'))
+        .values('day', 'country', 'user_type').annotate(count=Count('pk')).order_by()
+    ):
+        add('signups', [
+            '', dimension('country', row['country']), dimension('user_type', row['user_type'])
+        ], row['day'], row['count'])
+
+    for row in (
+        Project.objects.filter(created_at__gte=start, created_at__lt=end)
+        .annotate(day=TruncDate('created_at'))
+        .values('day', 'country', 'category_id').annotate(count=Count('pk')).order_by()
+    ):
+        dims = ['', dimension('country', row['country'])]
+        if row['category_id']:
+            dims.append(dimension('category', row['category_id']))
+        add('projects', dims, row['day'], row['count'])
+
+    for row in (
+        Investment.objects.filter(invested_at__gte=start, invested_at__lt=end)
+        .annotate(day=TruncDate('invested_at'))
+        .values('day', 'payment_status').annotate(count=Count('pk'), total=Sum('amount')).order_by()
+    ):
+        add('investments', [dimension('status', row['payment_status'])], row['day'], row['count'], row['total'])
+
+    for row in (
+        Investment.objects.filter(
+            payment_status='completed', payment_completed_at__gte=start, payment_completed_at__lt=end
+        )
+        .annotate(day=TruncDate('payment_completed_at'))
+        .values('day', 'project__country', 'project__category_id')
+        .annotate(count=Count('pk'), total=Sum('amount')).order_by()
+    ):
+        dims = ['', dimension('country', row['project__country'])]
+        if row['project__category_id']:
+            dims.append(dimension('category', row['project__category_id']))
+        add('funding', dims, row['day'], row['count'], row['total'])
+    return buckets
+
+
+def load_series(keys, days, last_day=None):
+    """
+    Daily values of the ``(metric, dimension)`` series in ``keys`` over the
+    ``days`` days ending ``last_day`` (today by default), in one query.
+    Return ``{key: [{'date': ..., 'count': ..., 'amount': ...}, ...]}``.
+    """
+    from .models import DailyMetric
+
+    last_day = last_day or timezone.localdate()
+    first_day = last_day - timedelta(days=days - 1)
+    keys = list(keys)
+    matches = Q()
+    for metric, dim in keys:
+        matches |= Q(metric=metric, dimension=dim)
+    values = {
+        (metric, dim, day): (count, amount)
+        for metric, dim, day, count, amount in DailyMetric.objects.filter(
+            matches, day__gte=first_day, day__lte=last_day
+        ).values_list('metric', 'dimension', 'day', 'count', 'amount')
+    }
+    series = {}
+    for metric, dim in keys:
+        points = []
+        for offset in range(days):
+            day = first_day + timedelta(days=offset)
+            count, amount = values.get((metric, dim, day), (0, ZERO))
+            points.append({'date': day.isoformat(), 'count': count, 'amount': amount})
+        series[metric, dim] = points
+    return series
@@ -0,0 +1,35 @@
+"""
+Signals for metrics app.
+"""
+from django.db import transaction
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+from apps.accounts.models import User
+from apps.investments.signals import payment_status_changed
+from apps.projects.models import Project
+from . import tasks
+
+
+@receiver(post_save, sender=User)
+def count_signup(sender, instance, created, raw=False, **kwargs):
+    """Count new users once committed."""
+    if created and not raw:
+        user_id = str(instance.pk)
+        transaction.on_commit(lambda: tasks.record_signup.delay(user_id))
+
+
+@receiver(post_save, sender=Project)
+def count_project(sender, instance, created, raw=False, **kwargs):
+    """Count new projects once committed."""
+    if created and not raw:
+        project_id = str(instance.pk)
+        transaction.on_commit(lambda: tasks.record_project.delay(project_id))
+
+
+@receiver(payment_status_changed)
+def count_payment_transition(sender, investment, old_status, new_status, **kwargs):
+    """Move the investment and funding buckets once the transition is committed."""
+    investment_id = str(investment.pk)
+    transaction.on_commit(
+        lambda: tasks.record_payment_transition.delay(investment_id, old_status, new_status)
+    )
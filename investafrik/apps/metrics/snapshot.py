@@ -0,0 +1,189 @@
+"""
+Admin dashboard snapshot.
+
+The whole payload of the admin dashboard (totals, growth, rates, top and
+recent lists, chart series) is computed by ``build_snapshot`` in about fifteen
+aggregate queries, off the request: a beat task refreshes it every
+``ADMIN_DASHBOARD_REFRESH_MINUTES`` and staff can refresh it on demand. The
+page reads the cached snapshot, stamped with its ``generated_at`` time, so it
+costs no query whatever the size of the tables.
+"""
+from datetime import timedelta
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.db.models import Count, Q, Sum
+from django.utils import timezone
+
+from .rollups import load_series
+
+CACHE_KEY = 'admin_dashboard:snapshot'
+# Periods (in days) the evolution charts can show
+CHART_PERIODS = (30, 90, 365)
+TOP_SIZE = 5
+
+
+def full_name(first_name, last_name):
+    return f'{first_name} {last_name}'.strip()
+
+
+def percentage(part, total):
+    return (part / total * 100) if total else 0
+
+
+def build_snapshot(now=None):
+    """Compute the admin dashboard payload."""
+    from apps.accounts.models import User
+    from apps.categories.models import Category
+    from apps.investments.models import Investment
+    from apps.projects.models import Project
+
+    now = now or timezone.now()
+    last_30_days = now - timedelta(days=30)
+    last_7_days = now - timedelta(days=7)
+
+    users = User.objects.aggregate(
+        total=Count('pk'),
+        porteurs=Count('pk', filter=Q(user_type='porteur')),
+        investisseurs=Count('pk', filter=Q(user_type='investisseur')),
+        new_30d=Count('pk', filter=Q(date_joined__gte=last_30_days)),
+        new_7d=Count('pk', filter=Q(date_joined__gte=last_7_days)),
+    )
+    projects = Project.objects.aggregate(
+        total=Count('pk'),
+        active=Count('pk', filter=Q(status='active')),
+        successful=Count('pk', filter=Q(status='successful')),
+        goal_amount=Sum('goal_amount'),
+        new_30d=Count('pk', filter=Q(created_at__gte=last_30_days)),
+        new_7d=Count('pk', filter=Q(created_at__gte=last_7_days)),
+    )
+    investments = Investment.objects.aggregate(
+        total=Count('pk'),
+        completed=Count('pk', filter=Q(payment_status='completed')),
+        raised=Sum('amount', filter=Q(payment_status='completed')),
+        new_30d=Count('pk', filter=Q(invested_at__gte=last_30_days)),
+        new_7d=Count('pk', filter=Q(invested_at__gte=last_7_days)),
+    )
+    # Users who created a project or invested, without a users x projects x investments join
+    active_users = User.objects.filter(
+        Q(pk__in=Project.objects.values('owner_id')) | Q(pk__in=Investment.objects.values('investor_id'))
+    ).count()
+
+    total_raised = investments['raised'] or Decimal('0')
+    total_goal = projects['goal_amount'] or Decimal('0')
+
+    projects_by_category = [
+        {'name': name, 'projects_total': count, 'total_raised': raised or Decimal('0')}
+        for name, count, raised in Category.objects.annotate(
+            projects_total=Count('projects'), raised=Sum('projects__current_amount')
+        ).order_by('-projects_total', 'name').values_list('name', 'projects_total', 'raised')
+    ]
+    top_projects = [
+        {'title': title, 'owner_name': full_name(first, last), 'total_raised': raised}
+        for title, first, last, raised in Project.objects.order_by('-current_amount').values_list(
+            'title', 'owner__first_name', 'owner__last_name', 'current_amount'
+        )[:TOP_SIZE]
+    ]
+    top_investors = [
+        {'full_name': full_name(first, last), 'investment_count': count, 'total_invested': total}
+        for first, last, count, total in Investment.objects.filter(
+            payment_status='completed', investor__user_type='investisseur'
+        ).values('investor_id').annotate(
+            count=Count('pk'), total=Sum('amount')
+        ).order_by('-total').values_list(
+            'investor__first_name', 'investor__last_name', 'count', 'total'
+        )[:TOP_SIZE]
+    ]
+    recent_projects = [
+        {'title': title, 'goal_amount': goal, 'created_at': created_at}
+        for title, goal, created_at in Project.objects.order_by('-created_at').values_list(
+            'title', 'goal_amount', 'created_at'
+        )[:TOP_SIZE]
+    ]
+    recent_investments = [
+        {'amount': amount, 'investor_name': full_name(first, last), 'invested_at': invested_at}
+        for amount, first, last, invested_at in Investment.objects.filter(
+            payment_status='completed'
+        ).order_by('-invested_at').values_list(
+            'amount', 'investor__first_name', 'investor__last_name', 'invested_at'
+        )[:TOP_SIZE]
+    ]
+    recent_users = [
+        {'full_name': full_name(first, last), 'user_type': user_type, 'date_joined': date_joined}
+        for first, last, user_type, date_joined in User.objects.order_by('-date_joined').values_list(
+            'first_name', 'last_name', 'user_type', 'date_joined'
+        )[:TOP_SIZE]
+    ]
+    users_by_country = list(
+        User.objects.values('country').annotate(count=Count('pk')).order_by('-count')[:10]
+    )
+
+    longest = max(CHART_PERIODS)
+    series = load_series([('signups', ''), ('funding', '')], longest, timezone.localdate(now))
+    user_registrations = {
+        days: [{'date': p['date'], 'count': p['count']} for p in series['signups', ''][longest - days:]]
+        for days in CHART_PERIODS
+    }
+    investment_evolution = {
+        days: [{'date': p['date'], 'amount': float(p['amount'])} for p in series['funding', ''][longest - days:]]
+        for days in CHART_PERIODS
+    }
+
+    return {
+        'generated_at': now,
+
+        # Statistiques générales
+        'total_users': users['total'],
+        'total_porteurs': users['porteurs'],
+        'total_investisseurs': users['investisseurs'],
+        'total_projects': projects['total'],
+        'active_projects': projects['active'],
+        'successful_projects': projects['successful'],
+        'total_investments': investments['total'],
+        'completed_investments': investments['completed'],
+
+        # Montants
+        'total_amount_raised': total_raised,
+        'total_goal_amount': total_goal,
+        'funding_percentage': percentage(total_raised, total_goal),
+
+        # Croissance
+        'new_users_30d': users['new_30d'],
+        'new_projects_30d': projects['new_30d'],
+        'new_investments_30d': investments['new_30d'],
+        'new_users_7d': users['new_7d'],
+        'new_projects_7d': projects['new_7d'],
+        'new_investments_7d': investments['new_7d'],
+
+        # Taux
+        'conversion_rate': percentage(active_users, users['total']),
+        'success_rate': percentage(projects['successful'], projects['total']),
+
+        # Listes
+        'projects_by_category': projects_by_category,
+        'top_projects': top_projects,
+        'top_investors': top_investors,
+        'recent_projects': recent_projects,
+        'recent_investments': recent_investments,
+        'recent_users': recent_users,
+        'users_by_country': users_by_country,
+
+        # Données pour graphiques, par période
+        'user_registrations': user_registrations,
+        'investment_evolution': investment_evolution,
+    }
+
+
+def refresh_snapshot():
+    """Compute a new snapshot and serve it from now on."""
+    snapshot = build_snapshot()
+    cache.set(CACHE_KEY, snapshot, None)
+    return snapshot
+
+
+def get_snapshot():
+    """The current snapshot, computed now if there is none yet."""
+    snapshot = cache.get(CACHE_KEY)
+    if snapshot is None:
+        snapshot = refresh_snapshot()
+    return snapshot
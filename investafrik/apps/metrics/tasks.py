@@ -0,0 +1,58 @@
+"""
+Celery tasks for metrics app.
+"""
+from datetime import timedelta
+
+from celery import shared_task
+from django.db import IntegrityError, OperationalError
+from django.utils import timezone
+
+from . import rollups
+
+# Buckets recomputed each night: late changes of yesterday, and today so far
+BACKFILL_DAYS = 2
+
+
+@shared_task(autoretry_for=(OperationalError,), retry_backoff=True, max_retries=5)
+def record_signup(user_id):
+    """Count a new user in the daily buckets."""
+    from apps.accounts.models import User
+
+    user = User.objects.filter(pk=user_id).first()
+    if user is not None:
+        rollups.apply_deltas(rollups.signup_deltas(user))
+
+
+@shared_task(autoretry_for=(OperationalError,), retry_backoff=True, max_retries=5)
+def record_project(project_id):
+    """Count a new project in the daily buckets."""
+    from apps.projects.models import Project
+
+    project = Project.objects.filter(pk=project_id).first()
+    if project is not None:
+        rollups.apply_deltas(rollups.project_deltas(project))
+
+
+@shared_task(autoretry_for=(OperationalError,), retry_backoff=True, max_retries=5)
+def record_payment_transition(investment_id, old_status, new_status):
+    """Move the daily buckets of an investment changing payment status."""
+    from apps.investments.models import Investment
+
+    investment = Investment.objects.select_related('project').filter(pk=investment_id).first()
+    if investment is not None:
+        rollups.apply_deltas(rollups.payment_deltas(investment, old_status, new_status))
+
+
+@shared_task(autoretry_for=(OperationalError, IntegrityError), retry_backoff=True, max_retries=5)
+def backfill_recent_metrics(days=BACKFILL_DAYS):
+    """Recompute the buckets of the last ``days`` days from the source tables."""
+    last_day = timezone.localdate()
+    return rollups.backfill(last_day - timedelta(days=days - 1), last_day)
+
+
+@shared_task
+def refresh_admin_dashboard():
+    """Recompute the admin dashboard snapshot."""
+    from .snapshot import refresh_snapshot
+
+    refresh_snapshot()
@@ -5,14 +5,18 @@ from rest_framework import viewsets, generics, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
+from django.utils import timezone
+from apps.core.conditional import ConditionalGetMixin
 from .models import Notification
 from .serializers import NotificationSerializer
 
 
-class NotificationViewSet(viewsets.ReadOnlyModelViewSet):
+class NotificationViewSet(ConditionalGetMixin, viewsets.ReadOnlyModelViewSet):
     """ViewSet for notifications."""
     serializer_class = NotificationSerializer
     permission_classes = [IsAuthenticated]
+    # Notifications only change when they are read.
+    conditional_fields = ('created_at', 'read_at')
     
     def get_queryset(self):
         return Notification.objects.filter(user=self.request.user)
@@ -33,5 +37,5 @@ class MarkAllReadView(generics.GenericAPIView):
         Notification.objects.filter(
             user=request.user, 
             is_read=False
-        ).update(is_read=True)
+        ).update(is_read=True, read_at=timezone.now())
         return Response({'message': 'Toutes les notifications marquées comme lues'})
\ No newline at end of file
@@ -2,7 +2,9 @@
 Admin configuration for projects app.
 """
 from django.contrib import admin
+from django.db import transaction
 from django.utils.html import format_html
+from .counters import refresh_comments_count
 from .models import Project, ProjectImage, ProjectUpdate, ProjectComment, SavedProject
 
 
@@ -79,12 +81,19 @@ class ProjectCommentAdmin(admin.ModelAdmin):
     actions = ['approve_comments', 'reject_comments']
     
     def approve_comments(self, request, queryset):
-        queryset.update(is_approved=True)
+        self.set_approved(queryset, True)
     approve_comments.short_description = "Approuver les commentaires sélectionnés"
     
     def reject_comments(self, request, queryset):
-        queryset.update(is_approved=False)
+        self.set_approved(queryset, False)
     reject_comments.short_description = "Rejeter les commentaires sélectionnés"
+    
+    def set_approved(self, queryset, value):
+        # Mise à jour en masse : les compteurs des projets sont recalculés ensuite
+        project_ids = set(queryset.values_list('project_id', flat=True))
+        with transaction.atomic():
+            queryset.update(is_approved=value)
+            refresh_comments_count(project_ids)
 
 
 @admin.register(SavedProject)
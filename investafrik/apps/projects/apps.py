@@ -1,7 +1,12 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
 
 
 class ProjectsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.projects'
-    verbose_name = 'Projets'
\ No newline at end of file
+    verbose_name = 'Projets'
+    
+    def ready(self):
+        import apps.projects.signals
+        post_migrate.connect(apps.projects.signals.create_search_schema, sender=self)
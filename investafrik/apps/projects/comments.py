@@ -0,0 +1,53 @@
+"""
+Comment threads for projects.
+"""
+from django.db.models import Q
+
+from .models import ProjectComment
+
+
+def build_comment_tree(comments):
+    """
+    Assemble a flat list of comments into a tree, in memory.
+
+    Each comment gets a ``children`` list of its direct replies, and each
+    top-level comment a ``thread`` list of all its replies at any depth. Both
+    keep the order of ``comments`` (order by ``path`` for depth-first threads).
+    Replies whose parent is not in ``comments`` (e.g. an unapproved parent)
+    are dropped. Return the top-level comments.
+    """
+    by_id = {comment.pk: comment for comment in comments}
+    roots = []
+    for comment in comments:
+        comment.children = []
+        comment.thread = []
+    for comment in comments:
+        if comment.parent_id is None:
+            roots.append(comment)
+            continue
+        parent = by_id.get(comment.parent_id)
+        root = parent
+        while root is not None and root.parent_id is not None:
+            root = by_id.get(root.parent_id)
+        if root is not None:
+            parent.children.append(comment)
+            root.thread.append(comment)
+    return roots
+
+
+def load_threads(roots):
+    """
+    Attach the approved replies of ``roots`` (top-level comments of one
+    project) with a single query. Return ``roots``.
+    """
+    roots = list(roots)
+    if not roots:
+        return roots
+    in_threads = Q()
+    for root in roots:
+        in_threads |= Q(path__startswith=f'{root.path}/')
+    replies = ProjectComment.objects.filter(
+        in_threads, project_id=roots[0].project_id, is_approved=True, depth__gt=0
+    ).select_related('user', 'user__profile').order_by('path')
+    build_comment_tree(roots + list(replies))
+    return roots
@@ -0,0 +1,152 @@
+"""
+Denormalized funding counters for projects.
+
+``Project.current_amount`` and ``Project.investor_count`` are maintained with
+atomic ``F()`` deltas when an investment enters or leaves the ``completed``
+payment status, instead of re-aggregating every investment of the project on
+each payment. ``reconcile_counters`` re-derives both values in bulk and
+reports (and optionally repairs) any drift.
+
+``Project.comments_count`` (approved comments) is maintained the same way
+when a comment is created, deleted, approved or rejected.
+
+Every counter write also bumps ``Project.updated_at``, which the API uses as
+its ETag / Last-Modified validator.
+"""
+from collections import namedtuple
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Count, F, Sum
+from django.utils import timezone
+
+COMPLETED = 'completed'
+
+CounterDrift = namedtuple(
+    'CounterDrift',
+    ['project_id', 'current_amount', 'expected_amount', 'investor_count', 'expected_investors'],
+)
+
+
+def apply_payment_transition(investment, old_status, new_status):
+    """Apply the counter delta for a single payment status transition."""
+    from apps.investments.models import Investment
+    from .models import Project
+
+    if new_status == COMPLETED and old_status != COMPLETED:
+        sign = 1
+    elif old_status == COMPLETED and new_status != COMPLETED:
+        sign = -1
+    else:
+        return
+
+    # The investor only counts once per project, whatever the number of
+    # completed investments they made in it.
+    has_other_completed = Investment.objects.filter(
+        project_id=investment.project_id,
+        investor_id=investment.investor_id,
+        payment_status=COMPLETED,
+    ).exclude(pk=investment.pk).exists()
+    investor_delta = 0 if has_other_completed else sign
+
+    Project.objects.filter(pk=investment.project_id).update(
+        current_amount=F('current_amount') + sign * investment.amount,
+        investor_count=F('investor_count') + investor_delta,
+        updated_at=timezone.now(),
+    )
+
+    # Keep an already loaded project instance in line with the database.
+    if Investment.project.is_cached(investment):
+        investment.project.refresh_from_db(fields=['current_amount', 'investor_count'])
+
+
+def completed_totals(project_ids):
+    """Return ``{project_id: (amount, investors)}`` for completed investments."""
+    from apps.investments.models import Investment
+
+    rows = Investment.objects.filter(
+        project_id__in=project_ids,
+        payment_status=COMPLETED,
+    ).values('project_id').annotate(
+        total=Sum('amount'),
+        investors=Count('investor', distinct=True),
+    ).order_by()
+    return {row['project_id']: (row['total'], row['investors']) for row in rows}
+
+
+def reconcile_counters(project_ids=None, fix=True, batch_size=500):
+    """
+    Re-derive funding counters in bulk and return the list of drifts found.
+
+    Projects are processed in primary key batches: one grouped aggregate over
+    the completed investments of the batch, then a single ``bulk_update`` of
+    the drifted rows when ``fix`` is true.
+    """
+    from .models import Project
+
+    queryset = Project.objects.order_by('pk')
+    if project_ids is not None:
+        queryset = queryset.filter(pk__in=project_ids)
+
+    drifts = []
+    last_pk = None
+    while True:
+        batch = queryset
+        if last_pk is not None:
+            batch = batch.filter(pk__gt=last_pk)
+        batch = list(batch.only('id', 'current_amount', 'investor_count')[:batch_size])
+        if not batch:
+            break
+        last_pk = batch[-1].pk
+
+        totals = completed_totals([project.pk for project in batch])
+        to_update = []
+        for project in batch:
+            expected_amount, expected_investors = totals.get(project.pk, (Decimal('0'), 0))
+            if project.current_amount != expected_amount or project.investor_count != expected_investors:
+                drifts.append(CounterDrift(
+                    project.pk, project.current_amount, expected_amount,
+                    project.investor_count, expected_investors,
+                ))
+                project.current_amount = expected_amount
+                project.investor_count = expected_investors
+                project.updated_at = timezone.now()
+                to_update.append(project)
+
+        if fix and to_update:
+            with transaction.atomic():
+                Project.objects.bulk_update(to_update, ['current_amount', 'investor_count', 'updated_at'])
+
+    return drifts
+
+
+def apply_comment_transition(project_id, old_approved, new_approved):
+    """Apply the comments count delta for a comment approval change.
+
+    ``old_approved`` is None for a new comment and ``new_approved`` is None
+    for a deleted one.
+    """
+    from .models import Project
+
+    delta = int(bool(new_approved)) - int(bool(old_approved))
+    if delta:
+        Project.objects.filter(pk=project_id).update(
+            comments_count=F('comments_count') + delta, updated_at=timezone.now()
+        )
+
+
+def refresh_comments_count(project_ids):
+    """Recount approved comments of ``project_ids`` after a bulk update."""
+    from .models import Project, ProjectComment
+
+    counts = dict(
+        ProjectComment.objects.filter(project_id__in=project_ids, is_approved=True)
+        .values('project_id').annotate(total=Count('pk')).order_by()
+        .values_list('project_id', 'total')
+    )
+    projects = list(Project.objects.filter(pk__in=project_ids).only('id', 'comments_count'))
+    now = timezone.now()
+    for project in projects:
+        project.comments_count = counts.get(project.pk, 0)
+        project.updated_at = now
+    Project.objects.bulk_update(projects, ['comments_count', 'updated_at'])
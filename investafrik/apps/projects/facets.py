@@ -0,0 +1,127 @@
+"""
+Facet counts of project listings (categories, countries, statuses).
+
+Counts come from one ``GROUP BY (category, country, status)`` query over the
+projects matching the search. Each facet is then summed in Python with the
+selected values of the *other* facets applied, so a facet keeps showing its
+alternatives once one of its values is selected.
+
+Results are cached per normalized set of parameters under a version key.
+``invalidate_facets`` replaces the version whenever projects are created,
+deleted or change status, which retires every cached entry at once; other
+edits (category or country of a project) are picked up within
+``CACHE_TIMEOUT``.
+"""
+import hashlib
+import uuid
+
+from django.core.cache import cache
+from django.db.models import Count
+
+from .search import fold, get_search_backend
+
+FACETS = {
+    'category': 'category_id',
+    'country': 'country',
+    'status': 'status',
+}
+CACHE_VERSION_KEY = 'project_facets:version'
+CACHE_TIMEOUT = 10 * 60
+
+
+def normalize_params(params):
+    """Return the ``(name, value)`` pairs of ``params`` that select facet counts."""
+    normalized = []
+    for name in FACETS:
+        value = (params.get(name) or '').strip()
+        if value:
+            normalized.append((name, value.upper() if name == 'country' else value.lower()))
+    search = ' '.join(fold(params.get('search') or '').split())
+    if search:
+        normalized.append(('search', search))
+    return tuple(normalized)
+
+
+def facet_counts(queryset, selected):
+    """
+    Count the projects of ``queryset`` per facet value. ``selected`` maps
+    facet names to the (normalized) values filtered on.
+    """
+    from .models import Project
+
+    rows = list(
+        queryset.order_by()
+        .values('category_id', 'category__name', 'category__slug', 'country', 'status')
+        .annotate(total=Count('pk'))
+    )
+
+    def matches(row, facet):
+        return all(
+            str(row[FACETS[name]]).lower() == value.lower()
+            for name, value in selected.items() if name != facet
+        )
+
+    categories, countries, statuses = {}, {}, {}
+    for row in rows:
+        if matches(row, 'category') and row['category_id'] is not None:
+            entry = categories.setdefault(row['category_id'], {
+                'id': row['category_id'],
+                'name': row['category__name'],
+                'slug': row['category__slug'],
+                'count': 0,
+            })
+            entry['count'] += row['total']
+        if matches(row, 'country'):
+            entry = countries.setdefault(row['country'], {'code': row['country'], 'count': 0})
+            entry['count'] += row['total']
+        if matches(row, 'status'):
+            entry = statuses.setdefault(row['status'], {'value': row['status'], 'count': 0})
+            entry['count'] += row['total']
+
+    labels = dict(Project.STATUS_CHOICES)
+    for entry in statuses.values():
+        entry['label'] = labels.get(entry['value'], entry['value'])
+
+    def ranked(entries, label):
+        return sorted(entries.values(), key=lambda entry: (-entry['count'], entry[label]))
+
+    return {
+        'category': ranked(categories, 'name'),
+        'country': ranked(countries, 'code'),
+        'status': ranked(statuses, 'value'),
+    }
+
+
+def cache_key(normalized):
+    version = cache.get(CACHE_VERSION_KEY)
+    if version is None:
+        version = uuid.uuid4().hex
+        if not cache.add(CACHE_VERSION_KEY, version, None):
+            version = cache.get(CACHE_VERSION_KEY, version)
+    digest = hashlib.md5(repr(normalized).encode()).hexdigest()
+    return f'project_facets:{version}:{digest}'
+
+
+def get_facets(params):
+    """
+    Cached facet counts for the listing described by ``params`` (``category``,
+    ``country``, ``status`` and ``search`` query parameters).
+    """
+    from .models import Project
+
+    normalized = normalize_params(params)
+    key = cache_key(normalized)
+    facets = cache.get(key)
+    if facets is None:
+        selected = {name: value for name, value in normalized if name in FACETS}
+        search = dict(normalized).get('search')
+        queryset = Project.objects.all()
+        if search:
+            queryset = get_search_backend().filter_queryset(queryset, search)
+        facets = facet_counts(queryset, selected)
+        cache.set(key, facets, CACHE_TIMEOUT)
+    return facets
+
+
+def invalidate_facets():
+    cache.set(CACHE_VERSION_KEY, uuid.uuid4().hex, None)
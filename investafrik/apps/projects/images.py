@@ -0,0 +1,144 @@
+"""
+Resized derivatives of project images.
+
+Uploaded images (``Project.featured_image``, ``ProjectImage.image``) are
+re-encoded off the request path into a fixed set of widths (``VARIANTS``), in
+WebP and JPEG. Derivatives are stored under a path derived from the SHA-256 of
+the original file, so uploading the same photo again costs nothing: the
+derivatives already exist and only the hash is recorded on the model.
+
+Resizing is CPU bound and runs in the Celery task itself: the worker
+concurrency is what renders several images in parallel.
+"""
+import hashlib
+import io
+import logging
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image, ImageOps
+
+logger = logging.getLogger(__name__)
+
+# name -> target width in pixels (height follows the aspect ratio)
+VARIANTS = {
+    'thumb': 320,
+    'card': 640,
+    'hero': 1600,
+}
+FORMATS = {
+    'webp': ('WEBP', {'quality': 80, 'method': 4}),
+    'jpg': ('JPEG', {'quality': 82, 'optimize': True, 'progressive': True}),
+}
+DERIVATIVES_DIR = 'derivatives'
+
+
+def content_hash(field_file):
+    """Return the SHA-256 hex digest of a stored file."""
+    digest = hashlib.sha256()
+    field_file.open('rb')
+    try:
+        for chunk in field_file.chunks():
+            digest.update(chunk)
+    finally:
+        field_file.close()
+    return digest.hexdigest()
+
+
+def derivative_path(image_hash, variant, extension):
+    return f'{DERIVATIVES_DIR}/{image_hash[:2]}/{image_hash}/{variant}.{extension}'
+
+
+def derivative_url(image_hash, variant, extension):
+    return default_storage.url(derivative_path(image_hash, variant, extension))
+
+
+def render_variants(data):
+    """Return ``{(variant, extension): bytes}`` for the image ``data``."""
+    with Image.open(io.BytesIO(data)) as source:
+        image = ImageOps.exif_transpose(source).convert('RGB')
+    rendered = {}
+    for variant, width in VARIANTS.items():
+        resized = image
+        if image.width > width:
+            height = round(image.height * width / image.width)
+            resized = image.resize((width, height), Image.LANCZOS)
+        for extension, (image_format, options) in FORMATS.items():
+            buffer = io.BytesIO()
+            resized.save(buffer, image_format, **options)
+            rendered[(variant, extension)] = buffer.getvalue()
+    return rendered
+
+
+def has_derivatives(image_hash):
+    return all(
+        default_storage.exists(derivative_path(image_hash, variant, extension))
+        for variant in VARIANTS for extension in FORMATS
+    )
+
+
+def generate_derivatives(field_files):
+    """
+    Make sure every file of ``field_files`` has its derivatives stored.
+    Return the content hash of each file (None when it cannot be decoded).
+    """
+    hashes = []
+    for field_file in field_files:
+        try:
+            hashes.append(content_hash(field_file))
+        except OSError:
+            logger.warning('Image introuvable : %s', field_file.name)
+            hashes.append(None)
+    pending = {}
+    for field_file, image_hash in zip(field_files, hashes):
+        if image_hash and image_hash not in pending and not has_derivatives(image_hash):
+            pending[image_hash] = field_file
+
+    if pending:
+        sources = []
+        for field_file in pending.values():
+            field_file.open('rb')
+            try:
+                sources.append(field_file.read())
+            finally:
+                field_file.close()
+        for image_hash, rendered in zip(list(pending), map(_safe_render, sources)):
+            if rendered is None:
+                hashes = [None if h == image_hash else h for h in hashes]
+                continue
+            for (variant, extension), data in rendered.items():
+                path = derivative_path(image_hash, variant, extension)
+                if not default_storage.exists(path):
+                    default_storage.save(path, ContentFile(data))
+    return hashes
+
+
+def _safe_render(data):
+    try:
+        return render_variants(data)
+    except (OSError, ValueError, Image.DecompressionBombError):
+        logger.warning("Impossible de générer les dérivés d'une image", exc_info=True)
+        return None
+
+
+def variant_urls(image_hash, build_url=None):
+    """
+    Return the derivative URLs and ``srcset`` strings of an image hash.
+    ``build_url`` can turn storage URLs into absolute ones.
+    """
+    if not image_hash:
+        return None
+
+    def url(variant, extension):
+        value = derivative_url(image_hash, variant, extension)
+        return build_url(value) if build_url else value
+
+    return {
+        'src': url('card', 'jpg'),
+        'srcset': ', '.join(f'{url(variant, "jpg")} {width}w' for variant, width in VARIANTS.items()),
+        'webp_srcset': ', '.join(f'{url(variant, "webp")} {width}w' for variant, width in VARIANTS.items()),
+        'variants': {
+            variant: {extension: url(variant, extension) for extension in FORMATS}
+            for variant in VARIANTS
+        },
+    }
@@ -0,0 +1,128 @@
+"""
+Campaign lifecycle: closing expired funding campaigns.
+
+Active projects whose ``end_date`` has passed become ``successful`` when they
+reached their goal and ``failed`` otherwise. Expired projects are selected in
+chunks through the ``(status, end_date, id)`` index and closed with two
+set-based ``UPDATE`` statements per chunk, never with per-row saves.
+
+Follow-up work for each chunk (owner and investor notifications, refund
+eligibility of completed investments in failed projects) is queued as one
+Celery task once the chunk is committed, and is applied in bulk too.
+"""
+from collections import namedtuple
+
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+ClosedCampaigns = namedtuple('ClosedCampaigns', ['successful', 'failed'])
+
+
+def expired_campaigns(today=None):
+    """Active projects whose funding period is over."""
+    from .models import Project
+
+    today = today or timezone.localdate()
+    return Project.objects.filter(status='active', end_date__lt=today)
+
+
+def close_expired_campaigns(today=None, batch_size=500, dry_run=False):
+    """
+    Close expired campaigns chunk by chunk. Return a ``ClosedCampaigns`` of
+    the project ids moved to each status.
+    """
+    from .models import Project
+    from .signals import project_status_changed
+    from .tasks import queue_campaign_follow_ups
+
+    queryset = expired_campaigns(today).order_by('end_date', 'id')
+    if dry_run:
+        rows = queryset.values_list('id', 'current_amount', 'goal_amount')
+        return ClosedCampaigns(
+            [pk for pk, current, goal in rows if current >= goal],
+            [pk for pk, current, goal in rows if current < goal],
+        )
+
+    closed = ClosedCampaigns([], [])
+    while True:
+        with transaction.atomic():
+            ids = list(queryset.select_for_update(skip_locked=True).values_list('id', flat=True)[:batch_size])
+            if not ids:
+                break
+            chunk = Project.objects.filter(pk__in=ids, status='active')
+            now = timezone.now()
+            successful = list(chunk.filter(current_amount__gte=F('goal_amount')).values_list('id', flat=True))
+            chunk.filter(pk__in=successful).update(status='successful', updated_at=now)
+            failed = list(set(ids) - set(successful))
+            chunk.filter(pk__in=failed).update(status='failed', updated_at=now)
+
+            for status, project_ids in (('successful', successful), ('failed', failed)):
+                if project_ids:
+                    project_status_changed.send(
+                        sender=Project, project_ids=project_ids, old_status='active', new_status=status
+                    )
+            successful_ids = [str(pk) for pk in successful]
+            failed_ids = [str(pk) for pk in failed]
+            transaction.on_commit(
+                lambda s=successful_ids, f=failed_ids: queue_campaign_follow_ups.delay(s, f)
+            )
+        closed.successful.extend(successful)
+        closed.failed.extend(failed)
+    return closed
+
+
+def apply_follow_ups(successful_ids, failed_ids):
+    """
+    Notify owners and investors of closed campaigns and flag refundable
+    investments. Return the number of notifications created.
+    """
+    from apps.investments.models import Investment
+    from apps.notifications.models import Notification
+    from .models import Project
+
+    now = timezone.now()
+    notifications = []
+    projects = Project.objects.filter(pk__in=list(successful_ids) + list(failed_ids)).only(
+        'id', 'title', 'slug', 'owner_id', 'status'
+    )
+    for project in projects:
+        if project.status == 'successful':
+            notifications.append(Notification(
+                user_id=project.owner_id,
+                project=project,
+                notification_type='project_funded',
+                title='Projet financé avec succès',
+                message=f'Félicitations ! Votre projet « {project.title} » a atteint son objectif.',
+                priority='high',
+            ))
+        elif project.status == 'failed':
+            notifications.append(Notification(
+                user_id=project.owner_id,
+                project=project,
+                notification_type='project_failed',
+                title='Campagne terminée',
+                message=f"Votre projet « {project.title} » n'a pas atteint son objectif.",
+            ))
+
+    with transaction.atomic():
+        refundable = Investment.objects.filter(
+            project_id__in=failed_ids,
+            payment_status='completed',
+            refunded_at__isnull=True,
+            refund_eligible_at__isnull=True,
+        )
+        investors = refundable.values_list('investor_id', 'project_id', 'project__title').order_by().distinct()
+        for investor_id, project_id, title in investors:
+            notifications.append(Notification(
+                user_id=investor_id,
+                project_id=project_id,
+                notification_type='project_failed',
+                title='Projet non financé',
+                message=f"Le projet « {title} » n'a pas atteint son objectif. "
+                        f"Votre investissement est éligible au remboursement.",
+                priority='high',
+            ))
+        refundable.update(refund_eligible_at=now)
+        Notification.objects.bulk_create(notifications, batch_size=500)
+    return len(notifications)
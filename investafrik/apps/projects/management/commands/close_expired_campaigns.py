@@ -0,0 +1,41 @@
+"""
+Management command to close expired funding campaigns.
+"""
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+from apps.projects.lifecycle import close_expired_campaigns
+
+
+class Command(BaseCommand):
+    help = 'Move active projects past their end date to successful or failed'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--date',
+            help='Close campaigns that ended before this date (YYYY-MM-DD, default: today)'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=500,
+            help='Number of projects closed per chunk (default: 500)'
+        )
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='Report the campaigns to close without changing them'
+        )
+
+    def handle(self, *args, **options):
+        today = None
+        if options['date']:
+            try:
+                today = date.fromisoformat(options['date'])
+            except ValueError:
+                raise CommandError(f"Invalid date: {options['date']}")
+
+        closed = close_expired_campaigns(
+            today=today, batch_size=options['batch_size'], dry_run=options['dry_run']
+        )
+        verb = 'would be' if options['dry_run'] else 'were'
+        self.stdout.write(self.style.SUCCESS(
+            f'{len(closed.successful)} successful and {len(closed.failed)} failed campaign(s) {verb} closed'
+        ))
@@ -0,0 +1,54 @@
+"""
+Management command to generate missing derivatives of project images.
+"""
+from django.core.management.base import BaseCommand
+from apps.projects.images import generate_derivatives
+from apps.projects.models import Project, ProjectImage
+
+
+class Command(BaseCommand):
+    help = 'Generate resized derivatives of project and gallery images'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=50,
+            help='Number of images resized per batch (default: 50)'
+        )
+        parser.add_argument(
+            '--all', action='store_true',
+            help='Also re-check images that already have derivatives'
+        )
+
+    def handle(self, *args, **options):
+        projects = Project.objects.exclude(featured_image='').exclude(featured_image__isnull=True)
+        gallery = ProjectImage.objects.all()
+        if not options['all']:
+            projects = projects.filter(featured_image_hash='')
+            gallery = gallery.filter(image_hash='')
+
+        batch_size = options['batch_size']
+        processed = self.process(
+            projects.only('id', 'featured_image'), 'featured_image', 'featured_image_hash', batch_size
+        )
+        processed += self.process(gallery.only('id', 'image'), 'image', 'image_hash', batch_size)
+        self.stdout.write(self.style.SUCCESS(f'{processed} image(s) processed'))
+
+    def process(self, queryset, image_field, hash_field, batch_size):
+        model = queryset.model
+        processed = 0
+        batch = []
+        for obj in queryset.iterator(chunk_size=batch_size):
+            batch.append(obj)
+            if len(batch) >= batch_size:
+                processed += self.process_batch(model, batch, image_field, hash_field)
+                batch = []
+        if batch:
+            processed += self.process_batch(model, batch, image_field, hash_field)
+        return processed
+
+    def process_batch(self, model, batch, image_field, hash_field):
+        hashes = generate_derivatives([getattr(obj, image_field) for obj in batch])
+        for obj, image_hash in zip(batch, hashes):
+            setattr(obj, hash_field, image_hash or '')
+        model.objects.bulk_update(batch, [hash_field])
+        return sum(1 for image_hash in hashes if image_hash)
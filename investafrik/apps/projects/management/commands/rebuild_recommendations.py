@@ -0,0 +1,13 @@
+"""
+Management command to rebuild the similar projects recommendations.
+"""
+from django.core.management.base import BaseCommand
+from apps.projects.recommendations import rebuild_recommendations
+
+
+class Command(BaseCommand):
+    help = 'Recompute the similar projects of every active project'
+
+    def handle(self, *args, **options):
+        count = rebuild_recommendations()
+        self.stdout.write(self.style.SUCCESS(f'{count} project(s) processed'))
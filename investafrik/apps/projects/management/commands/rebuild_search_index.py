@@ -0,0 +1,22 @@
+"""
+Management command to rebuild the project full-text search index.
+"""
+from django.core.management.base import BaseCommand
+from apps.projects.models import Project
+from apps.projects.search import get_search_backend
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the full-text search index of projects'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=500,
+            help='Number of projects indexed per batch (default: 500)'
+        )
+
+    def handle(self, *args, **options):
+        indexed = get_search_backend().rebuild(
+            Project.objects.all(), batch_size=options['batch_size']
+        )
+        self.stdout.write(self.style.SUCCESS(f'{indexed} project(s) indexed'))
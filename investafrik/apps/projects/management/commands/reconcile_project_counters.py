@@ -0,0 +1,38 @@
+"""
+Management command to re-derive project funding counters and report drift.
+"""
+from django.core.management.base import BaseCommand
+from apps.projects.counters import reconcile_counters
+
+
+class Command(BaseCommand):
+    help = 'Recompute current_amount and investor_count of projects and report drift'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='Only report drift, do not fix the counters'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=500,
+            help='Number of projects reconciled per batch (default: 500)'
+        )
+
+    def handle(self, *args, **options):
+        drifts = reconcile_counters(
+            fix=not options['dry_run'],
+            batch_size=options['batch_size'],
+        )
+
+        for drift in drifts:
+            self.stdout.write(
+                f'{drift.project_id}: current_amount {drift.current_amount} -> {drift.expected_amount}, '
+                f'investor_count {drift.investor_count} -> {drift.expected_investors}'
+            )
+
+        if not drifts:
+            self.stdout.write(self.style.SUCCESS('No drift found'))
+        elif options['dry_run']:
+            self.stdout.write(self.style.WARNING(f'{len(drifts)} project(s) drifted'))
+        else:
+            self.stdout.write(self.style.SUCCESS(f'{len(drifts)} project(s) fixed'))
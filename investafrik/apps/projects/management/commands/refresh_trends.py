@@ -0,0 +1,13 @@
+"""
+Management command to recompute the trending projects ranking.
+"""
+from django.core.management.base import BaseCommand
+from apps.projects.trending import refresh_trends
+
+
+class Command(BaseCommand):
+    help = 'Recompute the rolling funding windows and the cached trending feed'
+
+    def handle(self, *args, **options):
+        count = refresh_trends()
+        self.stdout.write(self.style.SUCCESS(f'{count} trend(s) updated'))
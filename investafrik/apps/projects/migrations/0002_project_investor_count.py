@@ -0,0 +1,36 @@
+# Generated by Django 5.0.8 on 2026-10-18 11:16
+
+from django.db import migrations, models
+from django.db.models import Count, Sum
+
+
+def backfill_funding_counters(apps, schema_editor):
+    Project = apps.get_model('projects', 'Project')
+    Investment = apps.get_model('investments', 'Investment')
+
+    totals = Investment.objects.filter(payment_status='completed').values('project_id').annotate(
+        total=Sum('amount'),
+        investors=Count('investor', distinct=True),
+    ).order_by()
+    for row in totals.iterator():
+        Project.objects.filter(pk=row['project_id']).update(
+            current_amount=row['total'],
+            investor_count=row['investors'],
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0001_initial'),
+        ('investments', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='project',
+            name='investor_count',
+            field=models.PositiveIntegerField(default=0, help_text="Nombre d'investisseurs uniques (paiements complétés)"),
+        ),
+        migrations.RunPython(backfill_funding_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.0.8 on 2026-10-18 11:21
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('categories', '0001_initial'),
+        ('projects', '0002_project_investor_count'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='project',
+            index=models.Index(fields=['status', 'created_at', 'id'], name='projects_pr_status_598ff9_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='project',
+            index=models.Index(fields=['status', 'goal_amount', 'id'], name='projects_pr_status_530717_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='project',
+            index=models.Index(fields=['status', 'current_amount', 'id'], name='projects_pr_status_e973ef_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='project',
+            index=models.Index(fields=['status', 'end_date', 'id'], name='projects_pr_status_5153c6_idx'),
+        ),
+    ]
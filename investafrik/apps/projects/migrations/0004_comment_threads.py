@@ -0,0 +1,60 @@
+# Generated by Django 5.0.8 on 2026-10-18 11:24
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def backfill_comment_threads(apps, schema_editor):
+    Project = apps.get_model('projects', 'Project')
+    ProjectComment = apps.get_model('projects', 'ProjectComment')
+
+    # Parents are always older than their replies, so id order visits them first.
+    paths = {}
+    for comment in ProjectComment.objects.order_by('pk').only('id', 'parent_id').iterator():
+        segment = str(comment.pk).zfill(10)
+        parent = paths.get(comment.parent_id)
+        path, depth = (f'{parent[0]}/{segment}', parent[1] + 1) if parent else (segment, 0)
+        paths[comment.pk] = (path, depth)
+        ProjectComment.objects.filter(pk=comment.pk).update(path=path, depth=depth)
+
+    counts = ProjectComment.objects.filter(is_approved=True).values('project_id').annotate(
+        total=Count('pk')
+    ).order_by()
+    for row in counts.iterator():
+        Project.objects.filter(pk=row['project_id']).update(comments_count=row['total'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0003_project_projects_pr_status_598ff9_idx_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='project',
+            name='comments_count',
+            field=models.PositiveIntegerField(default=0, help_text='Nombre de commentaires approuvés'),
+        ),
+        migrations.AddField(
+            model_name='projectcomment',
+            name='depth',
+            field=models.PositiveSmallIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='projectcomment',
+            name='path',
+            field=models.CharField(blank=True, editable=False, max_length=255),
+        ),
+        migrations.AddIndex(
+            model_name='projectcomment',
+            index=models.Index(fields=['project', 'path'], name='projects_pr_project_320319_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='projectcomment',
+            index=models.Index(fields=['project', 'depth', 'created_at', 'id'], name='projects_pr_project_0e4c6b_idx'),
+        ),
+        migrations.RunPython(backfill_comment_threads, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.0.8 on 2026-10-18 11:26
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0004_comment_threads'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SimilarProject',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('rank', models.PositiveSmallIntegerField()),
+                ('score', models.FloatField()),
+                ('project', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='recommendations', to='projects.project')),
+                ('similar', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='recommended_in', to='projects.project')),
+            ],
+            options={
+                'verbose_name': 'Projet similaire',
+                'verbose_name_plural': 'Projets similaires',
+                'db_table': 'projects_similarproject',
+                'ordering': ['project', 'rank'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='similarproject',
+            constraint=models.UniqueConstraint(fields=('project', 'rank'), name='unique_similar_project_rank'),
+        ),
+    ]
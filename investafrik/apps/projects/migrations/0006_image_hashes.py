@@ -0,0 +1,23 @@
+# Generated by Django 5.0.8 on 2026-10-18 11:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0005_similarproject'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='project',
+            name='featured_image_hash',
+            field=models.CharField(blank=True, editable=False, help_text="SHA-256 de l'image, clé de ses dérivés redimensionnés", max_length=64),
+        ),
+        migrations.AddField(
+            model_name='projectimage',
+            name='image_hash',
+            field=models.CharField(blank=True, editable=False, max_length=64),
+        ),
+    ]
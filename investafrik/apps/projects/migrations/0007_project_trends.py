@@ -0,0 +1,42 @@
+# Generated by Django 5.0.8 on 2026-10-18 11:34
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def create_project_trends(apps, schema_editor):
+    Project = apps.get_model('projects', 'Project')
+    ProjectTrend = apps.get_model('projects', 'ProjectTrend')
+    ProjectTrend.objects.bulk_create(
+        [ProjectTrend(project_id=pk) for pk in Project.objects.values_list('pk', flat=True)],
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0006_image_hashes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProjectTrend',
+            fields=[
+                ('project', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='trend', serialize=False, to='projects.project')),
+                ('amount_24h', models.DecimalField(decimal_places=2, default=0, max_digits=15)),
+                ('amount_7d', models.DecimalField(decimal_places=2, default=0, max_digits=15)),
+                ('backers_24h', models.PositiveIntegerField(default=0)),
+                ('backers_7d', models.PositiveIntegerField(default=0)),
+                ('score', models.FloatField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Tendance de projet',
+                'verbose_name_plural': 'Tendances des projets',
+                'db_table': 'projects_projecttrend',
+                'indexes': [models.Index(fields=['score', 'project'], name='projects_pr_score_8f6124_idx')],
+            },
+        ),
+        migrations.RunPython(create_project_trends, migrations.RunPython.noop),
+    ]
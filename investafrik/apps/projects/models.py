@@ -2,7 +2,7 @@
 Project models for InvestAfrik platform.
 """
 import uuid
-from django.db import models
+from django.db import models, transaction
 from django.utils.text import slugify
 from django.core.validators import MinValueValidator
 from ckeditor_uploader.fields import RichTextUploadingField
@@ -10,6 +10,34 @@ from django.utils import timezone
 from datetime import timedelta
 
 
+class ProjectQuerySet(models.QuerySet):
+    """Custom queryset for projects."""
+    
+    def for_list(self):
+        """Load what project lists render in a constant number of queries."""
+        from apps.categories.models import Category
+        return self.select_related('owner', 'owner__profile', 'trend').prefetch_related(
+            models.Prefetch('category', queryset=Category.objects.with_project_stats())
+        )
+    
+    def for_detail(self):
+        """Load what the project detail page renders in a fixed number of queries."""
+        owner_projects = Project.objects.filter(
+            owner=models.OuterRef('owner')
+        ).order_by().values('owner').annotate(total=models.Count('pk')).values('total')
+        return self.select_related('owner', 'category').annotate(
+            owner_projects_count=models.Subquery(owner_projects)
+        ).prefetch_related(
+            'updates',
+            models.Prefetch(
+                'comments',
+                queryset=ProjectComment.objects.filter(is_approved=True)
+                .select_related('user').order_by('path'),
+                to_attr='approved_comments'
+            ),
+        )
+
+
 class Project(models.Model):
     """Main project model."""
     
@@ -51,6 +79,10 @@ class Project(models.Model):
         default=0,
         help_text="Montant actuellement levé en FCFA"
     )
+    investor_count = models.PositiveIntegerField(
+        default=0,
+        help_text="Nombre d'investisseurs uniques (paiements complétés)"
+    )
     currency = models.CharField(max_length=10, default='FCFA')
     
     # Location and timing
@@ -65,6 +97,12 @@ class Project(models.Model):
     
     # Media
     featured_image = models.ImageField(upload_to='projects/featured/', blank=True, null=True)
+    featured_image_hash = models.CharField(
+        max_length=64,
+        blank=True,
+        editable=False,
+        help_text="SHA-256 de l'image, clé de ses dérivés redimensionnés"
+    )
     video_url = models.URLField(blank=True, help_text="URL YouTube ou Vimeo")
     
     # Additional data
@@ -75,24 +113,59 @@ class Project(models.Model):
     
     # Metrics
     views_count = models.PositiveIntegerField(default=0)
+    comments_count = models.PositiveIntegerField(
+        default=0,
+        help_text="Nombre de commentaires approuvés"
+    )
     
     # Timestamps
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    objects = ProjectQuerySet.as_manager()
+    
     class Meta:
         db_table = 'projects_project'
         verbose_name = 'Projet'
         verbose_name_plural = 'Projets'
         ordering = ['-created_at']
+        indexes = [
+            # Keyset pagination: (ordering field, id) for each sortable field.
+            models.Index(fields=['status', 'created_at', 'id']),
+            models.Index(fields=['status', 'goal_amount', 'id']),
+            models.Index(fields=['status', 'current_amount', 'id']),
+            models.Index(fields=['status', 'end_date', 'id']),
+        ]
+    
+    _saved_status = None
+    _saved_featured_image = None
     
     def __str__(self):
         return self.title
     
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._saved_status = instance.__dict__.get('status', models.DEFERRED)
+        instance._saved_featured_image = instance.__dict__.get('featured_image', models.DEFERRED)
+        return instance
+    
     def save(self, *args, **kwargs):
+        from .signals import project_status_changed
+        
         if not self.slug:
             self.slug = slugify(self.title)
+        old_status = None if self._state.adding else self._saved_status
         super().save(*args, **kwargs)
+        if old_status is not models.DEFERRED and old_status != self.status:
+            project_status_changed.send(
+                sender=Project,
+                project_ids=[self.pk],
+                old_status=old_status,
+                new_status=self.status,
+            )
+        self._saved_status = self.status
+        self._saved_featured_image = self.featured_image.name
     
     @property
     def funding_percentage(self):
@@ -122,19 +195,55 @@ class Project(models.Model):
         """Check if project reached its funding goal."""
         return self.current_amount >= self.goal_amount
     
-    @property
-    def investor_count(self):
-        """Get number of unique investors."""
-        return self.investments.filter(payment_status='completed').values('investor').distinct().count()
-    
     def update_current_amount(self):
-        """Update current amount based on successful investments."""
-        from django.db.models import Sum
-        total = self.investments.filter(payment_status='completed').aggregate(
-            total=Sum('amount')
-        )['total'] or 0
-        self.current_amount = total
-        self.save(update_fields=['current_amount'])
+        """Recompute funding counters from completed investments."""
+        from .counters import reconcile_counters
+        reconcile_counters(project_ids=[self.pk])
+        self.refresh_from_db(fields=['current_amount', 'investor_count'])
+
+
+class SimilarProject(models.Model):
+    """Precomputed nearest neighbours of an active project (see recommendations.py)."""
+    
+    project = models.ForeignKey(Project, on_delete=models.CASCADE, related_name='recommendations')
+    similar = models.ForeignKey(Project, on_delete=models.CASCADE, related_name='recommended_in')
+    rank = models.PositiveSmallIntegerField()
+    score = models.FloatField()
+    
+    class Meta:
+        db_table = 'projects_similarproject'
+        verbose_name = 'Projet similaire'
+        verbose_name_plural = 'Projets similaires'
+        ordering = ['project', 'rank']
+        constraints = [
+            models.UniqueConstraint(fields=['project', 'rank'], name='unique_similar_project_rank'),
+        ]
+    
+    def __str__(self):
+        return f"{self.project_id} ~ {self.similar_id} ({self.score:.3f})"
+
+
+class ProjectTrend(models.Model):
+    """Rolling funding velocity and trending score of a project (see trending.py)."""
+    
+    project = models.OneToOneField(Project, on_delete=models.CASCADE, primary_key=True, related_name='trend')
+    amount_24h = models.DecimalField(max_digits=15, decimal_places=2, default=0)
+    amount_7d = models.DecimalField(max_digits=15, decimal_places=2, default=0)
+    backers_24h = models.PositiveIntegerField(default=0)
+    backers_7d = models.PositiveIntegerField(default=0)
+    score = models.FloatField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        db_table = 'projects_projecttrend'
+        verbose_name = 'Tendance de projet'
+        verbose_name_plural = 'Tendances des projets'
+        indexes = [
+            models.Index(fields=['score', 'project']),
+        ]
+    
+    def __str__(self):
+        return f"{self.project_id} ({self.score:.2f})"
 
 
 class ProjectImage(models.Model):
@@ -142,6 +251,7 @@ class ProjectImage(models.Model):
     
     project = models.ForeignKey(Project, on_delete=models.CASCADE, related_name='images')
     image = models.ImageField(upload_to='projects/gallery/')
+    image_hash = models.CharField(max_length=64, blank=True, editable=False)
     caption = models.CharField(max_length=200, blank=True)
     order = models.PositiveIntegerField(default=0)
     created_at = models.DateTimeField(auto_now_add=True)
@@ -152,8 +262,20 @@ class ProjectImage(models.Model):
         verbose_name_plural = 'Images de projets'
         ordering = ['order', 'created_at']
     
+    _saved_image = None
+    
     def __str__(self):
         return f"Image {self.order} - {self.project.title}"
+    
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._saved_image = instance.__dict__.get('image', models.DEFERRED)
+        return instance
+    
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        self._saved_image = self.image.name
 
 
 class ProjectUpdate(models.Model):
@@ -177,21 +299,56 @@ class ProjectUpdate(models.Model):
 class ProjectComment(models.Model):
     """Comments on projects."""
     
+    PATH_SEGMENT_LENGTH = 10
+    MAX_DEPTH = 20
+    
     project = models.ForeignKey(Project, on_delete=models.CASCADE, related_name='comments')
     user = models.ForeignKey('accounts.User', on_delete=models.CASCADE)
     parent = models.ForeignKey('self', on_delete=models.CASCADE, null=True, blank=True, related_name='replies')
     content = models.TextField()
     is_approved = models.BooleanField(default=True)
+    # Materialized path of zero-padded ids ("0000000012/0000000015"): ordering
+    # by path lists a thread depth-first, oldest replies first.
+    path = models.CharField(max_length=255, blank=True, editable=False)
+    depth = models.PositiveSmallIntegerField(default=0, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     
+    _saved_is_approved = None
+    
     class Meta:
         db_table = 'projects_projectcomment'
         verbose_name = 'Commentaire'
         verbose_name_plural = 'Commentaires'
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['project', 'path']),
+            models.Index(fields=['project', 'depth', 'created_at', 'id']),
+        ]
     
     def __str__(self):
         return f"Commentaire de {self.user.get_full_name()} sur {self.project.title}"
+    
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._saved_is_approved = instance.__dict__.get('is_approved')
+        return instance
+    
+    def save(self, *args, **kwargs):
+        from .counters import apply_comment_transition
+        
+        adding = self._state.adding
+        old_approved = None if adding else self._saved_is_approved
+        with transaction.atomic():
+            if adding:
+                self.depth = self.parent.depth + 1 if self.parent_id else 0
+            super().save(*args, **kwargs)
+            if adding and not self.path:
+                segment = str(self.pk).zfill(self.PATH_SEGMENT_LENGTH)
+                self.path = f'{self.parent.path}/{segment}' if self.parent_id else segment
+                ProjectComment.objects.filter(pk=self.pk).update(path=self.path)
+            apply_comment_transition(self.project_id, old_approved, self.is_approved)
+        self._saved_is_approved = self.is_approved
 
 
 class SavedProject(models.Model):
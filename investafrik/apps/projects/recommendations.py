@@ -0,0 +1,286 @@
+"""
+Similar-project recommendations.
+
+Every active project is described by a sparse vector: TF-IDF weights of the
+accent-folded words of its title (counted twice) and short description, plus
+one feature for its category and one for its country. Vectors are L2
+normalized, so the dot product of two vectors is their cosine similarity.
+
+Dot products are computed through an inverted index (feature -> postings),
+so only projects sharing at least one feature are ever compared. The
+``PROJECT_RECOMMENDATIONS_TOP_K`` best neighbours of each project are stored
+in ``SimilarProject`` and the detail page reads them with one indexed query.
+
+``rebuild_recommendations`` recomputes everything (nightly Celery beat task
+and ``rebuild_recommendations`` management command) and caches the index.
+``update_recommendations`` refreshes the lists touched by projects being
+created, activated or deactivated: it updates their vectors in the cached
+index, scores only them, and reads only the stored lists they can enter or
+leave. IDF weights are those of the last rebuild and drift until the next one.
+Writers of the cached index hold ``index_lock`` from the read to the write
+back, so concurrent updates never lose each other's vectors.
+"""
+import heapq
+import math
+import re
+import time
+import uuid
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Q
+
+from .search import fold
+
+CATEGORY_WEIGHT = 0.5
+COUNTRY_WEIGHT = 0.25
+TITLE_WEIGHT = 2
+MIN_WORD_LENGTH = 3
+
+INDEX_CACHE_KEY = 'recommendations:index'
+# Longer than the nightly rebuild period
+INDEX_CACHE_TIMEOUT = 26 * 3600
+INDEX_LOCK_KEY = 'recommendations:index:lock'
+# Expiry of a lock left by a crashed writer, and wait of the others
+INDEX_LOCK_TIMEOUT = 300
+INDEX_LOCK_WAIT = 10
+
+STOPWORDS = frozenset('''
+    les des une dans pour par sur avec aux que qui est son ses leur leurs nos
+    notre votre vos plus ces cette entre sont ont tout tous pas sans afin
+    the and for with from this that
+'''.split())
+
+
+class IndexLocked(Exception):
+    pass
+
+
+def top_k():
+    return getattr(settings, 'PROJECT_RECOMMENDATIONS_TOP_K', 6)
+
+
+def tokenize(text):
+    """Return the indexable words of ``text``."""
+    return [
+        word for word in re.findall(r'[^\W\d_]+', fold(text))
+        if len(word) >= MIN_WORD_LENGTH and word not in STOPWORDS
+    ]
+
+
+class SimilarityIndex:
+    """Normalized sparse vectors of projects and their inverted index."""
+
+    def __init__(self, rows):
+        """``rows``: iterable of (id, title, short_description, category_id, country)."""
+        terms = {}
+        document_frequency = Counter()
+        for project_id, title, short_description, category_id, country in rows:
+            counts = self.term_counts(title, short_description)
+            terms[project_id] = (counts, category_id, country)
+            document_frequency.update(counts.keys())
+
+        total = len(terms)
+        self.idf = {
+            term: math.log((1 + total) / (1 + frequency)) + 1
+            for term, frequency in document_frequency.items()
+        }
+        # Weight of words no indexed project used at the last rebuild
+        self.unseen_idf = math.log((1 + total) / 2) + 1
+
+        self.vectors = {}
+        self.postings = defaultdict(list)
+        for project_id, (counts, category_id, country) in terms.items():
+            self.insert(project_id, self.vectorize(counts, category_id, country))
+
+    @staticmethod
+    def term_counts(title, short_description):
+        return Counter(tokenize(title) * TITLE_WEIGHT + tokenize(short_description))
+
+    def vectorize(self, counts, category_id, country):
+        """Normalized vector of a project, with the index's IDF weights."""
+        vector = {term: count * self.idf.get(term, self.unseen_idf) for term, count in counts.items()}
+        text_norm = math.sqrt(sum(weight * weight for weight in vector.values()))
+        if text_norm:
+            vector = {term: weight / text_norm for term, weight in vector.items()}
+        vector[f'category:{category_id}'] = CATEGORY_WEIGHT
+        vector[f'country:{country}'] = COUNTRY_WEIGHT
+        norm = math.sqrt(sum(weight * weight for weight in vector.values()))
+        return {feature: weight / norm for feature, weight in vector.items()}
+
+    def insert(self, project_id, vector):
+        self.vectors[project_id] = vector
+        for feature, weight in vector.items():
+            self.postings[feature].append((project_id, weight))
+
+    def add(self, row):
+        """Index (or re-index) one ``(id, title, short_description, category_id, country)`` row."""
+        project_id, title, short_description, category_id, country = row
+        self.remove(project_id)
+        self.insert(project_id, self.vectorize(self.term_counts(title, short_description), category_id, country))
+
+    def remove(self, project_id):
+        """Drop a project from the index."""
+        vector = self.vectors.pop(project_id, None)
+        if vector is None:
+            return
+        for feature in vector:
+            postings = [posting for posting in self.postings[feature] if posting[0] != project_id]
+            if postings:
+                self.postings[feature] = postings
+            else:
+                del self.postings[feature]
+
+    @classmethod
+    def from_queryset(cls, queryset):
+        return cls(queryset.values_list('id', 'title', 'short_description', 'category_id', 'country'))
+
+    def __contains__(self, project_id):
+        return project_id in self.vectors
+
+    def scores(self, project_id):
+        """Return ``{other_id: cosine}`` for every project sharing a feature."""
+        scores = defaultdict(float)
+        for feature, weight in self.vectors[project_id].items():
+            for other_id, other_weight in self.postings[feature]:
+                scores[other_id] += weight * other_weight
+        scores.pop(project_id, None)
+        return scores
+
+    def neighbours(self, project_id, k, scores=None):
+        """Return the ``k`` best ``(other_id, score)`` pairs, best first."""
+        if scores is None:
+            scores = self.scores(project_id)
+        return [
+            (other_id, score)
+            for score, other_id in heapq.nlargest(
+                k, ((score, str(other_id)) for other_id, score in scores.items()),
+            )
+        ]
+
+
+def active_projects():
+    from .models import Project
+    return Project.objects.filter(status='active').order_by()
+
+
+def store_neighbours(neighbours):
+    """Replace the stored lists of ``{project_id: [(similar_id, score), ...]}``."""
+    from .models import Project, SimilarProject
+
+    id_field = Project._meta.pk
+    rows = [
+        SimilarProject(project_id=project_id, similar_id=id_field.to_python(similar_id), rank=rank, score=score)
+        for project_id, pairs in neighbours.items()
+        for rank, (similar_id, score) in enumerate(pairs)
+    ]
+    with transaction.atomic():
+        SimilarProject.objects.filter(project_id__in=list(neighbours)).delete()
+        SimilarProject.objects.bulk_create(rows, batch_size=500)
+
+
+class index_lock:
+    """Exclusive hold of the cached index; raise ``IndexLocked`` after ``wait`` seconds."""
+
+    def __init__(self, wait=None):
+        self.wait = INDEX_LOCK_WAIT if wait is None else wait
+        self.token = uuid.uuid4().hex
+
+    def __enter__(self):
+        deadline = time.monotonic() + self.wait
+        while not cache.add(INDEX_LOCK_KEY, self.token, INDEX_LOCK_TIMEOUT):
+            if time.monotonic() >= deadline:
+                raise IndexLocked(INDEX_LOCK_KEY)
+            time.sleep(0.05)
+        return self
+
+    def __exit__(self, *exc_info):
+        # Leave a lock that expired and was taken since alone
+        if cache.get(INDEX_LOCK_KEY) == self.token:
+            cache.delete(INDEX_LOCK_KEY)
+
+
+def load_index():
+    """The cached index of active projects, built now if there is none."""
+    index = cache.get(INDEX_CACHE_KEY)
+    if index is None:
+        index = SimilarityIndex.from_queryset(active_projects())
+        cache.set(INDEX_CACHE_KEY, index, INDEX_CACHE_TIMEOUT)
+    return index
+
+
+def rebuild_recommendations():
+    """Recompute and store the neighbours of every active project. Return the project count."""
+    from .models import SimilarProject
+
+    with index_lock():
+        index = SimilarityIndex.from_queryset(active_projects())
+        cache.set(INDEX_CACHE_KEY, index, INDEX_CACHE_TIMEOUT)
+    k = top_k()
+    neighbours = {project_id: index.neighbours(project_id, k) for project_id in index.vectors}
+    with transaction.atomic():
+        SimilarProject.objects.all().delete()
+        store_neighbours(neighbours)
+    return len(neighbours)
+
+
+def update_recommendations(project_ids):
+    """
+    Refresh the lists affected by ``project_ids`` being created or changing
+    status: their own lists, the lists they appeared in, and the lists they
+    now belong to.
+    """
+    from .models import Project, SimilarProject
+
+    project_ids = {Project._meta.pk.to_python(project_id) for project_id in project_ids}
+    k = top_k()
+
+    # Bring the affected vectors up to date in the cached index
+    with index_lock():
+        index = load_index()
+        for project_id in project_ids:
+            index.remove(project_id)
+        for row in active_projects().filter(pk__in=project_ids).values_list(
+            'id', 'title', 'short_description', 'category_id', 'country'
+        ):
+            index.add(row)
+        cache.set(INDEX_CACHE_KEY, index, INDEX_CACHE_TIMEOUT)
+
+    all_scores = {project_id: index.scores(project_id) for project_id in project_ids if project_id in index}
+    candidates = {other_id for scores in all_scores.values() for other_id in scores} - project_ids
+
+    # Only the lists the projects were in, and those they may now enter
+    stored = defaultdict(list)
+    for project_id, similar_id, score in SimilarProject.objects.filter(
+        Q(similar_id__in=project_ids) | Q(project_id__in=candidates)
+    ).values_list('project_id', 'similar_id', 'score'):
+        stored[project_id].append((similar_id, score))
+
+    to_refresh = set()
+    for project_id, pairs in stored.items():
+        if any(similar_id in project_ids for similar_id, _ in pairs):
+            to_refresh.add(project_id)
+
+    neighbours = {}
+    for project_id in project_ids:
+        if project_id not in index:
+            neighbours[project_id] = []
+            continue
+        scores = all_scores[project_id]
+        neighbours[project_id] = index.neighbours(project_id, k, scores)
+        # Similarity is symmetric: the project enters any list whose worst
+        # neighbour scores lower than it.
+        for other_id, score in scores.items():
+            pairs = stored.get(other_id, [])
+            if len(pairs) < k or score > min(pair_score for _, pair_score in pairs):
+                to_refresh.add(other_id)
+
+    for project_id in to_refresh - project_ids:
+        if project_id in index:
+            neighbours[project_id] = index.neighbours(project_id, k)
+        else:
+            neighbours[project_id] = []
+    store_neighbours(neighbours)
+    return len(neighbours)
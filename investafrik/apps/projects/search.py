@@ -0,0 +1,213 @@
+"""
+Full-text search for projects.
+
+Projects are indexed in a dedicated ``projects_project_search`` table holding
+the accent-folded title, short description and owner name:
+
+* PostgreSQL: a weighted ``tsvector`` (French stemming for the title and the
+  description, ``simple`` for the owner name) behind a GIN index, ranked with
+  ``ts_rank``.
+* SQLite: an FTS5 virtual table with the ``unicode61`` tokenizer, ranked with
+  ``bm25``. FTS5 has no French stemmer, so SQLite relies on prefix matching
+  only.
+
+Both backends expose the same API. The index is created after ``migrate``,
+kept current on ``Project`` save/delete and rebuilt with the
+``rebuild_search_index`` management command.
+"""
+import re
+import unicodedata
+
+from django.db import connection as default_connection, transaction
+from django.db.models import FloatField
+from django.db.models.expressions import RawSQL
+from rest_framework.filters import BaseFilterBackend
+
+SEARCH_TABLE = 'projects_project_search'
+MAX_TERMS = 8
+
+
+def fold(text):
+    """Lowercase and strip accents so 'Énergie' matches 'energie'."""
+    decomposed = unicodedata.normalize('NFKD', text or '')
+    return ''.join(c for c in decomposed if not unicodedata.combining(c)).lower()
+
+
+def query_terms(query):
+    """Split a user query into folded search terms."""
+    return re.findall(r'\w+', fold(query))[:MAX_TERMS]
+
+
+class BaseSearchBackend:
+    """Common behaviour of the project search backends."""
+
+    def __init__(self, connection):
+        self.connection = connection
+
+    def document(self, project):
+        owner = project.owner
+        return (
+            fold(project.title),
+            fold(project.short_description),
+            fold(f'{owner.first_name} {owner.last_name}'),
+        )
+
+    def create_schema(self):
+        with self.connection.cursor() as cursor:
+            for statement in self.schema_sql:
+                cursor.execute(statement)
+
+    def index_project(self, project):
+        self.index_projects([project])
+
+    def remove_project(self, project_id):
+        with self.connection.cursor() as cursor:
+            cursor.execute(
+                f'DELETE FROM {SEARCH_TABLE} WHERE project_id = %s',
+                [self.db_id(project_id)],
+            )
+
+    def rebuild(self, queryset, batch_size=500):
+        """
+        Recreate the whole index from ``queryset``. Return the projects indexed.
+        Searches keep reading the previous index until the new one is committed.
+        """
+        self.create_schema()
+        indexed = 0
+        batch = []
+        with transaction.atomic(using=self.connection.alias):
+            with self.connection.cursor() as cursor:
+                cursor.execute(f'DELETE FROM {SEARCH_TABLE}')
+            for project in queryset.select_related('owner').iterator(chunk_size=batch_size):
+                batch.append(project)
+                if len(batch) >= batch_size:
+                    self.index_projects(batch)
+                    indexed += len(batch)
+                    batch = []
+            if batch:
+                self.index_projects(batch)
+                indexed += len(batch)
+        return indexed
+
+    def filter_queryset(self, queryset, query):
+        """Restrict ``queryset`` to matches, annotated with ``search_rank`` (higher is better)."""
+        terms = query_terms(query)
+        if not terms:
+            return queryset.none()
+        match, rank_sql, params = self.match_sql(terms)
+        return queryset.filter(
+            pk__in=RawSQL(match, params)
+        ).annotate(
+            search_rank=RawSQL(rank_sql, params, output_field=FloatField())
+        )
+
+
+class PostgresSearchBackend(BaseSearchBackend):
+    """tsvector + GIN index search for PostgreSQL."""
+
+    schema_sql = [
+        f'''
+        CREATE TABLE IF NOT EXISTS {SEARCH_TABLE} (
+            project_id uuid PRIMARY KEY
+                REFERENCES projects_project (id) ON DELETE CASCADE DEFERRABLE INITIALLY DEFERRED,
+            document tsvector NOT NULL
+        )
+        ''',
+        f'CREATE INDEX IF NOT EXISTS {SEARCH_TABLE}_document_idx ON {SEARCH_TABLE} USING gin (document)',
+    ]
+    tsquery = "(to_tsquery('french', %s) || to_tsquery('simple', %s))"
+
+    def db_id(self, project_id):
+        return project_id
+
+    def index_projects(self, projects):
+        rows = [(project.pk, *self.document(project)) for project in projects]
+        with self.connection.cursor() as cursor:
+            cursor.executemany(
+                f'''
+                INSERT INTO {SEARCH_TABLE} (project_id, document)
+                VALUES (%s,
+                    setweight(to_tsvector('french', %s), 'A')
+                    || setweight(to_tsvector('french', %s), 'B')
+                    || setweight(to_tsvector('simple', %s), 'C'))
+                ON CONFLICT (project_id) DO UPDATE SET document = EXCLUDED.document
+                ''',
+                rows,
+            )
+
+    def match_sql(self, terms):
+        tsquery_text = ' & '.join(f'{term}:*' for term in terms)
+        match = f'SELECT project_id FROM {SEARCH_TABLE} WHERE document @@ {self.tsquery}'
+        rank = (
+            f'SELECT ts_rank(s.document, {self.tsquery}) FROM {SEARCH_TABLE} s '
+            f'WHERE s.project_id = projects_project.id'
+        )
+        return match, rank, (tsquery_text, tsquery_text)
+
+
+class SQLiteSearchBackend(BaseSearchBackend):
+    """FTS5 search for SQLite (development and tests)."""
+
+    schema_sql = [
+        f'''
+        CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} USING fts5(
+            project_id UNINDEXED, title, short_description, owner_name,
+            tokenize = 'unicode61 remove_diacritics 2'
+        )
+        ''',
+    ]
+
+    def db_id(self, project_id):
+        # Django stores UUIDs as 32 hexadecimal characters on SQLite.
+        return project_id.hex
+
+    def index_projects(self, projects):
+        ids = [(project.pk.hex,) for project in projects]
+        rows = [(project.pk.hex, *self.document(project)) for project in projects]
+        with self.connection.cursor() as cursor:
+            cursor.executemany(f'DELETE FROM {SEARCH_TABLE} WHERE project_id = %s', ids)
+            cursor.executemany(
+                f'INSERT INTO {SEARCH_TABLE} (project_id, title, short_description, owner_name) '
+                f'VALUES (%s, %s, %s, %s)',
+                rows,
+            )
+
+    def match_sql(self, terms):
+        expression = ' '.join(f'"{term}"*' for term in terms)
+        match = f'SELECT project_id FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH %s'
+        rank = (
+            f'SELECT -bm25({SEARCH_TABLE}, 0.0, 10.0, 5.0, 2.0) FROM {SEARCH_TABLE} '
+            f'WHERE {SEARCH_TABLE} MATCH %s AND project_id = projects_project.id'
+        )
+        return match, rank, (expression,)
+
+
+BACKENDS = {
+    'postgresql': PostgresSearchBackend,
+    'sqlite': SQLiteSearchBackend,
+}
+
+
+def get_search_backend(connection=None):
+    """Return the search backend matching the database vendor."""
+    connection = connection or default_connection
+    return BACKENDS[connection.vendor](connection)
+
+
+class ProjectSearchFilter(BaseFilterBackend):
+    """
+    Full-text ``?search=`` filter for projects.
+
+    Results are ordered by relevance unless an explicit ``?ordering=`` is
+    given, so this backend must run after ``OrderingFilter``.
+    """
+    search_param = 'search'
+
+    def filter_queryset(self, request, queryset, view):
+        query = request.query_params.get(self.search_param, '').strip()
+        if not query:
+            return queryset
+        queryset = get_search_backend().filter_queryset(queryset, query)
+        if not request.query_params.get('ordering'):
+            queryset = queryset.order_by('-search_rank', '-created_at')
+        return queryset
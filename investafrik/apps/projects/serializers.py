@@ -5,14 +5,24 @@ from rest_framework import serializers
 from .models import Project, ProjectImage, ProjectUpdate, ProjectComment
 from apps.categories.serializers import CategoryListSerializer
 from apps.accounts.serializers import UserSerializer
+from .images import variant_urls
+
+
+class ImageVariantsField(serializers.ReadOnlyField):
+    """URLs and ``srcset`` of the resized derivatives of an image hash."""
+    
+    def to_representation(self, value):
+        request = self.context.get('request')
+        return variant_urls(value, request.build_absolute_uri if request else None)
 
 
 class ProjectImageSerializer(serializers.ModelSerializer):
     """Serializer for ProjectImage model."""
+    image_variants = ImageVariantsField(source='image_hash')
     
     class Meta:
         model = ProjectImage
-        fields = ['id', 'image', 'caption', 'order']
+        fields = ['id', 'image', 'image_variants', 'caption', 'order']
 
 
 class ProjectListSerializer(serializers.ModelSerializer):
@@ -22,6 +32,7 @@ class ProjectListSerializer(serializers.ModelSerializer):
     funding_percentage = serializers.ReadOnlyField()
     days_remaining = serializers.ReadOnlyField()
     investor_count = serializers.ReadOnlyField()
+    featured_image_variants = ImageVariantsField(source='featured_image_hash')
     
     class Meta:
         model = Project
@@ -29,7 +40,7 @@ class ProjectListSerializer(serializers.ModelSerializer):
             'id', 'title', 'slug', 'short_description', 'owner',
             'category', 'goal_amount', 'current_amount', 'currency',
             'funding_percentage', 'days_remaining', 'investor_count',
-            'featured_image', 'status', 'is_featured', 'created_at'
+            'featured_image', 'featured_image_variants', 'status', 'is_featured', 'created_at'
         ]
 
 
@@ -43,6 +54,7 @@ class ProjectSerializer(serializers.ModelSerializer):
     investor_count = serializers.ReadOnlyField()
     is_active = serializers.ReadOnlyField()
     is_successful = serializers.ReadOnlyField()
+    featured_image_variants = ImageVariantsField(source='featured_image_hash')
     
     class Meta:
         model = Project
@@ -50,11 +62,13 @@ class ProjectSerializer(serializers.ModelSerializer):
             'id', 'title', 'slug', 'short_description', 'full_description',
             'owner', 'category', 'goal_amount', 'current_amount', 'currency',
             'country', 'start_date', 'end_date', 'status', 'is_featured',
-            'featured_image', 'video_url', 'budget_breakdown', 'views_count',
-            'funding_percentage', 'days_remaining', 'investor_count',
+            'featured_image', 'featured_image_variants', 'video_url', 'budget_breakdown', 'views_count',
+            'comments_count', 'funding_percentage', 'days_remaining', 'investor_count',
             'is_active', 'is_successful', 'images', 'created_at', 'updated_at'
         ]
-        read_only_fields = ['id', 'slug', 'current_amount', 'views_count', 'created_at', 'updated_at']
+        read_only_fields = [
+            'id', 'slug', 'current_amount', 'views_count', 'comments_count', 'created_at', 'updated_at'
+        ]
 
 
 class ProjectUpdateSerializer(serializers.ModelSerializer):
@@ -68,13 +82,29 @@ class ProjectUpdateSerializer(serializers.ModelSerializer):
 class ProjectCommentSerializer(serializers.ModelSerializer):
     """Serializer for ProjectComment model."""
     user = UserSerializer(read_only=True)
+    parent = serializers.PrimaryKeyRelatedField(
+        queryset=ProjectComment.objects.filter(is_approved=True),
+        required=False,
+        allow_null=True
+    )
     replies = serializers.SerializerMethodField()
     
     class Meta:
         model = ProjectComment
-        fields = ['id', 'user', 'content', 'created_at', 'replies']
+        fields = ['id', 'user', 'parent', 'depth', 'content', 'created_at', 'replies']
+        read_only_fields = ['depth']
     
     def get_replies(self, obj):
-        if obj.replies.exists():
-            return ProjectCommentSerializer(obj.replies.all(), many=True).data
-        return []
\ No newline at end of file
+        # Replies are attached in memory by build_comment_tree()
+        children = getattr(obj, 'children', [])
+        return ProjectCommentSerializer(children, many=True, context=self.context).data
+    
+    def validate_parent(self, value):
+        project = self.context.get('project')
+        if value is None:
+            return value
+        if project is not None and value.project_id != project.pk:
+            raise serializers.ValidationError("Ce commentaire n'appartient pas à ce projet.")
+        if value.depth + 1 >= ProjectComment.MAX_DEPTH:
+            raise serializers.ValidationError("Cette discussion est trop profonde.")
+        return value
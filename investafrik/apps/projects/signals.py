@@ -0,0 +1,107 @@
+"""
+Signals for projects app.
+"""
+from django.db import connections, transaction
+from django.db.models import DEFERRED
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import Signal, receiver
+from apps.investments.signals import payment_status_changed
+from . import counters, facets, trending
+from .models import Project, ProjectComment, ProjectImage, ProjectTrend
+from .search import get_search_backend
+
+# Sent with ``project_ids``, ``old_status`` (None for a new project) and
+# ``new_status`` when projects change status, one by one or in bulk.
+project_status_changed = Signal()
+
+
+@receiver(payment_status_changed)
+def update_funding_counters(sender, investment, old_status, new_status, **kwargs):
+    """Apply funding counter deltas when a payment changes status."""
+    counters.apply_payment_transition(investment, old_status, new_status)
+
+
+@receiver(payment_status_changed)
+def update_trend(sender, investment, old_status, new_status, **kwargs):
+    """Move the trending windows when a payment completes or is reversed."""
+    trending.apply_payment_transition(investment, old_status, new_status)
+
+
+@receiver(post_delete, sender=ProjectComment)
+def discount_deleted_comment(sender, instance, **kwargs):
+    """Decrement the comments count when an approved comment is deleted."""
+    counters.apply_comment_transition(instance.project_id, instance.is_approved, None)
+
+
+@receiver(project_status_changed)
+def refresh_recommendations(sender, project_ids, old_status, new_status, **kwargs):
+    """Update similar projects once the status change is committed."""
+    from .tasks import update_project_recommendations
+
+    if 'active' not in (old_status, new_status):
+        return
+    ids = [str(project_id) for project_id in project_ids]
+    transaction.on_commit(lambda: update_project_recommendations.delay(ids))
+
+
+@receiver(project_status_changed)
+def invalidate_project_facets(sender, project_ids, old_status, new_status, **kwargs):
+    """Retire cached facet counts once the status change is committed."""
+    transaction.on_commit(facets.invalidate_facets)
+
+
+@receiver(post_save, sender=Project)
+def create_trend(sender, instance, created, raw=False, **kwargs):
+    """Give new projects their trending row."""
+    if created and not raw:
+        ProjectTrend.objects.get_or_create(project=instance)
+
+
+@receiver(post_save, sender=Project)
+def index_project(sender, instance, raw=False, using=None, **kwargs):
+    """Keep the search index current when a project is saved."""
+    if raw:
+        return
+    get_search_backend(connections[using]).index_project(instance)
+
+
+@receiver(post_delete, sender=Project)
+def unindex_project(sender, instance, using=None, **kwargs):
+    """Remove a deleted project from the search index."""
+    get_search_backend(connections[using]).remove_project(instance.pk)
+    transaction.on_commit(facets.invalidate_facets)
+
+
+def file_changed(saved_name, field_file):
+    return saved_name is not DEFERRED and (saved_name or '') != (field_file.name or '')
+
+
+@receiver(post_save, sender=Project)
+def queue_featured_image_processing(sender, instance, raw=False, **kwargs):
+    """Generate image derivatives off the request once a new image is committed."""
+    from .tasks import process_project_image
+
+    if raw or not file_changed(instance._saved_featured_image, instance.featured_image):
+        return
+    if not instance.featured_image:
+        Project.objects.filter(pk=instance.pk).update(featured_image_hash='')
+        instance.featured_image_hash = ''
+        return
+    project_id = str(instance.pk)
+    transaction.on_commit(lambda: process_project_image.delay(project_id))
+
+
+@receiver(post_save, sender=ProjectImage)
+def queue_gallery_image_processing(sender, instance, raw=False, **kwargs):
+    """Generate gallery image derivatives once a new image is committed."""
+    from .tasks import process_gallery_image
+
+    if raw or not instance.image or not file_changed(instance._saved_image, instance.image):
+        return
+    image_id = instance.pk
+    transaction.on_commit(lambda: process_gallery_image.delay(image_id))
+
+
+def create_search_schema(sender, using=None, **kwargs):
+    """Create the search index table after migrate."""
+    get_search_backend(connections[using]).create_schema()
@@ -0,0 +1,72 @@
+"""
+Celery tasks for projects app.
+"""
+from celery import shared_task
+from django.utils import timezone
+
+from . import images, lifecycle, recommendations, trending
+
+
+@shared_task(autoretry_for=(recommendations.IndexLocked,), retry_backoff=True, max_retries=5)
+def rebuild_project_recommendations():
+    """Recompute the similar projects of every active project."""
+    return recommendations.rebuild_recommendations()
+
+
+@shared_task(autoretry_for=(recommendations.IndexLocked,), retry_backoff=True, max_retries=5)
+def update_project_recommendations(project_ids):
+    """Refresh the similar projects lists affected by ``project_ids``."""
+    return recommendations.update_recommendations(project_ids)
+
+
+@shared_task
+def refresh_project_trends():
+    """Decay the trending windows and rebuild the cached trending feed."""
+    return trending.refresh_trends()
+
+
+@shared_task
+def close_expired_campaigns():
+    """Close the campaigns whose end date has passed."""
+    closed = lifecycle.close_expired_campaigns()
+    return {'successful': len(closed.successful), 'failed': len(closed.failed)}
+
+
+@shared_task
+def queue_campaign_follow_ups(successful_ids, failed_ids):
+    """Send notifications and open refunds for closed campaigns."""
+    return lifecycle.apply_follow_ups(successful_ids, failed_ids)
+
+
+@shared_task
+def process_project_image(project_id):
+    """Generate the derivatives of a project's featured image."""
+    from .models import Project
+
+    project = Project.objects.filter(pk=project_id).only('id', 'featured_image').first()
+    if project is None:
+        return None
+    image_hash = ''
+    if project.featured_image:
+        image_hash = images.generate_derivatives([project.featured_image])[0] or ''
+    # Ignore the result if another image was uploaded in the meantime.
+    Project.objects.filter(pk=project_id, featured_image=project.featured_image.name).update(
+        featured_image_hash=image_hash, updated_at=timezone.now()
+    )
+    return image_hash
+
+
+@shared_task
+def process_gallery_image(image_id):
+    """Generate the derivatives of a project gallery image."""
+    from .models import Project, ProjectImage
+
+    gallery_image = ProjectImage.objects.filter(pk=image_id).only('id', 'image').first()
+    if gallery_image is None or not gallery_image.image:
+        return None
+    image_hash = images.generate_derivatives([gallery_image.image])[0] or ''
+    updated = ProjectImage.objects.filter(pk=image_id, image=gallery_image.image.name).update(image_hash=image_hash)
+    if updated:
+        # Refresh the ETag of the project payload, which embeds the gallery.
+        Project.objects.filter(images__pk=image_id).update(updated_at=timezone.now())
+    return image_hash
@@ -0,0 +1,40 @@
+"""
+Template tags rendering project images through their resized derivatives.
+"""
+from django import template
+from django.utils.html import format_html, format_html_join
+
+from apps.projects.images import variant_urls
+
+register = template.Library()
+
+DEFAULT_SIZES = {
+    'thumb': '320px',
+    'card': '(min-width: 1024px) 33vw, (min-width: 768px) 50vw, 100vw',
+    'hero': '100vw',
+}
+
+
+@register.simple_tag
+def responsive_image(image, image_hash, variant='card', sizes=None, **attrs):
+    """
+    Render ``<picture>`` with WebP and JPEG ``srcset`` for an image field.
+
+    Usage: ``{% responsive_image project.featured_image project.featured_image_hash 'card' alt=project.title class="..." %}``
+    Falls back to the original upload while its derivatives are not ready.
+    """
+    if not image:
+        return ''
+    if variant != 'hero':
+        attrs.setdefault('loading', 'lazy')
+    extra = format_html_join('', ' {}="{}"', sorted(attrs.items()))
+    urls = variant_urls(image_hash)
+    if urls is None:
+        return format_html('<img src="{}"{}>', image.url, extra)
+    return format_html(
+        '<picture><source type="image/webp" srcset="{}" sizes="{}">'
+        '<img src="{}" srcset="{}" sizes="{}"{}></picture>',
+        urls['webp_srcset'], sizes or DEFAULT_SIZES.get(variant, '100vw'),
+        urls['variants'][variant]['jpg'], urls['srcset'], sizes or DEFAULT_SIZES.get(variant, '100vw'),
+        extra,
+    )
@@ -0,0 +1,217 @@
+"""
+Trending projects ranking.
+
+Every project has a ``ProjectTrend`` row holding its funding velocity over two
+rolling windows (24 hours and 7 days): amount raised and distinct backers of
+completed investments. The row is moved incrementally by one ``UPDATE`` once a
+payment completing or being reversed is committed, and a periodic job recomputes (decays) the windows of every
+project with one grouped aggregate, rewriting only the rows that changed.
+
+``?ordering=trending`` sorts projects on the stored score through the
+``(score, project)`` index, and ``trending_feed`` serves the best active
+projects from the cache, rebuilt after each refresh.
+"""
+import math
+from datetime import timedelta
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, F, FloatField, Max, OuterRef, Q, Subquery, Sum, Value
+from django.db.models.functions import Cast, Coalesce, Greatest, NullIf, Round
+from django.utils import timezone
+from rest_framework.filters import OrderingFilter
+
+COMPLETED = 'completed'
+SHORT_WINDOW = timedelta(hours=24)
+LONG_WINDOW = timedelta(days=7)
+# Score bonus per backer and per day
+BACKER_WEIGHT = 0.5
+
+ORDERING = '-trend__score'
+FEED_CACHE_KEY = 'projects:trending_feed'
+FEED_SIZE = 12
+FEED_TIMEOUT = 60 * 60
+
+WINDOW_FIELDS = ['amount_24h', 'amount_7d', 'backers_24h', 'backers_7d']
+SCORE_TOLERANCE = 1e-6
+
+
+def trend_score(amount_24h, amount_7d, backers_24h, backers_7d, goal_amount):
+    """
+    Funding per day in percent of the goal, so small campaigns can trend too,
+    plus a bonus per backer. The last 24 hours count twice.
+    """
+    daily_amount = Decimal(amount_24h) + Decimal(amount_7d) / 7
+    velocity = float(daily_amount * 100 / goal_amount) if goal_amount else 0.0
+    return round(velocity + BACKER_WEIGHT * (backers_24h + backers_7d / 7), 6)
+
+
+def payment_deltas(investment, old_status, new_status, now=None):
+    """
+    Window deltas of a payment completing or being reversed, as
+    ``{field: delta}``, or None when the windows do not move.
+    """
+    from apps.investments.models import Investment
+
+    if new_status == COMPLETED and old_status != COMPLETED:
+        sign = 1
+    elif old_status == COMPLETED and new_status != COMPLETED:
+        sign = -1
+    else:
+        return None
+
+    now = now or timezone.now()
+    completed_at = investment.payment_completed_at or now
+    if completed_at < now - LONG_WINDOW:
+        return None
+    in_short_window = completed_at >= now - SHORT_WINDOW
+
+    # The investor only counts once per window.
+    latest_other = Investment.objects.filter(
+        project_id=investment.project_id,
+        investor_id=investment.investor_id,
+        payment_status=COMPLETED,
+        payment_completed_at__gte=now - LONG_WINDOW,
+    ).exclude(pk=investment.pk).aggregate(latest=Max('payment_completed_at'))['latest']
+
+    amount = sign * investment.amount
+    return {
+        'amount_24h': amount if in_short_window else Decimal('0'),
+        'amount_7d': amount,
+        'backers_24h': sign if in_short_window and (
+            latest_other is None or latest_other < now - SHORT_WINDOW
+        ) else 0,
+        'backers_7d': sign if latest_other is None else 0,
+    }
+
+
+def apply_deltas(project_id, deltas):
+    """
+    Move the windows of a project by ``deltas`` and recompute its score, in
+    one ``UPDATE`` with ``F()`` expressions (no row read, no lock held
+    beyond the statement).
+    """
+    from .models import Project, ProjectTrend
+
+    windows = {
+        field: Greatest(F(field) + delta, Value(type(delta)(0)))
+        for field, delta in deltas.items()
+    }
+
+    def as_float(expression):
+        return Cast(expression, FloatField())
+
+    goal_amount = as_float(Subquery(
+        Project.objects.filter(pk=OuterRef('project_id')).values('goal_amount')[:1]
+    ))
+    velocity = Coalesce(
+        (as_float(windows['amount_24h']) + as_float(windows['amount_7d']) / 7) * 100
+        / NullIf(goal_amount, Value(0.0)),
+        Value(0.0),
+    )
+    backers = Value(BACKER_WEIGHT) * (as_float(windows['backers_24h']) + as_float(windows['backers_7d']) / 7)
+    changes = dict(windows, score=Round(velocity + backers, 6), updated_at=timezone.now())
+
+    trends = ProjectTrend.objects.filter(project_id=project_id)
+    if not trends.update(**changes):
+        # Projects inserted without their trend row (bulk creates, fixtures).
+        ProjectTrend.objects.get_or_create(project_id=project_id)
+        trends.update(**changes)
+
+
+def apply_payment_transition(investment, old_status, new_status, now=None):
+    """
+    Move the rolling windows of the project when a payment completes or is
+    reversed, once the transition is committed. A failed update is logged
+    and repaired by the next ``refresh_trends``.
+    """
+    deltas = payment_deltas(investment, old_status, new_status, now)
+    if deltas:
+        project_id = investment.project_id
+        transaction.on_commit(lambda: apply_deltas(project_id, deltas), robust=True)
+
+
+def refresh_trends(now=None):
+    """
+    Recompute the rolling windows of every project from completed investments
+    and store the rows that changed. Return the number of rows updated.
+    """
+    from apps.investments.models import Investment
+    from .models import Project, ProjectTrend
+
+    now = now or timezone.now()
+    recent = Q(payment_completed_at__gte=now - SHORT_WINDOW)
+    windows = Investment.objects.filter(
+        payment_status=COMPLETED,
+        payment_completed_at__gte=now - LONG_WINDOW,
+    ).values('project_id').annotate(
+        amount_24h=Sum('amount', filter=recent),
+        amount_7d=Sum('amount'),
+        backers_24h=Count('investor', distinct=True, filter=recent),
+        backers_7d=Count('investor', distinct=True),
+    ).order_by()
+    windows = {row.pop('project_id'): row for row in windows}
+
+    # Projects inserted without their trend row (bulk creates, fixtures).
+    missing = Project.objects.filter(trend__isnull=True).values_list('pk', flat=True)
+    ProjectTrend.objects.bulk_create(
+        [ProjectTrend(project_id=pk) for pk in missing], batch_size=500, ignore_conflicts=True
+    )
+
+    # Only projects funded within the window or still holding a score can change.
+    trends = ProjectTrend.objects.filter(
+        Q(project_id__in=list(windows)) | ~Q(score=0)
+    ).select_related('project').only(*WINDOW_FIELDS, 'score', 'project__goal_amount')
+    changed = []
+    for trend in trends:
+        row = windows.get(trend.project_id, {})
+        values = {
+            'amount_24h': row.get('amount_24h') or Decimal('0'),
+            'amount_7d': row.get('amount_7d') or Decimal('0'),
+            'backers_24h': row.get('backers_24h', 0),
+            'backers_7d': row.get('backers_7d', 0),
+        }
+        values['score'] = trend_score(*values.values(), trend.project.goal_amount)
+        # Incremental scores are computed in SQL, in floating point
+        if any(getattr(trend, field) != values[field] for field in WINDOW_FIELDS) or (
+            not math.isclose(trend.score, values['score'], abs_tol=SCORE_TOLERANCE)
+        ):
+            for field, value in values.items():
+                setattr(trend, field, value)
+            trend.updated_at = now
+            changed.append(trend)
+
+    ProjectTrend.objects.bulk_update(changed, WINDOW_FIELDS + ['score', 'updated_at'], batch_size=500)
+    rebuild_feed()
+    return len(changed)
+
+
+def rebuild_feed():
+    """Store the ids of the best trending active projects in the cache and return them."""
+    from .models import ProjectTrend
+
+    ids = [
+        str(pk) for pk in ProjectTrend.objects.filter(project__status='active')
+        .order_by('-score', '-project__created_at')
+        .values_list('project_id', flat=True)[:FEED_SIZE]
+    ]
+    cache.set(FEED_CACHE_KEY, ids, FEED_TIMEOUT)
+    return ids
+
+
+def trending_feed(limit=FEED_SIZE):
+    """Ids of the best trending active projects, best first."""
+    ids = cache.get(FEED_CACHE_KEY)
+    if ids is None:
+        ids = rebuild_feed()
+    return ids[:limit]
+
+
+class TrendingOrderingFilter(OrderingFilter):
+    """``OrderingFilter`` that also accepts ``?ordering=trending`` (best score first)."""
+
+    def get_ordering(self, request, queryset, view):
+        if request.query_params.get(self.ordering_param, '').strip() in ('trending', '-trending'):
+            return [ORDERING]
+        return super().get_ordering(request, queryset, view)
@@ -0,0 +1,161 @@
+"""
+Buffered, write-behind counter for Project.views_count.
+
+Detail page hits are collected in a process-local buffer and applied
+periodically as one batched ``UPDATE ... SET views_count = views_count + CASE
+...`` instead of one row update per hit. Each process flushes its own buffer
+from a daemon thread every ``PROJECT_VIEWS_FLUSH_INTERVAL`` seconds.
+
+Repeated hits from the same visitor (session, or IP address for anonymous
+visitors without a session) are ignored for ``PROJECT_VIEWS_DEDUP_WINDOW``
+seconds, using the default cache.
+"""
+import atexit
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DatabaseError, close_old_connections
+from django.db.models import Case, F, PositiveIntegerField, Value, When
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+FLUSH_BATCH_SIZE = 500
+
+
+def get_visitor_key(request):
+    """Identify the visitor of a request for deduplication."""
+    session_key = getattr(getattr(request, 'session', None), 'session_key', None)
+    if session_key:
+        return f'session:{session_key}'
+    # Clients set X-Forwarded-For as they like: only the peer address counts.
+    return f'ip:{request.META.get("REMOTE_ADDR", "")}'
+
+
+class ViewCounter:
+    """Process-local buffer of project view increments."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pending = {}
+        self._oldest_pending_at = None
+        self._flusher = None
+        self._stats = {
+            'recorded': 0,
+            'deduplicated': 0,
+            'dropped': 0,
+            'flushed': 0,
+            'flushes': 0,
+            'last_flush_at': None,
+            'last_flush_lag': None,
+        }
+
+    @property
+    def flush_interval(self):
+        return getattr(settings, 'PROJECT_VIEWS_FLUSH_INTERVAL', 30)
+
+    @property
+    def dedup_window(self):
+        return getattr(settings, 'PROJECT_VIEWS_DEDUP_WINDOW', 1800)
+
+    @property
+    def max_pending(self):
+        return getattr(settings, 'PROJECT_VIEWS_MAX_PENDING', 10000)
+
+    def record_view(self, project_id, request=None):
+        """Buffer one view of a project. Return True if it will be counted."""
+        if request is not None and self.dedup_window:
+            dedup_key = f'project_view:{project_id}:{get_visitor_key(request)}'
+            if not cache.add(dedup_key, 1, timeout=self.dedup_window):
+                with self._lock:
+                    self._stats['deduplicated'] += 1
+                return False
+
+        with self._lock:
+            if project_id not in self._pending and len(self._pending) >= self.max_pending:
+                self._stats['dropped'] += 1
+                return False
+            self._pending[project_id] = self._pending.get(project_id, 0) + 1
+            if self._oldest_pending_at is None:
+                self._oldest_pending_at = time.monotonic()
+            self._stats['recorded'] += 1
+
+        self._ensure_flusher()
+        return True
+
+    def flush(self):
+        """Apply buffered increments to the database. Return the views written."""
+        from .models import Project
+
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            oldest, self._oldest_pending_at = self._oldest_pending_at, None
+        if not pending:
+            return 0
+
+        items = list(pending.items())
+        written = 0
+        for start in range(0, len(items), FLUSH_BATCH_SIZE):
+            batch = items[start:start + FLUSH_BATCH_SIZE]
+            increments = Case(
+                *[When(pk=project_id, then=Value(count)) for project_id, count in batch],
+                default=Value(0),
+                output_field=PositiveIntegerField(),
+            )
+            try:
+                Project.objects.filter(pk__in=[project_id for project_id, _ in batch]).update(
+                    views_count=F('views_count') + increments
+                )
+            except DatabaseError:
+                logger.exception("Impossible d'enregistrer les vues de %d projets", len(batch))
+                with self._lock:
+                    self._stats['dropped'] += sum(count for _, count in batch)
+                continue
+            written += sum(count for _, count in batch)
+
+        with self._lock:
+            self._stats['flushed'] += written
+            self._stats['flushes'] += 1
+            self._stats['last_flush_at'] = timezone.now()
+            self._stats['last_flush_lag'] = time.monotonic() - oldest
+        return written
+
+    def metrics(self):
+        """Return buffer metrics, including the current flush lag in seconds."""
+        with self._lock:
+            data = dict(self._stats)
+            data['pending_projects'] = len(self._pending)
+            data['pending_views'] = sum(self._pending.values())
+            data['flush_lag'] = (
+                time.monotonic() - self._oldest_pending_at
+                if self._oldest_pending_at is not None else 0
+            )
+        return data
+
+    def _ensure_flusher(self):
+        if self._flusher is not None or self.flush_interval <= 0:
+            return
+        with self._lock:
+            if self._flusher is not None:
+                return
+            self._flusher = threading.Thread(
+                target=self._run_flusher, name='project-views-flusher', daemon=True
+            )
+            self._flusher.start()
+        atexit.register(self.flush)
+
+    def _run_flusher(self):
+        while True:
+            time.sleep(self.flush_interval)
+            try:
+                self.flush()
+            except Exception:
+                logger.exception('Échec du flush des vues de projets')
+            finally:
+                close_old_connections()
+
+
+view_counter = ViewCounter()
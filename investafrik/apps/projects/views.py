@@ -4,24 +4,38 @@ API views for projects app.
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
-from rest_framework.permissions import IsAuthenticated, IsAuthenticatedOrReadOnly
+from rest_framework.permissions import IsAdminUser, IsAuthenticated, IsAuthenticatedOrReadOnly
 from django_filters.rest_framework import DjangoFilterBackend
-from rest_framework.filters import SearchFilter, OrderingFilter
+from apps.core.conditional import ConditionalGetMixin
+from apps.core.pagination import KeysetPagination
 from .models import Project, ProjectComment, SavedProject
-from .serializers import ProjectSerializer, ProjectListSerializer
+from .comments import build_comment_tree, load_threads
+from .facets import get_facets
+from .search import ProjectSearchFilter
+from .trending import ORDERING as TRENDING_ORDERING, FEED_SIZE, TrendingOrderingFilter, trending_feed
+from .serializers import ProjectCommentSerializer, ProjectSerializer, ProjectListSerializer
+from .view_counter import view_counter
 
 
-class ProjectViewSet(viewsets.ModelViewSet):
+class ProjectViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     """ViewSet for projects."""
     queryset = Project.objects.all()
     serializer_class = ProjectSerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
-    filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
+    filter_backends = [DjangoFilterBackend, TrendingOrderingFilter, ProjectSearchFilter]
     filterset_fields = ['category', 'status', 'country']
-    search_fields = ['title', 'short_description', 'owner__first_name', 'owner__last_name']
     ordering_fields = ['created_at', 'goal_amount', 'current_amount', 'end_date']
     ordering = ['-created_at']
+    pagination_class = KeysetPagination
     lookup_field = 'slug'
+    # The trending ordering changes with the trend rows.
+    conditional_fields = ('updated_at', 'trend__updated_at')
+    
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action == 'list':
+            queryset = queryset.for_list()
+        return queryset
     
     def get_serializer_class(self):
         if self.action == 'list':
@@ -31,12 +45,48 @@ class ProjectViewSet(viewsets.ModelViewSet):
     def perform_create(self, serializer):
         serializer.save(owner=self.request.user)
     
-    @action(detail=True, methods=['post'])
-    def invest(self, request, pk=None):
-        """Invest in a project."""
-        # TODO: Implement investment logic
-        return Response({'message': 'Investment functionality not implemented yet'})
+    @action(detail=False, methods=['get'])
+    def facets(self, request):
+        """Category, country and status counts for the current filters and search."""
+        return Response(get_facets(request.query_params))
     
+    @action(detail=False, methods=['get'])
+    def trending(self, request):
+        """Best trending active projects, from the cached feed."""
+        try:
+            limit = min(max(int(request.query_params.get('limit', FEED_SIZE)), 1), FEED_SIZE)
+        except ValueError:
+            limit = FEED_SIZE
+        ids = trending_feed(limit)
+        projects = Project.objects.filter(pk__in=ids, status='active').for_list().in_bulk()
+        ids = [Project._meta.pk.to_python(pk) for pk in ids]
+        projects = [projects[pk] for pk in ids if pk in projects]
+        serializer = ProjectListSerializer(projects, many=True, context={'request': request})
+        return Response({'results': serializer.data})
+    
+    @action(detail=True, methods=['post'], permission_classes=[IsAuthenticated])
+    def invest(self, request, slug=None):
+        """Invest in a project."""
+        from apps.investments.serializers import InvestmentPlacementSerializer
+        
+        project = self.get_object()
+        serializer = InvestmentPlacementSerializer(
+            data=request.data, context={'request': request, 'project': project}
+        )
+        serializer.is_valid(raise_exception=True)
+        serializer.save()
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+    @action(detail=True, methods=['get'])
+    def rewards(self, request, slug=None):
+        """List the active rewards of a project with their backers count."""
+        from apps.investments.serializers import InvestmentRewardSerializer
+
+        project = self.get_object()
+        rewards = project.rewards.filter(is_active=True).with_backers_count()
+        serializer = InvestmentRewardSerializer(rewards, many=True, context={'request': request})
+        return Response(serializer.data)
+
     @action(detail=True, methods=['post', 'delete'])
     def save(self, request, pk=None):
         """Save/unsave a project."""
@@ -58,25 +108,40 @@ class ProjectViewSet(viewsets.ModelViewSet):
             ).delete()
             return Response({'message': 'Projet retiré des favoris'})
     
+    @action(detail=False, methods=['get'], url_path='views-metrics', permission_classes=[IsAdminUser])
+    def views_metrics(self, request):
+        """Get metrics of this process's buffered views counter."""
+        return Response(view_counter.metrics())
+    
     @action(detail=True, methods=['get'])
-    def comments(self, request, pk=None):
-        """Get project comments."""
+    def comments(self, request, slug=None):
+        """Get project comment threads, paginated on top-level comments."""
         project = self.get_object()
-        comments = project.comments.filter(is_approved=True, parent=None)
-        # TODO: Implement comment serializer
-        return Response({'comments': []})
+        roots = project.comments.filter(
+            is_approved=True, depth=0
+        ).select_related('user', 'user__profile').order_by('-created_at')
+        page = self.paginate_queryset(roots)
+        serializer = ProjectCommentSerializer(load_threads(page), many=True, context={'request': request})
+        return self.get_paginated_response(serializer.data)
     
-    @action(detail=True, methods=['post'])
-    def comment(self, request, pk=None):
-        """Add a comment to project."""
-        # TODO: Implement comment creation
-        return Response({'message': 'Comment functionality not implemented yet'})
+    @action(detail=True, methods=['post'], permission_classes=[IsAuthenticated])
+    def comment(self, request, slug=None):
+        """Add a comment (or a reply) to project."""
+        project = self.get_object()
+        serializer = ProjectCommentSerializer(
+            data=request.data, context={'request': request, 'project': project}
+        )
+        serializer.is_valid(raise_exception=True)
+        serializer.save(project=project, user=request.user)
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
 
 # Frontend Views
 from django.views.generic import TemplateView, DetailView
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.shortcuts import get_object_or_404, redirect
 from django.contrib import messages
+from django.core.exceptions import ValidationError
+from apps.core.pagination import InvalidCursor, KeysetPaginator, cached_count
 
 
 class ProjectListView(TemplateView):
@@ -87,25 +152,42 @@ class ProjectListView(TemplateView):
         context = super().get_context_data(**kwargs)
         
         # Récupérer tous les projets actifs
-        projects = Project.objects.filter(status='active').select_related('owner', 'category').order_by('-created_at')
+        projects = Project.objects.filter(status='active').select_related('owner', 'category')
         
-        # Pagination simple
-        from django.core.paginator import Paginator
-        paginator = Paginator(projects, 12)  # 12 projets par page
-        page_number = self.request.GET.get('page')
-        page_obj = paginator.get_page(page_number)
+        # Pagination par curseur (keyset) sur le tri demandé
+        ordering = self.request.GET.get('ordering', '-created_at')
+        if ordering.lstrip('-') == 'trending':
+            ordering = TRENDING_ORDERING
+            projects = projects.select_related('trend')
+        elif ordering.lstrip('-') not in ProjectViewSet.ordering_fields:
+            ordering = '-created_at'
+        paginator = KeysetPaginator(projects, ordering, 12)  # 12 projets par page
+        try:
+            page_obj = paginator.page(self.request.GET.get('cursor'))
+        except (InvalidCursor, ValidationError, ValueError):
+            page_obj = paginator.page()
+        total_projects, _ = cached_count(projects)
         
-        # Catégories pour le filtre
-        from apps.categories.models import Category
-        categories = Category.objects.all()
+        # Compteurs par catégorie et par pays pour les filtres
+        facets = get_facets({'status': 'active'})
         
         context.update({
             'projects': page_obj,
-            'categories': categories,
-            'total_projects': projects.count(),
+            'facets': facets,
+            'total_projects': total_projects,
+            'next_query': self.cursor_query(page_obj.next_cursor),
+            'previous_query': self.cursor_query(page_obj.previous_cursor),
         })
         
         return context
+    
+    def cursor_query(self, cursor):
+        """Query string of the current page with ``cursor`` replaced."""
+        if cursor is None:
+            return ''
+        query = self.request.GET.copy()
+        query['cursor'] = cursor
+        return query.urlencode()
 
 
 class ProjectDetailView(DetailView):
@@ -116,17 +198,27 @@ class ProjectDetailView(DetailView):
     slug_field = 'slug'
     slug_url_kwarg = 'slug'
     
+    def get_queryset(self):
+        # Propriétaire, catégorie, mises à jour et commentaires en une passe
+        return Project.objects.for_detail()
+    
+    def get(self, request, *args, **kwargs):
+        response = super().get(request, *args, **kwargs)
+        # Compteur de vues bufferisé, écrit en lot par le flusher
+        view_counter.record_view(self.object.pk, request)
+        return response
+    
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        project = self.get_object()
+        project = self.object
         
-        # Projets similaires (même catégorie, excluant le projet actuel)
+        # Projets similaires précalculés (voir recommendations.py)
         similar_projects = Project.objects.filter(
-            category=project.category,
-            status='active'
-        ).exclude(id=project.id).select_related('category')[:3]
+            recommended_in__project=project
+        ).order_by('recommended_in__rank')[:3]
         
         context['similar_projects'] = similar_projects
+        context['comments'] = build_comment_tree(project.approved_comments)
         return context
 
 
@@ -302,25 +394,15 @@ class MyProjectsView(LoginRequiredMixin, TemplateView):
         user_projects = Project.objects.filter(owner=self.request.user).select_related('category').order_by('-created_at')
         
         # Statistiques
-        from apps.investments.models import Investment
-        from django.db.models import Sum, Count
-        
-        total_projects = user_projects.count()
-        active_projects = user_projects.filter(status='active').count()
-        draft_projects = user_projects.filter(status='draft').count()
-        
-        # Montant total levé
-        total_raised = Investment.objects.filter(
-            project__owner=self.request.user,
-            payment_status='completed'
-        ).aggregate(total=Sum('amount'))['total'] or 0
+        from apps.accounts.summaries import get_summary
+        summary = get_summary(self.request.user)
         
         context.update({
             'projects': user_projects,
-            'total_projects': total_projects,
-            'active_projects': active_projects,
-            'draft_projects': draft_projects,
-            'total_raised': total_raised,
+            'total_projects': summary.projects_count,
+            'active_projects': summary.projects_with_status('active'),
+            'draft_projects': summary.projects_with_status('draft'),
+            'total_raised': summary.total_raised,
         })
         
         return context
\ No newline at end of file
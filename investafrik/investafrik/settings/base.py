@@ -7,6 +7,7 @@ import os
 from pathlib import Path
 from decouple import config
 from datetime import timedelta
+from celery.schedules import crontab
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent.parent
@@ -27,6 +28,7 @@ DJANGO_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.humanize',
 ]
 
 THIRD_PARTY_APPS = [
@@ -50,6 +52,7 @@ LOCAL_APPS = [
     'apps.messaging',
     'apps.categories',
     'apps.notifications',
+    'apps.metrics',
 ]
 
 INSTALLED_APPS = DJANGO_APPS + THIRD_PARTY_APPS + LOCAL_APPS
@@ -188,6 +191,64 @@ CHANNEL_LAYERS = {
     },
 }
 
+# Celery Configuration
+CELERY_BROKER_URL = config('CELERY_BROKER_URL', default=config('REDIS_URL', default='redis://localhost:6379/0'))
+CELERY_TASK_ALWAYS_EAGER = config('CELERY_TASK_ALWAYS_EAGER', default=False, cast=bool)
+# Minutes between two refreshes of the admin dashboard snapshot
+ADMIN_DASHBOARD_REFRESH_MINUTES = config('ADMIN_DASHBOARD_REFRESH_MINUTES', default=10, cast=int)
+
+CELERY_BEAT_SCHEDULE = {
+    'close-expired-campaigns': {
+        'task': 'apps.projects.tasks.close_expired_campaigns',
+        'schedule': crontab(minute=5),
+    },
+    'refresh-project-trends': {
+        'task': 'apps.projects.tasks.refresh_project_trends',
+        'schedule': crontab(minute='*/15'),
+    },
+    'process-payment-callbacks': {
+        'task': 'apps.investments.tasks.process_payment_callbacks',
+        'schedule': crontab(),
+    },
+    'expire-reward-reservations': {
+        'task': 'apps.investments.tasks.expire_reward_reservations',
+        'schedule': crontab(minute='*/5'),
+    },
+    'backfill-recent-metrics': {
+        'task': 'apps.metrics.tasks.backfill_recent_metrics',
+        'schedule': crontab(hour=0, minute=30),
+    },
+    'refresh-admin-dashboard': {
+        'task': 'apps.metrics.tasks.refresh_admin_dashboard',
+        'schedule': timedelta(minutes=ADMIN_DASHBOARD_REFRESH_MINUTES),
+    },
+    'rebuild-project-recommendations': {
+        'task': 'apps.projects.tasks.rebuild_project_recommendations',
+        'schedule': crontab(hour=3, minute=0),
+    },
+}
+
+# Similar projects recommendations
+PROJECT_RECOMMENDATIONS_TOP_K = config('PROJECT_RECOMMENDATIONS_TOP_K', default=6, cast=int)
+
+# Payment provider callbacks: "provider:secret,provider:secret"
+PAYMENT_CALLBACK_SECRETS = dict(
+    item.split(':', 1) for item in config('PAYMENT_CALLBACK_SECRETS', default='').split(',') if ':' in item
+)
+
+# Seconds a reward stays reserved for a pending investment
+REWARD_RESERVATION_TTL = config('REWARD_RESERVATION_TTL', default=1800, cast=int)
+
+# Project views counter (write-behind buffer)
+PROJECT_VIEWS_FLUSH_INTERVAL = config('PROJECT_VIEWS_FLUSH_INTERVAL', default=30, cast=int)
+PROJECT_VIEWS_DEDUP_WINDOW = config('PROJECT_VIEWS_DEDUP_WINDOW', default=1800, cast=int)
+PROJECT_VIEWS_MAX_PENDING = config('PROJECT_VIEWS_MAX_PENDING', default=10000, cast=int)
+
+# Chat messages write-behind queue (interval in seconds)
+CHAT_WRITE_BEHIND = config('CHAT_WRITE_BEHIND', default=False, cast=bool)
+CHAT_WRITE_BEHIND_INTERVAL = config('CHAT_WRITE_BEHIND_INTERVAL', default=0.5, cast=float)
+CHAT_WRITE_BEHIND_MAX_PENDING = config('CHAT_WRITE_BEHIND_MAX_PENDING', default=5000, cast=int)
+
 # Email Configuration
 EMAIL_BACKEND = config('EMAIL_BACKEND', default='django.core.mail.backends.console.EmailBackend')
 EMAIL_HOST = config('EMAIL_HOST', default='smtp.gmail.com')
@@ -17,4 +17,7 @@ CHANNEL_LAYERS = {
     },
 }
 
+# Pas de broker Redis : tâches Celery exécutées immédiatement
+CELERY_TASK_ALWAYS_EAGER = True
+
 print("Utilisation de SQLite pour le développement")
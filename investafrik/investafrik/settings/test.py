@@ -44,6 +44,15 @@ CACHES = {
     }
 }
 
+# Flush project views explicitly in tests
+PROJECT_VIEWS_FLUSH_INTERVAL = 0
+
+# Run Celery tasks synchronously
+CELERY_TASK_ALWAYS_EAGER = True
+
+# Local fake payment provider
+PAYMENT_CALLBACK_SECRETS = {'fakepay': 'fakepay-secret'}
+
 # Logging for tests
 LOGGING = {
     'version': 1,
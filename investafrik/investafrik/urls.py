@@ -8,7 +8,8 @@ from django.conf.urls.static import static
 from django.views.generic import TemplateView
 
 urlpatterns = [
-    # Admin
+    # Admin (the dashboard first, the admin site would swallow its URL)
+    path('admin/dashboard/', include('apps.accounts.admin_urls')),
     path('admin/', admin.site.urls),
     
     # API URLs
@@ -28,9 +29,6 @@ urlpatterns = [
     path('investments/', include('apps.investments.frontend_urls')),
     path('messaging/', include('apps.messaging.frontend_urls')),
     
-    # Admin dashboard
-    path('admin/dashboard/', include('apps.accounts.admin_urls')),
-    
     # CKEditor
     path('ckeditor/', include('ckeditor_uploader.urls')),
 ]
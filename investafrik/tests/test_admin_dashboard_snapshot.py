@@ -0,0 +1,116 @@
+"""
+Tests for the cached admin dashboard snapshot.
+"""
+from django.test import TestCase, override_settings
+from django.contrib.auth import get_user_model
+from decimal import Decimal
+from datetime import date, timedelta
+
+from apps.categories.models import Category
+from apps.investments.models import Investment
+from apps.metrics.snapshot import build_snapshot
+from apps.projects.models import Project
+
+User = get_user_model()
+
+LOCMEM_CACHE = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'admin-dashboard-tests',
+    }
+}
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class AdminDashboardSnapshotTest(TestCase):
+    """Test the dashboard payload and how it is served."""
+
+    def setUp(self):
+        from django.core.cache import cache
+        cache.clear()
+        self.admin = User.objects.create_superuser(
+            email='admin@example.com', username='admin', password='testpass123',
+            first_name='Admin', last_name='User', user_type='porteur', country='CM'
+        )
+        self.owner = self.create_user('owner', 'porteur')
+        self.investor = self.create_user('investor', 'investisseur')
+        self.create_user('visitor', 'investisseur')
+        category = Category.objects.create(
+            name='Technology', description='Tech projects', icon_class='fas fa-laptop', color_hex='#2196F3'
+        )
+        self.project = Project.objects.create(
+            title='Solar Kiosk',
+            short_description='A test project',
+            full_description='<p>Full description</p>',
+            owner=self.owner,
+            category=category,
+            goal_amount=Decimal('1000000.00'),
+            country='CM',
+            start_date=date.today(),
+            end_date=date.today() + timedelta(days=30),
+            status='active'
+        )
+        for amount, status in (('50000.00', 'completed'), ('25000.00', 'completed'), ('10000.00', 'pending')):
+            investment = Investment.objects.create(
+                investor=self.investor, project=self.project, amount=Decimal(amount), payment_method='mobile_money'
+            )
+            investment.payment_status = status
+            investment.save()
+        self.client.force_login(self.admin)
+
+    def create_user(self, name, user_type):
+        return User.objects.create_user(
+            email=f'{name}@example.com',
+            username=name,
+            password='testpass123',
+            first_name=name.title(),
+            last_name='Test',
+            user_type=user_type,
+            country='SN'
+        )
+
+    def test_payload(self):
+        """Test totals, rates and lists of a freshly built snapshot."""
+        snapshot = build_snapshot()
+        self.assertEqual(snapshot['total_users'], 4)
+        self.assertEqual(snapshot['total_investments'], 3)
+        self.assertEqual(snapshot['completed_investments'], 2)
+        self.assertEqual(snapshot['new_investments_7d'], 3)
+        self.assertEqual(snapshot['total_amount_raised'], Decimal('75000.00'))
+        # The owner and the investor, out of four users
+        self.assertEqual(snapshot['conversion_rate'], 50)
+        self.assertEqual(snapshot['top_investors'], [
+            {'full_name': 'Investor Test', 'investment_count': 2, 'total_invested': Decimal('75000.00')}
+        ])
+        self.assertEqual(snapshot['top_projects'][0]['total_raised'], Decimal('75000.00'))
+        self.assertEqual(len(snapshot['user_registrations'][365]), 365)
+
+    def test_page_is_served_from_the_snapshot(self):
+        """Test a cached snapshot is served without aggregate queries."""
+        self.assertEqual(self.client.get('/admin/dashboard/').status_code, 200)
+        # Session and user only
+        with self.assertNumQueries(2):
+            response = self.client.get('/admin/dashboard/', {'period': 365})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context['investment_evolution']), 365)
+
+    def test_refresh_now(self):
+        """Test the snapshot only changes when refreshed."""
+        self.client.get('/admin/dashboard/')
+        self.create_user('newcomer', 'porteur')
+        self.assertEqual(self.client.get('/admin/dashboard/').context['total_users'], 4)
+
+        response = self.client.post('/admin/dashboard/refresh/', {'next': '/admin/dashboard/?period=90'})
+        self.assertRedirects(response, '/admin/dashboard/?period=90')
+        self.assertEqual(self.client.get('/admin/dashboard/').context['total_users'], 5)
+
+        # Only internal URLs are followed
+        response = self.client.post('/admin/dashboard/refresh/', {'next': 'https://evil.example.com/'})
+        self.assertRedirects(response, '/admin/dashboard/')
+
+    def test_refresh_requires_staff_and_post(self):
+        """Test only staff can refresh, with a POST."""
+        self.assertEqual(self.client.get('/admin/dashboard/refresh/').status_code, 405)
+        self.client.force_login(self.investor)
+        self.assertEqual(self.client.post('/admin/dashboard/refresh/').status_code, 302)
+        self.assertEqual(self.client.get('/admin/dashboard/').status_code, 302)
@@ -0,0 +1,113 @@
+"""
+Tests for closing expired funding campaigns.
+"""
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from decimal import Decimal
+from datetime import date, timedelta
+from io import StringIO
+
+from apps.categories.models import Category
+from apps.investments.models import Investment
+from apps.notifications.models import Notification
+from apps.projects.lifecycle import close_expired_campaigns
+from apps.projects.models import Project
+
+User = get_user_model()
+
+
+class CampaignLifecycleTest(TestCase):
+    """Test set-based campaign closing and bulk follow-ups."""
+
+    def setUp(self):
+        self.owner = User.objects.create_user(
+            email='owner@example.com',
+            username='owner',
+            password='testpass123',
+            first_name='Project',
+            last_name='Owner',
+            user_type='porteur',
+            country='CM'
+        )
+        self.investor = User.objects.create_user(
+            email='investor@example.com',
+            username='investor',
+            password='testpass123',
+            first_name='Investor',
+            last_name='User',
+            user_type='investisseur',
+            country='SN'
+        )
+        self.category = Category.objects.create(
+            name='Technology',
+            description='Tech projects',
+            icon_class='fas fa-laptop',
+            color_hex='#2196F3'
+        )
+        yesterday = date.today() - timedelta(days=1)
+        self.funded = self.create_project('Funded', yesterday)
+        self.unfunded = self.create_project('Unfunded', yesterday)
+        self.running = self.create_project('Running', date.today() + timedelta(days=10))
+        self.invest(self.funded, '1000000.00')
+        self.invest(self.unfunded, '200000.00')
+        self.invest(self.unfunded, '50000.00')
+
+    def create_project(self, title, end_date):
+        return Project.objects.create(
+            title=title,
+            short_description='A test project',
+            full_description='<p>Full description</p>',
+            owner=self.owner,
+            category=self.category,
+            goal_amount=Decimal('1000000.00'),
+            country='CM',
+            start_date=end_date - timedelta(days=60),
+            end_date=end_date,
+            status='active'
+        )
+
+    def invest(self, project, amount):
+        return Investment.objects.create(
+            investor=self.investor,
+            project=project,
+            amount=Decimal(amount),
+            payment_method='mobile_money',
+            payment_status='completed'
+        )
+
+    def statuses(self):
+        return {p.title: p.status for p in Project.objects.all()}
+
+    def test_expired_campaigns_are_closed_in_chunks(self):
+        """Test expired projects move to successful/failed with chunked updates."""
+        with self.captureOnCommitCallbacks(execute=True):
+            closed = close_expired_campaigns(batch_size=1)
+        self.assertEqual(closed.successful, [self.funded.pk])
+        self.assertEqual(closed.failed, [self.unfunded.pk])
+        self.assertEqual(
+            self.statuses(),
+            {'Funded': 'successful', 'Unfunded': 'failed', 'Running': 'active'}
+        )
+
+        # Owners are notified once per project, investors once per failed project.
+        self.assertEqual(Notification.objects.filter(user=self.owner).count(), 2)
+        self.assertEqual(
+            Notification.objects.filter(user=self.investor, notification_type='project_failed').count(), 1
+        )
+        refundable = Investment.objects.filter(refund_eligible_at__isnull=False)
+        self.assertEqual(set(refundable.values_list('project_id', flat=True)), {self.unfunded.pk})
+        self.assertEqual(refundable.count(), 2)
+
+        # Running again is a no-op.
+        self.assertEqual(close_expired_campaigns(), ([], []))
+
+    def test_command_dry_run(self):
+        """Test the command reports without changing anything in dry-run mode."""
+        out = StringIO()
+        call_command('close_expired_campaigns', '--dry-run', stdout=out)
+        self.assertIn('1 successful and 1 failed campaign(s) would be closed', out.getvalue())
+        self.assertEqual(self.statuses()['Unfunded'], 'active')
+
+        call_command('close_expired_campaigns', '--date', '2000-01-01', stdout=out)
+        self.assertEqual(self.statuses()['Funded'], 'active')
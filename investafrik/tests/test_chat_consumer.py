@@ -0,0 +1,198 @@
+"""
+Tests for the chat WebSocket consumer.
+"""
+import json
+import time
+
+from asgiref.sync import async_to_sync
+from channels.routing import URLRouter
+from channels.testing import WebsocketCommunicator
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TransactionTestCase, override_settings
+
+from apps.messaging.models import Conversation, Message
+from apps.messaging.routing import websocket_urlpatterns
+from apps.messaging.write_behind import MAX_FLUSH_ATTEMPTS, MessageBuffer, message_buffer
+
+User = get_user_model()
+
+IN_MEMORY_LAYER = {'default': {'BACKEND': 'channels.layers.InMemoryChannelLayer'}}
+LOAD_MESSAGES = 200
+
+application = URLRouter(websocket_urlpatterns)
+
+
+@override_settings(CHANNEL_LAYERS=IN_MEMORY_LAYER)
+class ChatConsumerTest(TransactionTestCase):
+    """Test the consumer keeps its conversation state and database trips low."""
+
+    def setUp(self):
+        self.investor = self.create_user('investor', 'investisseur')
+        self.owner = self.create_user('owner', 'porteur')
+        self.conversation = Conversation.objects.create(participant_1=self.investor, participant_2=self.owner)
+
+    def create_user(self, name, user_type):
+        return User.objects.create_user(
+            email=f'{name}@example.com',
+            username=name,
+            password='testpass123',
+            first_name=name.title(),
+            last_name='Test',
+            user_type=user_type,
+            country='SN'
+        )
+
+    async def connect(self, user, conversation=None):
+        conversation = conversation or self.conversation
+        communicator = WebsocketCommunicator(application, f'/ws/chat/{conversation.pk}/')
+        communicator.scope['user'] = user
+        connected, _ = await communicator.connect()
+        return communicator, connected
+
+    async def send(self, communicator, content):
+        await communicator.send_to(text_data=json.dumps({'type': 'chat_message', 'message': content}))
+        return json.loads(await communicator.receive_from())
+
+    def test_only_participants_connect(self):
+        """Test outsiders and unknown conversations are refused."""
+        outsider = self.create_user('outsider', 'investisseur')
+
+        async def scenario():
+            _, outsider_connected = await self.connect(outsider)
+            missing = Conversation(pk='00000000-0000-0000-0000-000000000000')
+            _, missing_connected = await self.connect(self.investor, missing)
+            communicator, connected = await self.connect(self.owner)
+            await communicator.disconnect()
+            return outsider_connected, missing_connected, connected
+
+        self.assertEqual(async_to_sync(scenario)(), (False, False, True))
+
+    def record_queries(self, queries):
+        """Append the SQL of each query to ``queries`` (usable from the consumer's threads)."""
+        def record(execute, sql, params, many, context):
+            queries.append(sql)
+            return execute(sql, params, many, context)
+        return connection.execute_wrapper(record)
+
+    def test_one_query_per_step(self):
+        """Test connect, send and mark read each hit the conversation once."""
+        queries = []
+
+        async def scenario():
+            counts = []
+            sender, _ = await self.connect(self.investor)
+            counts.append(len(queries))
+            receiver, _ = await self.connect(self.owner)
+            del queries[:]
+            event = await self.send(sender, 'Bonjour')
+            # Insert and conversation update, in a transaction
+            counts.append(len([sql for sql in queries if sql != 'BEGIN']))
+            received = json.loads(await receiver.receive_from())
+            del queries[:]
+            await receiver.send_to(text_data=json.dumps({'type': 'mark_read'}))
+            await receiver.receive_from()
+            counts.append(len(queries))
+            await sender.disconnect()
+            await receiver.disconnect()
+            return counts, event, received
+
+        with self.record_queries(queries):
+            counts, event, received = async_to_sync(scenario)()
+        self.assertEqual(counts, [1, 2, 1])
+        self.assertEqual(event, received)
+        self.assertEqual(event['message']['sender'], {
+            'id': str(self.investor.pk), 'name': 'Investor Test', 'avatar': None
+        })
+        self.conversation.refresh_from_db()
+        self.assertEqual((self.conversation.unread_count_p1, self.conversation.unread_count_p2), (0, 0))
+        self.assertEqual(self.conversation.last_message_preview, 'Bonjour')
+
+    @override_settings(CHAT_WRITE_BEHIND=True, CHAT_WRITE_BEHIND_INTERVAL=0)
+    def test_write_behind_flushes_bursts(self):
+        """Test queued messages are broadcast at once and inserted on flush."""
+        queries = []
+
+        async def scenario():
+            sender, _ = await self.connect(self.investor)
+            del queries[:]
+            events = [await self.send(sender, f'Message {i}') for i in range(5)]
+            sent_queries = len(queries)
+            await sender.disconnect()
+            return events, sent_queries
+
+        with self.record_queries(queries):
+            events, sent_queries = async_to_sync(scenario)()
+        self.assertEqual(sent_queries, 0)
+        self.assertFalse(Message.objects.exists())
+
+        self.assertEqual(message_buffer.flush(), 5)
+        self.assertEqual(
+            [str(pk) for pk in Message.objects.order_by('sent_at').values_list('id', flat=True)],
+            [event['message']['id'] for event in events]
+        )
+        self.conversation.refresh_from_db()
+        self.assertEqual(self.conversation.unread_count_p2, 5)
+        self.assertEqual(self.conversation.last_message_preview, 'Message 4')
+
+    @override_settings(CHAT_WRITE_BEHIND=True, CHAT_WRITE_BEHIND_INTERVAL=0)
+    def test_write_behind_isolates_failed_messages(self):
+        """Test a message that cannot be written is retried alone and dropped last."""
+        buffer = MessageBuffer()
+        other = Conversation.objects.create(
+            participant_1=self.owner, participant_2=self.create_user('other', 'porteur')
+        )
+        buffer.enqueue(self.conversation.pk, self.investor.pk, 'unread_count_p2', 'Bonjour')
+        buffer.enqueue(other.pk, self.owner.pk, 'unread_count_p2', 'Perdu')
+        buffer.enqueue(self.conversation.pk, self.investor.pk, 'unread_count_p2', 'Encore')
+        other.delete()
+
+        self.assertEqual(buffer.flush(), 2)
+        self.assertEqual(buffer.metrics()['pending'], 1)
+        for _ in range(MAX_FLUSH_ATTEMPTS - 1):
+            self.assertEqual(buffer.flush(), 0)
+        metrics = buffer.metrics()
+        self.assertEqual((metrics['flushed'], metrics['failed'], metrics['pending']), (2, 1, 0))
+        self.assertEqual(
+            list(Message.objects.order_by('sent_at').values_list('content', flat=True)), ['Bonjour', 'Encore']
+        )
+        self.conversation.refresh_from_db()
+        self.assertEqual(self.conversation.unread_count_p2, 2)
+
+    def load(self):
+        """Send LOAD_MESSAGES messages one at a time. Return messages/sec and p99 latency (ms)."""
+        async def scenario():
+            sender, _ = await self.connect(self.investor)
+            receiver, _ = await self.connect(self.owner)
+            latencies = []
+            started = time.perf_counter()
+            for i in range(LOAD_MESSAGES):
+                sent = time.perf_counter()
+                await self.send(sender, f'Message {i}')
+                await receiver.receive_from()
+                latencies.append(time.perf_counter() - sent)
+            elapsed = time.perf_counter() - started
+            await sender.disconnect()
+            await receiver.disconnect()
+            return elapsed, latencies
+
+        elapsed, latencies = async_to_sync(scenario)()
+        latencies.sort()
+        p99 = latencies[int(len(latencies) * 0.99) - 1] * 1000
+        return LOAD_MESSAGES / elapsed, p99
+
+    def test_load(self):
+        """Report throughput and p99 latency, posting directly and with the write-behind queue."""
+        direct = self.load()
+        with override_settings(CHAT_WRITE_BEHIND=True, CHAT_WRITE_BEHIND_INTERVAL=0):
+            buffered = self.load()
+            message_buffer.flush()
+        print(
+            f'\nchat load ({LOAD_MESSAGES} messages): '
+            f'direct {direct[0]:.0f} msg/s, p99 {direct[1]:.1f} ms; '
+            f'write-behind {buffered[0]:.0f} msg/s, p99 {buffered[1]:.1f} ms'
+        )
+
+        self.assertEqual(Message.objects.count(), 2 * LOAD_MESSAGES)
+        self.conversation.refresh_from_db()
+        self.assertEqual(self.conversation.unread_count_p2, 2 * LOAD_MESSAGES)
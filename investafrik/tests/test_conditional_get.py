@@ -0,0 +1,142 @@
+"""
+Tests for ETag / Last-Modified conditional responses.
+"""
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from decimal import Decimal
+from datetime import date, timedelta
+
+from apps.categories.models import Category
+from apps.investments.models import Investment
+from apps.notifications.models import Notification
+from apps.projects.models import Project
+
+User = get_user_model()
+
+
+class ConditionalGetTest(TestCase):
+    """Test 304 answers of the projects, categories and notifications APIs."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.owner = User.objects.create_user(
+            email='owner@example.com',
+            username='owner',
+            password='testpass123',
+            first_name='Project',
+            last_name='Owner',
+            user_type='porteur',
+            country='CM'
+        )
+        self.investor = User.objects.create_user(
+            email='investor@example.com',
+            username='investor',
+            password='testpass123',
+            first_name='Test',
+            last_name='Investor',
+            user_type='investisseur',
+            country='SN'
+        )
+        self.category = Category.objects.create(
+            name='Technology',
+            description='Tech projects',
+            icon_class='fas fa-laptop',
+            color_hex='#2196F3'
+        )
+        self.project = Project.objects.create(
+            title='Solar Kiosk',
+            short_description='A test project',
+            full_description='<p>Full description</p>',
+            owner=self.owner,
+            category=self.category,
+            goal_amount=Decimal('1000000.00'),
+            country='CM',
+            start_date=date.today(),
+            end_date=date.today() + timedelta(days=30),
+            status='active'
+        )
+
+    def revalidate(self, url, response):
+        return self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+
+    def test_project_detail_not_modified(self):
+        """Test a matching ETag is a 304 answered from one query."""
+        url = f'/api/projects/{self.project.slug}/'
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('Last-Modified', response)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.revalidate(url, response)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+        self.assertEqual(len(queries), 1)
+
+        response = self.client.get(url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+        self.assertEqual(response.status_code, 304)
+
+    def test_project_detail_changes_with_funding(self):
+        """Test a completed payment invalidates the project validators."""
+        url = f'/api/projects/{self.project.slug}/'
+        first = self.client.get(url)
+        investment = Investment.objects.create(
+            project=self.project,
+            investor=self.investor,
+            amount=Decimal('50000.00'),
+            payment_method='mobile_money',
+            payment_status='pending'
+        )
+        investment.payment_status = 'completed'
+        investment.save()
+
+        response = self.revalidate(url, first)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(Decimal(response.data['current_amount']), Decimal('50000.00'))
+        self.assertNotEqual(response['ETag'], first['ETag'])
+
+    def test_project_list_not_modified(self):
+        """Test list validators follow the filters and the rows."""
+        first = self.client.get('/api/projects/')
+        self.assertEqual(self.revalidate('/api/projects/', first).status_code, 304)
+        self.assertEqual(self.revalidate('/api/projects/?status=draft', first).status_code, 200)
+
+        self.project.delete()
+        self.assertEqual(self.revalidate('/api/projects/', first).status_code, 200)
+
+    def test_missing_project_is_not_found(self):
+        """Test unknown slugs still answer 404."""
+        response = self.client.get('/api/projects/unknown/', HTTP_IF_NONE_MATCH='"abc"')
+        self.assertEqual(response.status_code, 404)
+
+    def test_category_follows_project_changes(self):
+        """Test category stats changes invalidate the category validators."""
+        self.client.force_authenticate(self.investor)
+        url = f'/api/categories/{self.category.slug}/'
+        first = self.client.get(url)
+        self.assertEqual(self.revalidate(url, first).status_code, 304)
+
+        self.project.status = 'successful'
+        self.project.save()
+        self.assertEqual(self.revalidate(url, first).status_code, 200)
+
+    def test_notifications_follow_reads(self):
+        """Test reading notifications invalidates the list validators."""
+        Notification.objects.create(
+            user=self.investor,
+            notification_type='system',
+            title='Bienvenue',
+            message='Bienvenue sur InvestAfrik',
+        )
+        self.client.force_authenticate(self.investor)
+        first = self.client.get('/api/notifications/')
+        self.assertEqual(self.revalidate('/api/notifications/', first).status_code, 304)
+
+        self.client.post('/api/notifications/mark-all-read/')
+        self.assertEqual(self.revalidate('/api/notifications/', first).status_code, 200)
+
+        # Validators are per user.
+        self.client.force_authenticate(self.owner)
+        self.assertEqual(self.revalidate('/api/notifications/', first).status_code, 200)
@@ -0,0 +1,158 @@
+"""
+Tests for the per-user dashboard summaries.
+"""
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.utils import timezone
+from rest_framework.test import APIClient
+from decimal import Decimal
+from datetime import date, timedelta
+from io import StringIO
+
+from apps.accounts.models import DashboardSummary
+from apps.accounts.summaries import get_summary, write_summaries
+from apps.categories.models import Category
+from apps.investments.models import Investment
+from apps.projects.models import Project
+
+User = get_user_model()
+
+
+class DashboardSummaryTest(TestCase):
+    """Test summaries follow status transitions and feed the dashboards."""
+
+    def setUp(self):
+        self.owner = User.objects.create_user(
+            email='owner@example.com',
+            username='owner',
+            password='testpass123',
+            first_name='Project',
+            last_name='Owner',
+            user_type='porteur',
+            country='CM'
+        )
+        self.investor = User.objects.create_user(
+            email='investor@example.com',
+            username='investor',
+            password='testpass123',
+            first_name='Test',
+            last_name='Investor',
+            user_type='investisseur',
+            country='SN'
+        )
+        self.category = Category.objects.create(
+            name='Technology', description='Tech projects', icon_class='fas fa-laptop', color_hex='#2196F3'
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            self.project = self.create_project('Solar Kiosk', 'active')
+            self.create_project('Cassava mill', 'draft')
+
+    def create_project(self, title, status):
+        return Project.objects.create(
+            title=title,
+            short_description='A test project',
+            full_description='<p>Full description</p>',
+            owner=self.owner,
+            category=self.category,
+            goal_amount=Decimal('1000000.00'),
+            country='CM',
+            start_date=date.today(),
+            end_date=date.today() + timedelta(days=30),
+            status=status
+        )
+
+    def invest(self, amount, status='completed'):
+        with self.captureOnCommitCallbacks(execute=True):
+            investment = Investment.objects.create(
+                investor=self.investor,
+                project=self.project,
+                amount=Decimal(amount),
+                payment_method='mobile_money'
+            )
+        if status != 'pending':
+            with self.captureOnCommitCallbacks(execute=True):
+                investment.payment_status = status
+                investment.save()
+        return investment
+
+    def test_summaries_follow_transitions(self):
+        """Test project and payment status changes update both sides."""
+        self.invest('50000.00')
+        self.invest('25000.00')
+        pending = self.invest('10000.00', status='pending')
+
+        owner = DashboardSummary.objects.get(user=self.owner)
+        self.assertEqual(owner.projects_count, 2)
+        self.assertEqual(owner.project_status_counts, {'active': 1, 'draft': 1})
+        self.assertEqual(owner.total_raised, Decimal('75000.00'))
+        self.assertEqual(owner.backers_count, 1)
+        investor = DashboardSummary.objects.get(user=self.investor)
+        self.assertEqual(investor.total_invested, Decimal('75000.00'))
+        self.assertEqual(investor.invested_projects_count, 1)
+        self.assertEqual(investor.investment_status_counts, {'completed': 2, 'pending': 1})
+
+        with self.captureOnCommitCallbacks(execute=True):
+            pending.payment_status = 'failed'
+            pending.save()
+            self.project.status = 'successful'
+            self.project.save()
+        owner.refresh_from_db()
+        self.assertEqual(owner.project_status_counts, {'successful': 1, 'draft': 1})
+        investor.refresh_from_db()
+        self.assertEqual(investor.investment_status_counts, {'completed': 2, 'failed': 1})
+
+    def test_deleted_project_refreshes_investors(self):
+        """Test deleting a project updates the dashboards of its owner and investors."""
+        self.invest('50000.00')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.project.delete()
+        self.assertEqual(DashboardSummary.objects.get(user=self.owner).total_raised, Decimal('0'))
+        investor = DashboardSummary.objects.get(user=self.investor)
+        self.assertEqual((investor.investments_count, investor.total_invested), (0, Decimal('0')))
+
+    def test_rebuild_command(self):
+        """Test the rebuild command recomputes rows from scratch."""
+        self.invest('50000.00')
+        DashboardSummary.objects.all().delete()
+        call_command('rebuild_dashboard_summaries', stdout=StringIO())
+        self.assertEqual(DashboardSummary.objects.get(user=self.owner).total_raised, Decimal('50000.00'))
+        self.assertEqual(DashboardSummary.objects.get(user=self.investor).total_invested, Decimal('50000.00'))
+
+    def test_older_computation_does_not_overwrite(self):
+        """Test a refresh that started before the stored one is dropped."""
+        self.invest('50000.00')
+        stored = DashboardSummary.objects.get(user=self.owner)
+        earlier = stored.computed_at - timedelta(seconds=1)
+        stale = DashboardSummary(user=self.owner, computed_at=earlier)
+        self.assertEqual(write_summaries([stale], earlier), 0)
+        self.assertEqual(DashboardSummary.objects.get(user=self.owner).total_raised, Decimal('50000.00'))
+
+        later = timezone.now()
+        self.assertEqual(write_summaries([DashboardSummary(user=self.owner, computed_at=later)], later), 1)
+        self.assertEqual(DashboardSummary.objects.get(user=self.owner).total_raised, Decimal('0'))
+
+    def test_missing_summary_is_computed(self):
+        """Test a user without a row gets one on first read."""
+        self.invest('50000.00')
+        DashboardSummary.objects.filter(user=self.owner).delete()
+        self.assertEqual(get_summary(self.owner).total_raised, Decimal('50000.00'))
+
+    def test_dashboards_read_one_row(self):
+        """Test the dashboards read the summary row plus their page queries."""
+        self.invest('50000.00')
+        client = APIClient()
+        client.force_authenticate(self.owner)
+        # Summary and recent projects (with their category)
+        with self.assertNumQueries(2):
+            response = client.get('/api/auth/users/dashboard_stats/')
+        self.assertEqual(response.data['stats'], {
+            'total_projects': 2, 'active_projects': 1, 'total_raised': 50000.0, 'total_investors': 1
+        })
+        recent = {project['slug']: project for project in response.data['recent_projects']}
+        self.assertEqual(recent[self.project.slug]['current_amount'], 50000.0)
+
+        self.client.force_login(self.investor)
+        response = self.client.get('/auth/dashboard/investisseur/')
+        self.assertEqual(response.context['total_invested'], Decimal('50000.00'))
+        self.assertEqual(response.context['total_investments'], 1)
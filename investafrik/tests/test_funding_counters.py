@@ -0,0 +1,143 @@
+"""
+Tests for incremental project funding counters.
+"""
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from decimal import Decimal
+from datetime import date, timedelta
+from io import StringIO
+
+from apps.categories.models import Category
+from apps.projects.models import Project
+from apps.projects.counters import reconcile_counters
+from apps.investments.models import Investment
+
+User = get_user_model()
+
+
+class FundingCountersTest(TestCase):
+    """Test F() counter maintenance on payment status transitions."""
+
+    def setUp(self):
+        self.porteur = User.objects.create_user(
+            email='porteur@example.com',
+            username='porteur',
+            password='testpass123',
+            first_name='Project',
+            last_name='Owner',
+            user_type='porteur',
+            country='CM'
+        )
+        self.investor = User.objects.create_user(
+            email='investor@example.com',
+            username='investor',
+            password='testpass123',
+            first_name='Investor',
+            last_name='User',
+            user_type='investisseur',
+            country='SN'
+        )
+        self.category = Category.objects.create(
+            name='Technology',
+            description='Tech projects',
+            icon_class='fas fa-laptop',
+            color_hex='#2196F3'
+        )
+        self.project = Project.objects.create(
+            title='Test Project',
+            short_description='A test project',
+            full_description='<p>Full description</p>',
+            owner=self.porteur,
+            category=self.category,
+            goal_amount=Decimal('1000000.00'),
+            country='CM',
+            start_date=date.today(),
+            end_date=date.today() + timedelta(days=60),
+            status='active'
+        )
+
+    def invest(self, amount, status='pending'):
+        return Investment.objects.create(
+            investor=self.investor,
+            project=self.project,
+            amount=Decimal(amount),
+            payment_method='mobile_money',
+            payment_status=status
+        )
+
+    def test_completion_applies_delta(self):
+        """Test pending -> completed adds the amount and the investor."""
+        investment = self.invest('50000.00')
+        self.project.refresh_from_db()
+        self.assertEqual(self.project.current_amount, Decimal('0'))
+
+        investment.payment_status = 'completed'
+        investment.save()
+
+        self.project.refresh_from_db()
+        self.assertEqual(self.project.current_amount, Decimal('50000.00'))
+        self.assertEqual(self.project.investor_count, 1)
+
+    def test_resave_does_not_count_twice(self):
+        """Test re-saving a completed investment leaves counters alone."""
+        investment = self.invest('50000.00', status='completed')
+        investment.message = 'Merci'
+        investment.save()
+
+        reloaded = Investment.objects.get(pk=investment.pk)
+        reloaded.save()
+
+        self.project.refresh_from_db()
+        self.assertEqual(self.project.current_amount, Decimal('50000.00'))
+        self.assertEqual(self.project.investor_count, 1)
+
+    def test_deferred_status_is_read_on_save(self):
+        """Test an investment loaded without its status compares with the stored one."""
+        investment = self.invest('50000.00', status='completed')
+        Investment.objects.only('id', 'message').get(pk=investment.pk).save()
+
+        pending = self.invest('20000.00')
+        deferred = Investment.objects.defer('payment_status').get(pk=pending.pk)
+        deferred.payment_status = 'completed'
+        deferred.save()
+
+        self.project.refresh_from_db()
+        self.assertEqual(self.project.current_amount, Decimal('70000.00'))
+        self.assertEqual(self.project.investor_count, 1)
+
+    def test_unique_investor_and_refund(self):
+        """Test the investor counts once and refunds revert the deltas."""
+        first = self.invest('50000.00', status='completed')
+        self.invest('20000.00', status='completed')
+
+        self.project.refresh_from_db()
+        self.assertEqual(self.project.current_amount, Decimal('70000.00'))
+        self.assertEqual(self.project.investor_count, 1)
+
+        first.payment_status = 'refunded'
+        first.save()
+        self.project.refresh_from_db()
+        self.assertEqual(self.project.current_amount, Decimal('20000.00'))
+        self.assertEqual(self.project.investor_count, 1)
+
+    def test_reconcile_reports_and_fixes_drift(self):
+        """Test reconciliation re-derives totals from investments."""
+        self.invest('50000.00', status='completed')
+        Project.objects.filter(pk=self.project.pk).update(
+            current_amount=Decimal('1.00'), investor_count=7
+        )
+
+        drifts = reconcile_counters(fix=False)
+        self.assertEqual(len(drifts), 1)
+        self.assertEqual(drifts[0].expected_amount, Decimal('50000.00'))
+        self.assertEqual(drifts[0].expected_investors, 1)
+
+        out = StringIO()
+        call_command('reconcile_project_counters', stdout=out)
+        self.assertIn('1 project(s) fixed', out.getvalue())
+
+        self.project.refresh_from_db()
+        self.assertEqual(self.project.current_amount, Decimal('50000.00'))
+        self.assertEqual(self.project.investor_count, 1)
+        self.assertEqual(reconcile_counters(), [])
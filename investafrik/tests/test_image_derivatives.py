@@ -0,0 +1,126 @@
+"""
+Tests for resized derivatives of project images.
+"""
+import io
+import shutil
+import tempfile
+
+from django.test import TestCase, override_settings
+from django.contrib.auth import get_user_model
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.template import Context, Template
+from rest_framework.test import APIClient
+from decimal import Decimal
+from datetime import date, timedelta
+from io import StringIO
+from PIL import Image
+
+from apps.categories.models import Category
+from apps.projects.images import derivative_path
+from apps.projects.models import Project
+
+User = get_user_model()
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+def photo(color='red', size=(2000, 1000)):
+    buffer = io.BytesIO()
+    Image.new('RGB', size, color).save(buffer, 'JPEG')
+    return SimpleUploadedFile('photo.jpg', buffer.getvalue(), content_type='image/jpeg')
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class ImageDerivativesTest(TestCase):
+    """Test derivative generation, reuse and rendering."""
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        self.owner = User.objects.create_user(
+            email='owner@example.com',
+            username='owner',
+            password='testpass123',
+            first_name='Project',
+            last_name='Owner',
+            user_type='porteur',
+            country='CM'
+        )
+        self.category = Category.objects.create(
+            name='Technology',
+            description='Tech projects',
+            icon_class='fas fa-laptop',
+            color_hex='#2196F3'
+        )
+
+    def create_project(self, title, image):
+        with self.captureOnCommitCallbacks(execute=True):
+            project = Project.objects.create(
+                title=title,
+                short_description='A test project',
+                full_description='<p>Full description</p>',
+                owner=self.owner,
+                category=self.category,
+                goal_amount=Decimal('1000000.00'),
+                country='CM',
+                start_date=date.today(),
+                end_date=date.today() + timedelta(days=60),
+                status='active',
+                featured_image=image
+            )
+        project.refresh_from_db()
+        return project
+
+    def test_derivatives_are_generated_after_upload(self):
+        """Test every variant is stored at the expected width."""
+        project = self.create_project('Photo project', photo())
+        self.assertEqual(len(project.featured_image_hash), 64)
+        with default_storage.open(derivative_path(project.featured_image_hash, 'card', 'jpg')) as f:
+            self.assertEqual(Image.open(f).size, (640, 320))
+        with default_storage.open(derivative_path(project.featured_image_hash, 'thumb', 'webp')) as f:
+            self.assertEqual(Image.open(f).format, 'WEBP')
+
+    def test_reupload_reuses_derivatives(self):
+        """Test the same content maps to the same, already generated derivatives."""
+        first = self.create_project('First', photo('blue'))
+        path = derivative_path(first.featured_image_hash, 'hero', 'jpg')
+        modified = default_storage.get_modified_time(path)
+        second = self.create_project('Second', photo('blue'))
+        self.assertEqual(second.featured_image_hash, first.featured_image_hash)
+        self.assertEqual(default_storage.get_modified_time(path), modified)
+
+        second.featured_image = photo('green')
+        with self.captureOnCommitCallbacks(execute=True):
+            second.save()
+        second.refresh_from_db()
+        self.assertNotEqual(second.featured_image_hash, first.featured_image_hash)
+
+    def test_template_tag_and_serializer_emit_srcset(self):
+        """Test the template tag and API expose the variants."""
+        project = self.create_project('Srcset project', photo())
+        html = Template(
+            "{% load project_images %}{% responsive_image p.featured_image p.featured_image_hash 'card' alt=p.title %}"
+        ).render(Context({'p': project}))
+        self.assertIn('<source type="image/webp"', html)
+        self.assertIn('card.jpg 640w', html)
+        self.assertIn('loading="lazy"', html)
+
+        response = APIClient().get('/api/projects/')
+        variants = response.data['results'][0]['featured_image_variants']
+        self.assertTrue(variants['src'].startswith('http://testserver/media/derivatives/'))
+        self.assertIn('hero.webp 1600w', variants['webp_srcset'])
+
+    def test_backfill_command(self):
+        """Test the command generates derivatives for images without a hash."""
+        project = self.create_project('Backfill project', photo())
+        Project.objects.filter(pk=project.pk).update(featured_image_hash='')
+        out = StringIO()
+        call_command('generate_image_derivatives', stdout=out)
+        self.assertIn('1 image(s) processed', out.getvalue())
+        project.refresh_from_db()
+        self.assertEqual(len(project.featured_image_hash), 64)
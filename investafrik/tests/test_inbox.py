@@ -0,0 +1,96 @@
+"""
+Tests for the conversation inbox.
+"""
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from apps.messaging.models import Conversation, Message
+from apps.messaging.posting import post_message
+
+User = get_user_model()
+
+
+class InboxTest(TestCase):
+    """Test the inbox reads a constant number of queries."""
+
+    def setUp(self):
+        self.user = self.create_user('owner', 'porteur')
+        self.api = APIClient()
+        self.api.force_authenticate(self.user)
+
+    def create_user(self, name, user_type):
+        return User.objects.create_user(
+            email=f'{name}@example.com',
+            username=name,
+            password='testpass123',
+            first_name=name.title(),
+            last_name='Test',
+            user_type=user_type,
+            country='SN'
+        )
+
+    def create_conversations(self, count, start=0):
+        for i in range(start, start + count):
+            other = self.create_user(f'investor{i}', 'investisseur')
+            # The user is on either side of the pair
+            conversation, _ = Conversation.get_or_create_conversation(self.user, other)
+            post_message(conversation, other, f'Bonjour {i}')
+
+    def count_queries(self, url, client):
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(queries), response
+
+    def test_for_user(self):
+        """Test conversations are found on both participant columns, and only those."""
+        self.create_conversations(4)
+        stranger = self.create_user('stranger', 'investisseur')
+        Conversation.get_or_create_conversation(stranger, self.create_user('other', 'porteur'))
+
+        conversations = Conversation.objects.for_user(self.user)
+        self.assertEqual(conversations.count(), 4)
+        self.assertIn('UNION ALL', str(conversations.query))
+        self.assertFalse(conversations.filter(participant_1=stranger).exists())
+
+    def test_last_message_is_denormalized(self):
+        """Test posting records the last message on the conversation."""
+        self.create_conversations(1)
+        conversation = Conversation.objects.for_user(self.user).get()
+        message = post_message(conversation, self.user, 'Merci')
+        conversation.refresh_from_db()
+        self.assertEqual(conversation.last_message, message)
+
+        response = self.api.get('/api/messaging/conversations/')
+        self.assertEqual(response.data['results'][0]['last_message']['content'], 'Merci')
+
+    def test_api_queries_do_not_grow_with_the_inbox(self):
+        """Test the API inbox costs the same queries for 5 and 50 conversations."""
+        self.create_conversations(5)
+        small, _ = self.count_queries('/api/messaging/conversations/', self.api)
+        self.create_conversations(45, start=5)
+        large, response = self.count_queries('/api/messaging/conversations/', self.api)
+        self.assertEqual(small, large)
+        self.assertEqual(response.data['count'], 50)
+        self.assertEqual(response.data['results'][0]['last_message']['content'], 'Bonjour 49')
+        self.assertEqual(response.data['results'][0]['other_participant']['username'], 'investor49')
+
+    def test_page_queries_do_not_grow_with_the_inbox(self):
+        """Test the conversations page costs the same queries for 5 and 50 conversations."""
+        self.client.force_login(self.user)
+        self.create_conversations(5)
+        small, _ = self.count_queries('/messaging/conversations/', self.client)
+        self.create_conversations(45, start=5)
+        large, response = self.count_queries('/messaging/conversations/', self.client)
+        self.assertEqual(small, large)
+        self.assertEqual(response.context['unread_count'], 50)
+
+    def test_deleted_last_message_is_hidden(self):
+        """Test a deleted last message is not shown."""
+        self.create_conversations(1)
+        Message.objects.update(is_deleted=True)
+        response = self.api.get('/api/messaging/conversations/')
+        self.assertIsNone(response.data['results'][0]['last_message'])
@@ -0,0 +1,142 @@
+"""
+Tests for streaming investment exports.
+"""
+import csv
+import io
+import json
+from unittest import mock
+
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+from rest_framework.test import APIClient
+from decimal import Decimal
+from datetime import date, timedelta
+
+from apps.categories.models import Category
+from apps.investments import exports
+from apps.investments.models import Investment
+from apps.projects.models import Project
+
+User = get_user_model()
+
+
+class InvestmentExportTest(TestCase):
+    """Test CSV and JSON Lines exports of backer lists."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.owner = User.objects.create_user(
+            email='owner@example.com',
+            username='owner',
+            password='testpass123',
+            first_name='Project',
+            last_name='Owner',
+            user_type='porteur',
+            country='CM'
+        )
+        self.investor = User.objects.create_user(
+            email='investor@example.com',
+            username='investor',
+            password='testpass123',
+            first_name='Aïcha',
+            last_name='Diallo',
+            user_type='investisseur',
+            country='SN'
+        )
+        category = Category.objects.create(
+            name='Technology',
+            description='Tech projects',
+            icon_class='fas fa-laptop',
+            color_hex='#2196F3'
+        )
+        self.projects = [
+            Project.objects.create(
+                title=f'Project {i}',
+                short_description='A test project',
+                full_description='<p>Full description</p>',
+                owner=self.owner,
+                category=category,
+                goal_amount=Decimal('1000000.00'),
+                country='CM',
+                start_date=date.today(),
+                end_date=date.today() + timedelta(days=30),
+                status='active'
+            )
+            for i in range(2)
+        ]
+        self.investments = [
+            Investment.objects.create(
+                project=self.projects[i % 2],
+                investor=self.investor,
+                amount=Decimal(10000 * (i + 1)),
+                payment_method='mobile_money',
+                payment_status='completed' if i % 3 else 'pending'
+            )
+            for i in range(5)
+        ]
+        self.client.force_authenticate(self.owner)
+
+    def content(self, response):
+        self.assertTrue(response.streaming)
+        return b''.join(response.streaming_content).decode('utf-8-sig')
+
+    def test_project_csv(self):
+        """Test a project export lists its investments with a header row."""
+        response = self.client.get(f'/api/investments/export/{self.projects[0].slug}/')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('text/csv'))
+        self.assertIn('attachment;', response['Content-Disposition'])
+
+        rows = list(csv.DictReader(io.StringIO(self.content(response))))
+        expected = [str(i.pk) for i in self.investments if i.project_id == self.projects[0].pk]
+        self.assertEqual([row['id'] for row in rows], expected)
+        self.assertEqual(rows[0]['investor_first_name'], 'Aïcha')
+
+    def test_csv_neutralizes_formulas(self):
+        """Test user-supplied cells that start like a formula are exported as text."""
+        User.objects.filter(pk=self.investor.pk).update(first_name='=HYPERLINK("http://x")', last_name='-2+3')
+        response = self.client.get(f'/api/investments/export/{self.projects[0].slug}/')
+        rows = list(csv.DictReader(io.StringIO(self.content(response))))
+        self.assertEqual(rows[0]['investor_first_name'], '\'=HYPERLINK("http://x")')
+        self.assertEqual(rows[0]['investor_last_name'], "'-2+3")
+        self.assertEqual(rows[0]['amount'], '10000.00')
+
+    def test_owner_jsonl_with_filters(self):
+        """Test the owner export in JSON Lines, filtered by status and dates."""
+        response = self.client.get('/api/investments/export/', {
+            'format': 'jsonl',
+            'status': 'completed',
+            'date_from': date.today().isoformat(),
+            'date_to': date.today().isoformat(),
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('application/x-ndjson'))
+        lines = [json.loads(line) for line in self.content(response).splitlines()]
+        self.assertEqual(len(lines), 3)
+        self.assertTrue(all(line['payment_status'] == 'completed' for line in lines))
+
+        response = self.client.get('/api/investments/export/', {
+            'format': 'jsonl', 'date_from': (date.today() + timedelta(days=1)).isoformat(),
+        })
+        self.assertEqual(self.content(response), '')
+
+    def test_rows_are_read_in_keyset_batches(self):
+        """Test rows come in batches and every row is read exactly once."""
+        queryset = exports.export_queryset(self.owner)
+        with mock.patch.object(exports, 'BATCH_SIZE', 2):
+            with self.assertNumQueries(3):
+                rows = list(exports.iter_rows(queryset))
+        ids = [row[exports.HEADER.index('id')] for row in rows]
+        self.assertEqual(ids, list(queryset.order_by('invested_at', 'id').values_list('id', flat=True)))
+
+    def test_access_and_validation(self):
+        """Test only the owner can export a project and parameters are validated."""
+        self.client.force_authenticate(self.investor)
+        response = self.client.get(f'/api/investments/export/{self.projects[0].slug}/')
+        self.assertEqual(response.status_code, 403)
+
+        self.client.force_authenticate(self.owner)
+        response = self.client.get('/api/investments/export/', {
+            'format': 'jsonl', 'date_from': '2024-02-01', 'date_to': '2024-01-01',
+        })
+        self.assertEqual(response.status_code, 400)
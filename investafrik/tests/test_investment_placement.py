@@ -0,0 +1,298 @@
+"""
+Tests for investment placement and its concurrency safety.
+"""
+import threading
+import time
+from unittest import mock
+
+from django.conf import settings
+from django.test import TestCase, TransactionTestCase
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError
+from django.db import OperationalError, connection
+from django.utils import timezone
+from rest_framework.test import APIClient
+from decimal import Decimal
+from datetime import date, timedelta
+
+from apps.categories.models import Category
+from apps.investments.models import Investment, InvestmentReward, InvestmentRewardChoice, RewardReservation
+from apps.investments.placement import expire_reservations, place_investment
+from apps.metrics import tasks as metrics_tasks
+from apps.metrics.models import DailyMetric
+from apps.projects.models import Project
+
+User = get_user_model()
+
+
+class PlacementFixtures:
+
+    def create_fixtures(self, investors=1):
+        self.owner = User.objects.create_user(
+            email='owner@example.com',
+            username='owner',
+            password='testpass123',
+            first_name='Project',
+            last_name='Owner',
+            user_type='porteur',
+            country='CM'
+        )
+        self.investors = [
+            User.objects.create_user(
+                email=f'investor{i}@example.com',
+                username=f'investor{i}',
+                password='testpass123',
+                first_name='Test',
+                last_name='Investor',
+                user_type='investisseur',
+                country='SN'
+            )
+            for i in range(investors)
+        ]
+        category = Category.objects.create(
+            name='Technology',
+            description='Tech projects',
+            icon_class='fas fa-laptop',
+            color_hex='#2196F3'
+        )
+        self.project = Project.objects.create(
+            title='Solar Kiosk',
+            short_description='A test project',
+            full_description='<p>Full description</p>',
+            owner=self.owner,
+            category=category,
+            goal_amount=Decimal('1000000.00'),
+            country='CM',
+            start_date=date.today() - timedelta(days=1),
+            end_date=date.today() + timedelta(days=30),
+            status='active'
+        )
+        self.reward = InvestmentReward.objects.create(
+            project=self.project,
+            title='Early bird',
+            description='Limited edition kit',
+            minimum_amount=Decimal('20000.00'),
+            is_limited=True,
+            quantity_available=5
+        )
+
+
+class InvestmentPlacementTest(PlacementFixtures, TestCase):
+    """Test validation of the invest endpoint."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.create_fixtures()
+        self.client.force_authenticate(self.investors[0])
+
+    def invest(self, **data):
+        data.setdefault('amount', '25000.00')
+        data.setdefault('payment_method', 'mobile_money')
+        return self.client.post(f'/api/projects/{self.project.slug}/invest/', data, format='json')
+
+    def test_invest_with_reward(self):
+        """Test a placement creates a pending investment and claims the reward."""
+        response = self.invest(reward=self.reward.pk)
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['payment_status'], 'pending')
+        investment = Investment.objects.get()
+        self.assertEqual(investment.reward_choice.reward, self.reward)
+        self.reward.refresh_from_db()
+        self.assertEqual(self.reward.quantity_claimed, 1)
+
+        investment.payment_status = 'failed'
+        investment.save()
+        self.reward.refresh_from_db()
+        self.assertEqual(self.reward.quantity_claimed, 0)
+
+    def test_rejected_placements(self):
+        """Test closed projects, low amounts and sold out rewards are refused."""
+        response = self.invest(reward=self.reward.pk, amount='5000.00')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('amount', response.data)
+
+        InvestmentReward.objects.filter(pk=self.reward.pk).update(quantity_claimed=5)
+        response = self.invest(reward=self.reward.pk)
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('reward', response.data)
+        # The claim comes last and rolls the placement back
+        self.assertFalse(RewardReservation.objects.exists())
+
+        Project.objects.filter(pk=self.project.pk).update(end_date=date.today() - timedelta(days=1))
+        response = self.invest()
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('project', response.data)
+        self.assertFalse(Investment.objects.exists())
+
+    def test_owner_cannot_invest(self):
+        """Test porteurs cannot invest, in their project or elsewhere."""
+        self.client.force_authenticate(self.owner)
+        self.assertEqual(self.invest().status_code, 400)
+
+    def test_investments_are_private_and_read_only(self):
+        """Test investors only see their investments and cannot change their status."""
+        self.invest()
+        investment = Investment.objects.get()
+        url = f'/api/investments/{investment.pk}/'
+        self.assertEqual(self.client.patch(url, {'payment_status': 'completed'}, format='json').status_code, 405)
+        self.assertEqual(self.client.put(url, {'payment_status': 'completed'}, format='json').status_code, 405)
+        investment.refresh_from_db()
+        self.assertEqual(investment.payment_status, 'pending')
+
+        self.client.force_authenticate(self.owner)
+        self.assertEqual(self.client.get(url).status_code, 404)
+        self.assertEqual(self.client.get('/api/investments/').data['count'], 0)
+
+
+class InvestmentConcurrencyTest(PlacementFixtures, TransactionTestCase):
+    """Stress placements and payments of many threads on one project."""
+
+    THREADS = 12
+    ATTEMPTS = 4
+
+    def setUp(self):
+        self.create_fixtures(investors=self.THREADS)
+
+    def run_investor(self, investor, results):
+        try:
+            for attempt in range(self.ATTEMPTS):
+                reward = self.reward if attempt % 2 == 0 else None
+                try:
+                    investment = self.retry(lambda: place_investment(
+                        investor, self.project, Decimal('20000.00'), 'mobile_money', reward=reward
+                    ))
+                except ValidationError:
+                    results.append('sold_out')
+                    continue
+                investment.payment_status = 'completed'
+                self.retry(investment.save)
+                results.append('completed')
+        except Exception as exc:
+            results.append(exc)
+        finally:
+            connection.close()
+
+    def retry(self, operation):
+        # SQLite serializes writers and may refuse a lock instead of waiting.
+        for _ in range(200):
+            try:
+                return operation()
+            except OperationalError:
+                time.sleep(0.005)
+        return operation()
+
+    def backoff(self, task):
+        """
+        Make the eager retries of ``task`` wait, as a worker would, and insist
+        as ``retry`` does: SQLite refuses locks instead of waiting for them.
+        """
+        retry = task.retry
+
+        def delayed_retry(*args, **kwargs):
+            time.sleep(0.01)
+            return retry(*args, **kwargs)
+        return mock.patch.multiple(task, retry=delayed_retry, max_retries=50)
+
+    def test_totals_and_stock_stay_exact(self):
+        """Test concurrent investors never oversell a reward or lose an amount."""
+        results = []
+        threads = [
+            threading.Thread(target=self.run_investor, args=(investor, results))
+            for investor in self.investors
+        ]
+        with self.backoff(metrics_tasks.record_payment_transition):
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        self.assertEqual([result for result in results if isinstance(result, Exception)], [])
+        completed = Investment.objects.filter(project=self.project, payment_status='completed')
+        self.assertEqual(results.count('completed'), completed.count())
+        self.reward.refresh_from_db()
+        self.assertEqual(self.reward.quantity_claimed, 5)
+        self.assertEqual(self.reward.chosen_by.count(), 5)
+
+        self.project.refresh_from_db()
+        self.assertEqual(self.project.current_amount, Decimal('20000.00') * completed.count())
+        self.assertEqual(self.project.investor_count, self.THREADS)
+
+        # Every completed payment moved the funding buckets exactly once
+        funding = DailyMetric.objects.get(metric='funding', dimension='', day=timezone.localdate())
+        self.assertEqual((funding.count, funding.amount), (completed.count(), self.project.current_amount))
+        by_country = DailyMetric.objects.get(metric='funding', dimension='country=CM', day=timezone.localdate())
+        self.assertEqual((by_country.count, by_country.amount), (funding.count, funding.amount))
+
+
+class RewardReservationTest(PlacementFixtures, TestCase):
+    """Test reward reservations expire, are confirmed and released exactly once."""
+
+    def setUp(self):
+        self.create_fixtures(investors=2)
+
+    def place(self, investor=None):
+        return place_investment(
+            investor or self.investors[0], self.project, Decimal('20000.00'), 'mobile_money', reward=self.reward
+        )
+
+    def stock(self):
+        self.reward.refresh_from_db()
+        return self.reward.quantity_claimed
+
+    def test_expired_reservation_is_given_back(self):
+        """Test an unpaid reservation releases its unit, and is claimed again on late payment."""
+        investment = self.place()
+        later = timezone.now() + timedelta(seconds=settings.REWARD_RESERVATION_TTL + 1)
+        self.assertEqual(expire_reservations(now=timezone.now()), 0)
+        self.assertEqual(expire_reservations(now=later), 1)
+        self.assertEqual(expire_reservations(now=later), 0)
+        self.assertEqual(self.stock(), 0)
+
+        investment.payment_status = 'completed'
+        investment.save()
+        self.assertEqual(RewardReservation.objects.get(investment=investment).status, 'confirmed')
+        self.assertEqual(self.stock(), 1)
+
+    def test_late_payment_after_sell_out_loses_reward(self):
+        """Test a payment completed after expiry and sell out keeps no reward."""
+        investment = self.place()
+        expire_reservations(now=timezone.now() + timedelta(seconds=settings.REWARD_RESERVATION_TTL + 1))
+        InvestmentReward.objects.filter(pk=self.reward.pk).update(quantity_claimed=5)
+
+        investment.payment_status = 'completed'
+        investment.save()
+        self.assertFalse(InvestmentRewardChoice.objects.filter(investment=investment).exists())
+        self.assertEqual(self.stock(), 5)
+
+    def test_refund_releases_once(self):
+        """Test a refunded reward goes back to the stock once."""
+        investment = self.place()
+        investment.payment_status = 'completed'
+        investment.save()
+        self.assertEqual(self.stock(), 1)
+
+        investment.payment_status = 'refunded'
+        investment.save()
+        expire_reservations(now=timezone.now() + timedelta(days=1))
+        self.assertEqual(RewardReservation.objects.get(investment=investment).status, 'released')
+        self.assertEqual(self.stock(), 0)
+
+    def test_rewards_list_counts_backers_in_bulk(self):
+        """Test the rewards endpoint annotates backers instead of counting per reward."""
+        InvestmentReward.objects.create(
+            project=self.project, title='Thank you', description='A postcard', minimum_amount=Decimal('1000.00')
+        )
+        for investor in self.investors:
+            investment = self.place(investor)
+            investment.payment_status = 'completed'
+            investment.save()
+        self.place(self.investors[0])
+
+        with self.assertNumQueries(2):
+            response = APIClient().get(f'/api/projects/{self.project.slug}/rewards/')
+        self.assertEqual(response.status_code, 200)
+        backers = {reward['title']: reward['backers_count'] for reward in response.data}
+        self.assertEqual(backers, {'Thank you': 0, 'Early bird': 2})
+        # Without the annotation, the count is a query of its own
+        self.reward.refresh_from_db()
+        self.assertEqual(self.reward.backers_count, 2)
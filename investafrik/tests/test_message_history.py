@@ -0,0 +1,128 @@
+"""
+Tests for the paginated message history.
+"""
+import json
+
+from asgiref.sync import async_to_sync
+from channels.routing import URLRouter
+from channels.testing import WebsocketCommunicator
+from django.contrib.auth import get_user_model
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from apps.messaging.history import MAX_HISTORY_PAGE_SIZE
+from apps.messaging.models import Conversation, Message
+from apps.messaging.routing import websocket_urlpatterns
+
+User = get_user_model()
+
+
+class HistoryFixtureMixin:
+
+    def create_fixture(self, count):
+        self.investor = self.create_user('investor', 'investisseur')
+        self.owner = self.create_user('owner', 'porteur')
+        self.conversation = Conversation.objects.create(participant_1=self.investor, participant_2=self.owner)
+        Message.objects.bulk_create([
+            Message(conversation=self.conversation, sender=self.investor, content=f'Message {i}')
+            for i in range(count)
+        ])
+        # Many messages sharing a timestamp, ordered by id
+        Message.objects.filter(conversation=self.conversation).update(sent_at=timezone.now())
+        self.expected = [
+            str(pk) for pk in Message.objects.filter(conversation=self.conversation)
+            .order_by('sent_at', 'pk').values_list('pk', flat=True)
+        ]
+
+    def create_user(self, name, user_type):
+        return User.objects.create_user(
+            email=f'{name}@example.com',
+            username=name,
+            password='testpass123',
+            first_name=name.title(),
+            last_name='Test',
+            user_type=user_type,
+            country='SN'
+        )
+
+
+class MessageHistoryTest(HistoryFixtureMixin, TestCase):
+    """Test history pages over the REST API and the conversation page."""
+
+    def setUp(self):
+        self.create_fixture(75)
+        self.client_api = APIClient()
+        self.client_api.force_authenticate(self.owner)
+        self.url = f'/api/messaging/conversations/{self.conversation.pk}/messages/'
+
+    def test_pages_backwards(self):
+        """Test pages go from the latest messages back to the first, without gaps."""
+        pages, url = [], f'{self.url}?page_size=30'
+        while url:
+            response = self.client_api.get(url)
+            self.assertEqual(response.status_code, 200)
+            pages.append([message['id'] for message in response.data['results']])
+            url = response.data['next']
+
+        self.assertEqual([len(page) for page in pages], [30, 30, 15])
+        self.assertEqual([pk for page in reversed(pages) for pk in page], self.expected)
+
+    def test_page_size_is_capped_and_deleted_messages_skipped(self):
+        """Test the page size cap and that deleted messages are left out."""
+        Message.objects.filter(pk=self.expected[-1]).update(is_deleted=True)
+        response = self.client_api.get(self.url, {'page_size': 1000})
+        self.assertEqual(len(response.data['results']), min(74, MAX_HISTORY_PAGE_SIZE))
+        self.assertNotIn(self.expected[-1], [message['id'] for message in response.data['results']])
+
+    def test_invalid_cursor(self):
+        """Test a malformed cursor is a 404."""
+        self.assertEqual(self.client_api.get(self.url, {'cursor': 'nope'}).status_code, 404)
+
+    def test_detail_page_renders_one_page(self):
+        """Test the conversation page renders the latest page and links to older messages."""
+        self.client.force_login(self.owner)
+        url = f'/messaging/conversations/{self.conversation.pk}/'
+        response = self.client.get(url)
+        self.assertEqual([str(m.pk) for m in response.context['messages']], self.expected[-30:])
+        self.assertContains(response, 'Voir les messages plus anciens')
+
+        response = self.client.get(url, {'before': response.context['older_cursor']})
+        self.assertEqual([str(m.pk) for m in response.context['messages']], self.expected[-60:-30])
+
+
+@override_settings(CHANNEL_LAYERS={'default': {'BACKEND': 'channels.layers.InMemoryChannelLayer'}})
+class MessageHistorySocketTest(HistoryFixtureMixin, TransactionTestCase):
+    """Test loading older messages over the chat WebSocket."""
+
+    def setUp(self):
+        self.create_fixture(45)
+
+    def test_load_older(self):
+        """Test load_older frames page through the history."""
+        async def scenario():
+            communicator = WebsocketCommunicator(
+                URLRouter(websocket_urlpatterns), f'/ws/chat/{self.conversation.pk}/'
+            )
+            communicator.scope['user'] = self.owner
+            await communicator.connect()
+            frames, cursor = [], None
+            while True:
+                await communicator.send_to(text_data=json.dumps({
+                    'type': 'load_older', 'cursor': cursor, 'page_size': 20
+                }))
+                frame = json.loads(await communicator.receive_from())
+                frames.append(frame)
+                cursor = frame['cursor']
+                if not cursor:
+                    break
+            await communicator.disconnect()
+            return frames
+
+        frames = async_to_sync(scenario)()
+        self.assertEqual([frame['type'] for frame in frames], ['history'] * 3)
+        self.assertEqual([len(frame['messages']) for frame in frames], [20, 20, 5])
+        self.assertEqual(
+            [message['id'] for frame in reversed(frames) for message in frame['messages']], self.expected
+        )
+        self.assertEqual(frames[0]['messages'][0]['sender']['name'], 'Investor Test')
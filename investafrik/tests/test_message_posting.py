@@ -0,0 +1,78 @@
+"""
+Tests for the message posting service.
+"""
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+from rest_framework.test import APIClient
+
+from apps.messaging.models import Conversation, Message
+from apps.messaging.posting import post_message
+
+User = get_user_model()
+
+
+class MessagePostingTest(TestCase):
+    """Test posting updates the conversation atomically."""
+
+    def setUp(self):
+        self.investor = User.objects.create_user(
+            email='investor@example.com',
+            username='investor',
+            password='testpass123',
+            first_name='Test',
+            last_name='Investor',
+            user_type='investisseur',
+            country='SN'
+        )
+        self.owner = User.objects.create_user(
+            email='owner@example.com',
+            username='owner',
+            password='testpass123',
+            first_name='Project',
+            last_name='Owner',
+            user_type='porteur',
+            country='CM'
+        )
+        self.conversation = Conversation.objects.create(participant_1=self.investor, participant_2=self.owner)
+
+    def test_post_updates_conversation(self):
+        """Test one insert and one update set the preview and the recipient's counter."""
+        # Savepoint, insert, update, release
+        with self.assertNumQueries(4):
+            message = post_message(self.conversation, self.investor, 'Bonjour, le projet est-il ouvert ?')
+        self.conversation.refresh_from_db()
+        self.assertEqual(self.conversation.last_message_at, message.sent_at)
+        self.assertEqual(self.conversation.last_message_preview, 'Bonjour, le projet est-il ouvert ?')
+        self.assertEqual((self.conversation.unread_count_p1, self.conversation.unread_count_p2), (0, 1))
+
+    def test_stale_copies_do_not_lose_increments(self):
+        """Test senders holding stale conversation copies all count."""
+        first = Conversation.objects.get(pk=self.conversation.pk)
+        second = Conversation.objects.get(pk=self.conversation.pk)
+        post_message(first, self.investor, 'Premier')
+        post_message(second, self.investor, 'Second')
+        post_message(second, self.owner, 'Réponse')
+        second.mark_as_read_for_user(self.owner)
+
+        self.conversation.refresh_from_db()
+        self.assertEqual(self.conversation.unread_count_p2, 0)
+        self.assertEqual(self.conversation.unread_count_p1, 1)
+        self.assertEqual(self.conversation.last_message_preview, 'Réponse')
+
+    def test_api_and_page_post_through_the_service(self):
+        """Test the REST action and the conversation page both update the counters."""
+        client = APIClient()
+        client.force_authenticate(self.owner)
+        response = client.post(
+            f'/api/messaging/conversations/{self.conversation.pk}/send_message/', {'content': 'Oui'}, format='json'
+        )
+        self.assertEqual(response.status_code, 201)
+
+        self.client.force_login(self.investor)
+        response = self.client.post(f'/messaging/conversations/{self.conversation.pk}/', {'content': 'Merci'})
+        self.assertEqual(response.status_code, 302)
+
+        self.conversation.refresh_from_db()
+        self.assertEqual(Message.objects.filter(conversation=self.conversation).count(), 2)
+        self.assertEqual((self.conversation.unread_count_p1, self.conversation.unread_count_p2), (1, 1))
+        self.assertEqual(self.conversation.last_message_preview, 'Merci')
@@ -0,0 +1,117 @@
+"""
+Tests for missed-message replay on WebSocket reconnect.
+"""
+import json
+from datetime import timedelta
+from unittest import mock
+
+from asgiref.sync import async_to_sync
+from channels.routing import URLRouter
+from channels.testing import WebsocketCommunicator
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TransactionTestCase, override_settings
+from django.utils import timezone
+
+from apps.messaging.models import Conversation, Message
+from apps.messaging.routing import websocket_urlpatterns
+
+User = get_user_model()
+
+application = URLRouter(websocket_urlpatterns)
+
+
+@override_settings(CHANNEL_LAYERS={'default': {'BACKEND': 'channels.layers.InMemoryChannelLayer'}})
+class MessageReplayTest(TransactionTestCase):
+    """Test reconnecting clients receive only what they missed."""
+
+    def setUp(self):
+        self.investor = self.create_user('investor', 'investisseur')
+        self.owner = self.create_user('owner', 'porteur')
+        self.conversation = Conversation.objects.create(
+            participant_1=self.investor, participant_2=self.owner, unread_count_p2=7
+        )
+        start = timezone.now() - timedelta(hours=1)
+        Message.objects.bulk_create([
+            Message(conversation=self.conversation, sender=self.investor, content=f'Message {i}')
+            for i in range(250)
+        ])
+        self.messages = list(Message.objects.filter(conversation=self.conversation).order_by('pk'))
+        # One message per second, in id order
+        for i, message in enumerate(self.messages):
+            message.sent_at = start + timedelta(seconds=i)
+        Message.objects.bulk_update(self.messages, ['sent_at'])
+        self.ids = [str(message.pk) for message in self.messages]
+
+    def create_user(self, name, user_type):
+        return User.objects.create_user(
+            email=f'{name}@example.com',
+            username=name,
+            password='testpass123',
+            first_name=name.title(),
+            last_name='Test',
+            user_type=user_type,
+            country='SN'
+        )
+
+    def frames_until_unread(self, path, first_frame=None):
+        """Connect to ``path`` and collect the frames up to the unread state."""
+        async def scenario():
+            communicator = WebsocketCommunicator(application, path)
+            communicator.scope['user'] = self.owner
+            await communicator.connect()
+            if first_frame:
+                await communicator.send_to(text_data=json.dumps(first_frame))
+            frames = []
+            while not frames or frames[-1].get('type') not in ('unread', None):
+                frames.append(json.loads(await communicator.receive_from()))
+            await communicator.disconnect()
+            return frames
+
+        return async_to_sync(scenario)()
+
+    @property
+    def path(self):
+        return f'/ws/chat/{self.conversation.pk}/'
+
+    def replayed_ids(self, frames):
+        return [message['id'] for frame in frames if frame['type'] == 'replay' for message in frame['messages']]
+
+    def test_since_on_connect(self):
+        """Test the gap after a message id is replayed in batches, then the unread state."""
+        frames = self.frames_until_unread(f'{self.path}?since={self.ids[9]}')
+        self.assertEqual([len(frame.get('messages', [])) for frame in frames], [100, 100, 40, 0])
+        self.assertEqual(self.replayed_ids(frames), self.ids[10:])
+        self.assertEqual(frames[-1], {'type': 'unread', 'unread_count': 7, 'complete': True})
+
+    def test_sync_frame_with_timestamp(self):
+        """Test a sync frame replays the messages after a timestamp."""
+        since = self.messages[244].sent_at.isoformat()
+        frames = self.frames_until_unread(self.path, {'type': 'sync', 'since': since})
+        self.assertEqual(self.replayed_ids(frames), self.ids[245:])
+
+    def test_cost_follows_the_gap(self):
+        """Test a short gap costs the same few queries whatever the history length."""
+        queries = []
+
+        def record(execute, sql, params, many, context):
+            queries.append(sql)
+            return execute(sql, params, many, context)
+
+        with connection.execute_wrapper(record):
+            frames = self.frames_until_unread(f'{self.path}?since={self.ids[-4]}')
+        self.assertEqual(self.replayed_ids(frames), self.ids[-3:])
+        # Conversation, position of since, one batch, unread count
+        self.assertEqual(len(queries), 4)
+
+    def test_large_gap_is_bounded(self):
+        """Test replay stops at the limit and tells the client to reload."""
+        with mock.patch('apps.messaging.consumers.MAX_REPLAY_MESSAGES', 150):
+            frames = self.frames_until_unread(f'{self.path}?since={self.ids[0]}')
+        self.assertEqual(len(self.replayed_ids(frames)), 200)
+        self.assertFalse(frames[-1]['complete'])
+
+    def test_invalid_since(self):
+        """Test an unknown position is reported."""
+        frames = self.frames_until_unread(self.path, {'type': 'sync', 'since': 'yesterday'})
+        self.assertEqual(frames, [{'error': 'Invalid since'}])
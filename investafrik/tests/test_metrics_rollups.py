@@ -0,0 +1,142 @@
+"""
+Tests for the daily metric rollups and the admin dashboard series.
+"""
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+from decimal import Decimal
+from datetime import date, timedelta
+
+from apps.categories.models import Category
+from apps.investments.models import Investment
+from apps.metrics.models import DailyMetric
+from apps.metrics.rollups import backfill, load_series
+from apps.metrics.tasks import backfill_recent_metrics
+from apps.projects.models import Project
+
+User = get_user_model()
+
+
+class MetricRollupTest(TestCase):
+    """Test buckets follow changes incrementally and match a backfill."""
+
+    def setUp(self):
+        self.today = timezone.localdate()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.owner = User.objects.create_user(
+                email='owner@example.com',
+                username='owner',
+                password='testpass123',
+                first_name='Project',
+                last_name='Owner',
+                user_type='porteur',
+                country='CM'
+            )
+            self.investor = User.objects.create_user(
+                email='investor@example.com',
+                username='investor',
+                password='testpass123',
+                first_name='Test',
+                last_name='Investor',
+                user_type='investisseur',
+                country='SN'
+            )
+            self.category = Category.objects.create(
+                name='Technology', description='Tech projects', icon_class='fas fa-laptop', color_hex='#2196F3'
+            )
+            self.project = Project.objects.create(
+                title='Solar Kiosk',
+                short_description='A test project',
+                full_description='<p>Full description</p>',
+                owner=self.owner,
+                category=self.category,
+                goal_amount=Decimal('1000000.00'),
+                country='CM',
+                start_date=date.today(),
+                end_date=date.today() + timedelta(days=30),
+                status='active'
+            )
+
+    def bucket(self, metric, dimension=''):
+        row = DailyMetric.objects.filter(metric=metric, dimension=dimension, day=self.today).first()
+        return (row.count, row.amount) if row else (0, Decimal('0'))
+
+    def rows(self):
+        return set(
+            DailyMetric.objects.exclude(count=0, amount=0)
+            .values_list('metric', 'dimension', 'day', 'count', 'amount')
+        )
+
+    def set_status(self, investment, status):
+        with self.captureOnCommitCallbacks(execute=True):
+            investment.payment_status = status
+            investment.save()
+
+    def place(self, amount):
+        with self.captureOnCommitCallbacks(execute=True):
+            return Investment.objects.create(
+                investor=self.investor, project=self.project, amount=Decimal(amount), payment_method='mobile_money'
+            )
+
+    def test_incremental_buckets(self):
+        """Test signups, projects and payment transitions move their buckets."""
+        self.assertEqual(self.bucket('signups')[0], 2)
+        self.assertEqual(self.bucket('signups', 'user_type=investisseur')[0], 1)
+        self.assertEqual(self.bucket('projects', f'category={self.category.pk}')[0], 1)
+
+        investment = self.place('50000.00')
+        self.assertEqual(self.bucket('investments', 'status=pending'), (1, Decimal('50000.00')))
+        self.set_status(investment, 'completed')
+        self.assertEqual(self.bucket('investments', 'status=pending'), (0, Decimal('0')))
+        self.assertEqual(self.bucket('funding'), (1, Decimal('50000.00')))
+        self.assertEqual(self.bucket('funding', 'country=CM'), (1, Decimal('50000.00')))
+
+        self.set_status(investment, 'refunded')
+        self.assertEqual(self.bucket('funding'), (0, Decimal('0')))
+        self.assertEqual(self.bucket('investments', 'status=refunded'), (1, Decimal('50000.00')))
+
+    def test_backfill_matches_incremental(self):
+        """Test a backfill rebuilds the buckets the signals maintained."""
+        self.set_status(self.place('50000.00'), 'completed')
+        self.set_status(self.place('20000.00'), 'failed')
+        self.place('10000.00')
+        incremental = self.rows()
+
+        DailyMetric.objects.all().delete()
+        backfill(self.today - timedelta(days=1), self.today)
+        self.assertEqual(self.rows(), incremental)
+
+    def test_nightly_backfill_heals_recent_days(self):
+        """Test the nightly job rebuilds lost buckets of yesterday and today only."""
+        self.set_status(self.place('50000.00'), 'completed')
+        incremental = self.rows()
+        old = DailyMetric.objects.create(metric='signups', dimension='', day=self.today - timedelta(days=2), count=3)
+
+        DailyMetric.objects.filter(day=self.today).delete()
+        backfill_recent_metrics.delay()
+        self.assertEqual(self.rows(), incremental | {(old.metric, old.dimension, old.day, 3, Decimal('0'))})
+
+    def test_series_in_one_query(self):
+        """Test several series over a period are read in one query, with empty days."""
+        self.set_status(self.place('50000.00'), 'completed')
+        with self.assertNumQueries(1):
+            series = load_series([('signups', ''), ('funding', '')], 90)
+        self.assertEqual(len(series['signups', '']), 90)
+        self.assertEqual(series['signups', ''][-1], {
+            'date': self.today.isoformat(), 'count': 2, 'amount': Decimal('0')
+        })
+        self.assertEqual(series['funding', ''][0]['count'], 0)
+        self.assertEqual(series['funding', ''][-1]['amount'], Decimal('50000.00'))
+
+    def test_admin_dashboard_renders_series(self):
+        """Test the admin dashboard renders the requested period."""
+        admin = User.objects.create_superuser(
+            email='admin@example.com', username='admin', password='testpass123',
+            first_name='Admin', last_name='User', user_type='porteur', country='CM'
+        )
+        self.client.force_login(admin)
+        response = self.client.get('/admin/dashboard/', {'period': 90})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['chart_period'], 90)
+        self.assertEqual(len(response.context['user_registrations']), 90)
+        self.assertEqual(response.context['user_registrations'][-1]['count'], 2)
@@ -0,0 +1,150 @@
+"""
+Tests for payment provider callbacks ingestion.
+"""
+import json
+
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+from rest_framework.test import APIClient
+from decimal import Decimal
+from datetime import date, timedelta
+
+from apps.categories.models import Category
+from apps.investments.callbacks import process_callbacks, signature
+from apps.investments.models import Investment, PaymentCallback
+from apps.investments.signals import payment_status_changed
+from apps.projects.models import Project
+
+User = get_user_model()
+
+
+class FakeProvider:
+    """Local mobile money provider sending signed callbacks."""
+    name = 'fakepay'
+    secret = 'fakepay-secret'
+
+    def __init__(self, client):
+        self.client = client
+
+    def notify(self, reference, status, secret=None):
+        body = json.dumps({'reference': reference, 'status': status, 'currency': 'XOF'}).encode()
+        return self.client.generic(
+            'POST', f'/api/investments/callbacks/{self.name}/', body,
+            content_type='application/json',
+            HTTP_X_SIGNATURE=signature(secret or self.secret, body),
+        )
+
+
+class PaymentCallbackTest(TestCase):
+    """Test the callbacks inbox and its batch worker."""
+
+    def setUp(self):
+        self.provider = FakeProvider(APIClient())
+        owner = User.objects.create_user(
+            email='owner@example.com',
+            username='owner',
+            password='testpass123',
+            first_name='Project',
+            last_name='Owner',
+            user_type='porteur',
+            country='CM'
+        )
+        self.investor = User.objects.create_user(
+            email='investor@example.com',
+            username='investor',
+            password='testpass123',
+            first_name='Test',
+            last_name='Investor',
+            user_type='investisseur',
+            country='SN'
+        )
+        category = Category.objects.create(
+            name='Technology',
+            description='Tech projects',
+            icon_class='fas fa-laptop',
+            color_hex='#2196F3'
+        )
+        self.project = Project.objects.create(
+            title='Solar Kiosk',
+            short_description='A test project',
+            full_description='<p>Full description</p>',
+            owner=owner,
+            category=category,
+            goal_amount=Decimal('1000000.00'),
+            country='CM',
+            start_date=date.today(),
+            end_date=date.today() + timedelta(days=30),
+            status='active'
+        )
+        self.investments = [
+            Investment.objects.create(
+                project=self.project,
+                investor=self.investor,
+                amount=Decimal('10000.00'),
+                payment_method='mobile_money',
+                payment_provider='fakepay',
+                payment_reference=f'FP-{i}',
+            )
+            for i in range(5)
+        ]
+
+    def test_retries_are_stored_once(self):
+        """Test duplicate callbacks are accepted but kept once."""
+        for _ in range(3):
+            response = self.provider.notify('FP-0', 'SUCCESSFUL')
+            self.assertEqual(response.status_code, 202)
+        self.assertEqual(PaymentCallback.objects.count(), 1)
+        self.assertEqual(PaymentCallback.objects.get().status, 'completed')
+
+    def test_rejects_bad_callbacks(self):
+        """Test signatures, statuses and providers are checked."""
+        self.assertEqual(self.provider.notify('FP-0', 'SUCCESSFUL', secret='wrong').status_code, 400)
+        self.assertEqual(self.provider.notify('FP-0', 'MAYBE').status_code, 400)
+        self.provider.name = 'otherpay'
+        self.assertEqual(self.provider.notify('FP-0', 'SUCCESSFUL').status_code, 404)
+        self.assertFalse(PaymentCallback.objects.exists())
+
+    def test_worker_applies_transitions_in_batches(self):
+        """Test the worker applies valid transitions in order and ignores the rest."""
+        for i in range(4):
+            self.provider.notify(f'FP-{i}', 'processing')
+            self.provider.notify(f'FP-{i}', 'successful')
+        self.provider.notify('FP-4', 'failed')
+        self.provider.notify('FP-4', 'successful')  # after a final status
+        self.provider.notify('FP-404', 'successful')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            outcomes = process_callbacks(batch_size=3)
+        self.assertEqual(outcomes, {'applied': 9, 'ignored': 1, 'unknown': 1})
+        self.assertFalse(PaymentCallback.objects.filter(processed_at__isnull=True).exists())
+
+        statuses = {i.payment_reference: i.payment_status for i in Investment.objects.all()}
+        self.assertEqual(statuses, {'FP-0': 'completed', 'FP-1': 'completed', 'FP-2': 'completed',
+                                    'FP-3': 'completed', 'FP-4': 'failed'})
+        self.project.refresh_from_db()
+        self.assertEqual(self.project.current_amount, Decimal('40000.00'))
+        self.assertEqual(self.project.investor_count, 1)
+
+        # A late retry changes nothing.
+        self.provider.notify('FP-0', 'successful')
+        self.assertEqual(process_callbacks(), {})
+
+    def test_failing_callback_does_not_abort_the_batch(self):
+        """Test a callback that fails is rolled back alone and recorded as an error."""
+        def fail(investment, **kwargs):
+            if investment.payment_reference == 'FP-1':
+                raise RuntimeError('boom')
+        payment_status_changed.connect(fail)
+        self.addCleanup(payment_status_changed.disconnect, fail)
+
+        for i in range(3):
+            self.provider.notify(f'FP-{i}', 'successful')
+        with self.captureOnCommitCallbacks(execute=True):
+            outcomes = process_callbacks()
+        self.assertEqual(outcomes, {'applied': 2, 'error': 1})
+        self.assertEqual(PaymentCallback.objects.get(reference='FP-1').outcome, 'error')
+
+        statuses = {i.payment_reference: i.payment_status for i in Investment.objects.all()}
+        self.assertEqual([statuses[f'FP-{i}'] for i in range(3)], ['completed', 'pending', 'completed'])
+        self.project.refresh_from_db()
+        self.assertEqual(self.project.current_amount, Decimal('20000.00'))
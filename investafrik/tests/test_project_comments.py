@@ -0,0 +1,124 @@
+"""
+Tests for threaded project comments.
+"""
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+from rest_framework.test import APIClient
+from decimal import Decimal
+from datetime import date, timedelta
+
+from apps.categories.models import Category
+from apps.projects.models import Project, ProjectComment
+from apps.projects.counters import refresh_comments_count
+
+User = get_user_model()
+
+
+class ProjectCommentsTest(TestCase):
+    """Test the comment tree API and the comments counter."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            email='user@example.com',
+            username='user',
+            password='testpass123',
+            first_name='Commenting',
+            last_name='User',
+            user_type='investisseur',
+            country='SN'
+        )
+        category = Category.objects.create(
+            name='Technology',
+            description='Tech projects',
+            icon_class='fas fa-laptop',
+            color_hex='#2196F3'
+        )
+        self.project = Project.objects.create(
+            title='Commented project',
+            short_description='A test project',
+            full_description='<p>Full description</p>',
+            owner=self.user,
+            category=category,
+            goal_amount=Decimal('1000000.00'),
+            country='SN',
+            start_date=date.today(),
+            end_date=date.today() + timedelta(days=60),
+            status='active'
+        )
+        self.url = f'/api/projects/{self.project.slug}/'
+
+    def comment(self, content, parent=None, **kwargs):
+        return ProjectComment.objects.create(
+            project=self.project, user=self.user, parent=parent, content=content, **kwargs
+        )
+
+    def test_path_and_depth(self):
+        """Test replies extend their parent's materialized path."""
+        root = self.comment('Root')
+        reply = self.comment('Reply', parent=root)
+        nested = self.comment('Nested', parent=reply)
+        self.assertEqual(root.path, str(root.pk).zfill(10))
+        self.assertEqual(nested.path, f'{reply.path}/{str(nested.pk).zfill(10)}')
+        self.assertEqual([root.depth, reply.depth, nested.depth], [0, 1, 2])
+
+    def test_tree_is_assembled_in_constant_queries(self):
+        """Test nested threads are returned without per-comment queries."""
+        for i in range(3):
+            root = self.comment(f'Root {i}')
+            reply = self.comment(f'Reply {i}', parent=root)
+            self.comment(f'Nested {i}', parent=reply)
+        self.comment('Hidden', parent=root, is_approved=False)
+
+        # project, count, top-level page, replies
+        with self.assertNumQueries(4):
+            response = self.client.get(f'{self.url}comments/')
+        self.assertEqual(response.status_code, 200)
+        results = response.data['results']
+        self.assertEqual([c['content'] for c in results], ['Root 2', 'Root 1', 'Root 0'])
+        self.assertEqual(results[0]['replies'][0]['content'], 'Reply 2')
+        self.assertEqual(results[0]['replies'][0]['replies'][0]['content'], 'Nested 2')
+        self.assertEqual(len(results[0]['replies']), 1)
+
+    def test_top_level_comments_are_cursor_paginated(self):
+        """Test comment threads are paginated with cursors."""
+        for i in range(5):
+            self.comment(f'Root {i}')
+        response = self.client.get(f'{self.url}comments/', {'page_size': 3})
+        self.assertEqual(len(response.data['results']), 3)
+        response = self.client.get(response.data['next'])
+        self.assertEqual([c['content'] for c in response.data['results']], ['Root 1', 'Root 0'])
+
+    def test_post_comment_and_reply(self):
+        """Test authenticated users can comment and reply."""
+        response = self.client.post(f'{self.url}comment/', {'content': 'Question'})
+        self.assertEqual(response.status_code, 401)
+
+        self.client.force_authenticate(user=self.user)
+        response = self.client.post(f'{self.url}comment/', {'content': 'Question'})
+        self.assertEqual(response.status_code, 201)
+        response = self.client.post(f'{self.url}comment/', {'content': 'Answer', 'parent': response.data['id']})
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['depth'], 1)
+
+    def test_comments_count_is_maintained(self):
+        """Test the counter follows creation, moderation and deletion."""
+        root = self.comment('Root')
+        self.comment('Reply', parent=root)
+        hidden = self.comment('Hidden', is_approved=False)
+        self.project.refresh_from_db()
+        self.assertEqual(self.project.comments_count, 2)
+
+        hidden.is_approved = True
+        hidden.save()
+        self.project.refresh_from_db()
+        self.assertEqual(self.project.comments_count, 3)
+
+        root.delete()
+        self.project.refresh_from_db()
+        self.assertEqual(self.project.comments_count, 1)
+
+        ProjectComment.objects.update(is_approved=False)
+        refresh_comments_count([self.project.pk])
+        self.project.refresh_from_db()
+        self.assertEqual(self.project.comments_count, 0)
@@ -0,0 +1,96 @@
+"""
+Query budget tests for the project detail page.
+"""
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+from decimal import Decimal
+from datetime import date, timedelta
+
+from apps.categories.models import Category
+from apps.projects.models import Project, ProjectComment, ProjectUpdate
+
+User = get_user_model()
+
+# Project with owner/category, updates, comments with users, similar projects.
+DETAIL_QUERY_BUDGET = 4
+
+
+class ProjectDetailQueriesTest(TestCase):
+    """The detail page must render in a fixed number of queries."""
+
+    def setUp(self):
+        self.owner = User.objects.create_user(
+            email='owner@example.com',
+            username='owner',
+            password='testpass123',
+            first_name='Project',
+            last_name='Owner',
+            user_type='porteur',
+            country='CM'
+        )
+        self.category = Category.objects.create(
+            name='Technology',
+            description='Tech projects',
+            icon_class='fas fa-laptop',
+            color_hex='#2196F3'
+        )
+        self.project = self.create_project('Main project')
+        self.create_project('Other project')
+
+    def create_project(self, title):
+        return Project.objects.create(
+            title=title,
+            short_description='A test project',
+            full_description='<p>Full description</p>',
+            owner=self.owner,
+            category=self.category,
+            goal_amount=Decimal('1000000.00'),
+            country='CM',
+            start_date=date.today(),
+            end_date=date.today() + timedelta(days=60),
+            status='active'
+        )
+
+    def add_activity(self, count):
+        start = ProjectComment.objects.count()
+        for i in range(start, start + count):
+            user = User.objects.create_user(
+                email=f'user{i}@example.com',
+                username=f'user{i}',
+                password='testpass123',
+                first_name='User',
+                last_name=str(i),
+                user_type='investisseur',
+                country='SN'
+            )
+            ProjectUpdate.objects.create(project=self.project, title=f'Update {i}', content='<p>News</p>')
+            comment = ProjectComment.objects.create(project=self.project, user=user, content=f'Question {i}')
+            ProjectComment.objects.create(project=self.project, user=self.owner, parent=comment, content=f'Answer {i}')
+
+    def get_detail(self):
+        with self.assertNumQueries(DETAIL_QUERY_BUDGET):
+            response = self.client.get(f'/projects/{self.project.slug}/')
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def test_query_budget_does_not_grow_with_activity(self):
+        """Test the page costs the same with 1 or 10 updates and comment threads."""
+        self.add_activity(1)
+        self.get_detail()
+        self.add_activity(9)
+        response = self.get_detail()
+        self.assertEqual(len(response.context['comments']), 10)
+        self.assertContains(response, 'Answer 9')
+
+    def test_comment_threads(self):
+        """Test replies are grouped under their thread and hidden comments are skipped."""
+        self.add_activity(2)
+        hidden = ProjectComment.objects.create(
+            project=self.project, user=self.owner, content='Hidden', is_approved=False
+        )
+        ProjectComment.objects.create(project=self.project, user=self.owner, parent=hidden, content='Orphan')
+        response = self.get_detail()
+        comments = response.context['comments']
+        self.assertEqual([c.content for c in comments], ['Question 0', 'Question 1'])
+        self.assertEqual([r.content for r in comments[0].thread], ['Answer 0'])
+        self.assertEqual(response.context['project'].owner_projects_count, 2)
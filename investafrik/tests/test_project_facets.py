@@ -0,0 +1,93 @@
+"""
+Tests for the project facet counts endpoint.
+"""
+from django.test import TestCase, override_settings
+from django.contrib.auth import get_user_model
+from rest_framework.test import APIClient
+from decimal import Decimal
+from datetime import date, timedelta
+
+from apps.categories.models import Category
+from apps.projects.models import Project
+
+User = get_user_model()
+
+LOCMEM_CACHE = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'facets-tests',
+    }
+}
+
+
+class ProjectFacetsTest(TestCase):
+    """Test facet counts, their cache and its invalidation."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.owner = User.objects.create_user(
+            email='owner@example.com',
+            username='owner',
+            password='testpass123',
+            first_name='Project',
+            last_name='Owner',
+            user_type='porteur',
+            country='CM'
+        )
+        self.tech = Category.objects.create(
+            name='Technology', description='Tech projects', icon_class='fas fa-laptop', color_hex='#2196F3'
+        )
+        self.farming = Category.objects.create(
+            name='Agriculture', description='Farming', icon_class='fas fa-leaf', color_hex='#4CAF50'
+        )
+        self.create_project('Solar water pumps', self.tech, 'CM', 'active')
+        self.create_project('Mobile clinic app', self.tech, 'SN', 'active')
+        self.create_project('Poultry farm', self.farming, 'CM', 'active')
+        self.draft = self.create_project('Cassava mill', self.farming, 'CM', 'draft')
+
+    def create_project(self, title, category, country, status):
+        return Project.objects.create(
+            title=title,
+            short_description='A test project',
+            full_description='<p>Full description</p>',
+            owner=self.owner,
+            category=category,
+            goal_amount=Decimal('1000000.00'),
+            country=country,
+            start_date=date.today(),
+            end_date=date.today() + timedelta(days=30),
+            status=status
+        )
+
+    def counts(self, facets, facet, key):
+        return {entry[key]: entry['count'] for entry in facets[facet]}
+
+    def test_counts_in_one_query(self):
+        """Test each facet ignores its own filter but applies the others."""
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/projects/facets/', {'status': 'active', 'country': 'cm'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            self.counts(response.data, 'category', 'slug'), {self.tech.slug: 1, self.farming.slug: 1}
+        )
+        self.assertEqual(self.counts(response.data, 'country', 'code'), {'CM': 2, 'SN': 1})
+        self.assertEqual(self.counts(response.data, 'status', 'value'), {'active': 2, 'draft': 1})
+
+    def test_counts_follow_search(self):
+        """Test counts are restricted to the search results."""
+        response = self.client.get('/api/projects/facets/', {'search': 'poultry'})
+        self.assertEqual(self.counts(response.data, 'category', 'slug'), {self.farming.slug: 1})
+
+    @override_settings(CACHES=LOCMEM_CACHE)
+    def test_cache_is_invalidated_by_status_changes(self):
+        """Test equivalent parameters share a cache entry until a status changes."""
+        self.client.get('/api/projects/facets/', {'status': 'active', 'country': 'CM'})
+        with self.assertNumQueries(0):
+            response = self.client.get('/api/projects/facets/', {'country': ' cm ', 'status': 'ACTIVE'})
+        self.assertEqual(self.counts(response.data, 'country', 'code'), {'CM': 2, 'SN': 1})
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.draft.status = 'active'
+            self.draft.save()
+        response = self.client.get('/api/projects/facets/', {'status': 'active', 'country': 'CM'})
+        self.assertEqual(self.counts(response.data, 'country', 'code'), {'CM': 3, 'SN': 1})
@@ -0,0 +1,96 @@
+"""
+Query count tests for project list endpoints.
+"""
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+from rest_framework.test import APIClient
+from decimal import Decimal
+from datetime import date, timedelta
+
+from apps.categories.models import Category
+from apps.projects.models import Project
+from apps.investments.models import Investment
+
+User = get_user_model()
+
+
+class ProjectListQueriesTest(TestCase):
+    """List endpoints must run in a constant number of queries."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.investor = User.objects.create_user(
+            email='investor@example.com',
+            username='investor',
+            password='testpass123',
+            first_name='Investor',
+            last_name='User',
+            user_type='investisseur',
+            country='SN'
+        )
+        self.categories = [
+            Category.objects.create(
+                name=f'Category {i}',
+                description='Projects',
+                icon_class='fas fa-laptop',
+                color_hex='#2196F3'
+            )
+            for i in range(3)
+        ]
+
+    def create_projects(self, count):
+        start = Project.objects.count()
+        for i in range(start, start + count):
+            owner = User.objects.create_user(
+                email=f'owner{i}@example.com',
+                username=f'owner{i}',
+                password='testpass123',
+                first_name='Owner',
+                last_name=str(i),
+                user_type='porteur',
+                country='CM'
+            )
+            project = Project.objects.create(
+                title=f'Project {i}',
+                short_description='A test project',
+                full_description='<p>Full description</p>',
+                owner=owner,
+                category=self.categories[i % len(self.categories)],
+                goal_amount=Decimal('1000000.00'),
+                country='CM',
+                start_date=date.today(),
+                end_date=date.today() + timedelta(days=60),
+                status='active'
+            )
+            Investment.objects.create(
+                investor=self.investor,
+                project=project,
+                amount=Decimal('10000.00'),
+                payment_method='mobile_money',
+                payment_status='completed'
+            )
+
+    def test_api_list_query_count_is_constant(self):
+        """Test /api/projects/ costs the same for 2 or 12 projects."""
+        # ETag fingerprint, count, page, categories prefetch
+        self.create_projects(2)
+        with self.assertNumQueries(4):
+            response = self.client.get('/api/projects/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['results'][0]['investor_count'], 1)
+
+        self.create_projects(10)
+        with self.assertNumQueries(4):
+            response = self.client.get('/api/projects/')
+        self.assertEqual(len(response.data['results']), 12)
+        self.assertEqual(response.data['results'][0]['category']['project_count'], 4)
+
+    def test_category_projects_query_count_is_constant(self):
+        """Test /api/categories/<slug>/projects/ does not grow with its projects."""
+        self.create_projects(12)
+        self.client.force_authenticate(self.investor)
+        # category with stats, projects (the category is reused, not prefetched)
+        with self.assertNumQueries(2):
+            response = self.client.get(f'/api/categories/{self.categories[0].slug}/projects/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['count'], 4)
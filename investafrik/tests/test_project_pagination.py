@@ -0,0 +1,136 @@
+"""
+Tests for keyset pagination of project listings.
+"""
+from django.test import TestCase, override_settings
+from django.contrib.auth import get_user_model
+from rest_framework.test import APIClient
+from decimal import Decimal
+from datetime import date, timedelta
+
+from apps.categories.models import Category
+from apps.projects.models import Project
+
+User = get_user_model()
+
+LOCMEM_CACHE = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'pagination-tests',
+    }
+}
+
+
+class ProjectPaginationTest(TestCase):
+    """Test cursor pagination of the project API and list page."""
+
+    def setUp(self):
+        self.client = APIClient()
+        owner = User.objects.create_user(
+            email='owner@example.com',
+            username='owner',
+            password='testpass123',
+            first_name='Project',
+            last_name='Owner',
+            user_type='porteur',
+            country='CM'
+        )
+        category = Category.objects.create(
+            name='Technology',
+            description='Tech projects',
+            icon_class='fas fa-laptop',
+            color_hex='#2196F3'
+        )
+        # Several projects share the same goal to exercise the id tie-breaker.
+        self.projects = [
+            Project.objects.create(
+                title=f'Project {i}',
+                short_description='A test project',
+                full_description='<p>Full description</p>',
+                owner=owner,
+                category=category,
+                goal_amount=Decimal(1000000 * (i % 3 + 1)),
+                country='CM',
+                start_date=date.today(),
+                end_date=date.today() + timedelta(days=30 + i),
+                status='active'
+            )
+            for i in range(7)
+        ]
+
+    def walk(self, params):
+        """Follow next links and return the slugs of every page."""
+        pages = []
+        response = self.client.get('/api/projects/', params)
+        while True:
+            self.assertEqual(response.status_code, 200)
+            pages.append([item['slug'] for item in response.data['results']])
+            if not response.data['next']:
+                return pages
+            response = self.client.get(response.data['next'])
+
+    def test_pages_cover_every_project_once(self):
+        """Test walking all pages yields each project once, in order."""
+        for ordering in ['-created_at', 'goal_amount', '-goal_amount', 'end_date', '-current_amount']:
+            pages = self.walk({'ordering': ordering, 'page_size': 3})
+            slugs = [slug for page in pages for slug in page]
+            tie_breaker = '-pk' if ordering.startswith('-') else 'pk'
+            expected = list(
+                Project.objects.order_by(ordering, tie_breaker).values_list('slug', flat=True)
+            )
+            self.assertEqual([len(page) for page in pages], [3, 3, 1])
+            self.assertEqual(slugs, expected, ordering)
+
+    def test_previous_link_returns_the_previous_page(self):
+        """Test the previous cursor walks back to the same page."""
+        first = self.client.get('/api/projects/', {'page_size': 3})
+        self.assertIsNone(first.data['previous'])
+        second = self.client.get(first.data['next'])
+        back = self.client.get(second.data['previous'])
+        self.assertEqual(back.data['results'], first.data['results'])
+        self.assertIsNone(back.data['previous'])
+
+    def test_invalid_cursor(self):
+        """Test a malformed cursor is a 404."""
+        response = self.client.get('/api/projects/', {'cursor': 'not-a-cursor'})
+        self.assertEqual(response.status_code, 404)
+
+    @override_settings(CACHES=LOCMEM_CACHE)
+    def test_count_is_cached_unless_exact_is_requested(self):
+        """Test totals come from the cache unless ?exact_count=1."""
+        response = self.client.get('/api/projects/')
+        self.assertEqual(response.data['count'], 7)
+
+        self.projects[0].delete()
+        response = self.client.get('/api/projects/')
+        self.assertEqual(response.data['count'], 7)
+        self.assertFalse(response.data['count_is_exact'])
+
+        response = self.client.get('/api/projects/', {'exact_count': 1})
+        self.assertEqual(response.data['count'], 6)
+        self.assertTrue(response.data['count_is_exact'])
+
+    def test_list_page_uses_cursor_links(self):
+        """Test the HTML list is paginated with cursors."""
+        for i in range(7, 14):
+            Project.objects.create(
+                title=f'Project {i}',
+                short_description='A test project',
+                full_description='<p>Full description</p>',
+                owner=self.projects[0].owner,
+                category=self.projects[0].category,
+                goal_amount=Decimal('1000000.00'),
+                country='CM',
+                start_date=date.today(),
+                end_date=date.today() + timedelta(days=60),
+                status='active'
+            )
+        response = self.client.get('/projects/')
+        self.assertEqual(response.status_code, 200)
+        page = response.context['projects']
+        self.assertEqual(len(page), 12)
+        self.assertIn('cursor=', response.context['next_query'])
+
+        response = self.client.get(f"/projects/?{response.context['next_query']}")
+        self.assertEqual(len(response.context['projects']), 2)
+        self.assertFalse(response.context['projects'].has_next)
+        self.assertEqual(response.context['total_projects'], 14)
@@ -0,0 +1,110 @@
+"""
+Tests for the project full-text search index.
+"""
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from rest_framework.test import APIClient
+from decimal import Decimal
+from datetime import date, timedelta
+from io import StringIO
+from unittest import mock
+
+from apps.categories.models import Category
+from apps.projects.models import Project
+from apps.projects.search import SEARCH_TABLE, SQLiteSearchBackend, fold, get_search_backend
+
+User = get_user_model()
+
+
+class ProjectSearchTest(TestCase):
+    """Test indexing and searching projects through the API."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.owner = User.objects.create_user(
+            email='owner@example.com',
+            username='owner',
+            password='testpass123',
+            first_name='Aïssatou',
+            last_name='Ndiaye',
+            user_type='porteur',
+            country='SN'
+        )
+        self.category = Category.objects.create(
+            name='Énergie',
+            description='Energy projects',
+            icon_class='fas fa-solar-panel',
+            color_hex='#FFEB3B'
+        )
+        self.solar = self.create_project('Énergie solaire pour Thiès', 'Panneaux pour les écoles')
+        self.farm = self.create_project('Ferme avicole', 'Une ferme alimentée en énergie solaire')
+
+    def create_project(self, title, short_description):
+        return Project.objects.create(
+            title=title,
+            short_description=short_description,
+            full_description='<p>Full description</p>',
+            owner=self.owner,
+            category=self.category,
+            goal_amount=Decimal('1000000.00'),
+            country='SN',
+            start_date=date.today(),
+            end_date=date.today() + timedelta(days=60),
+            status='active'
+        )
+
+    def search(self, query):
+        response = self.client.get('/api/projects/', {'search': query})
+        self.assertEqual(response.status_code, 200)
+        return [item['slug'] for item in response.data['results']]
+
+    def test_fold(self):
+        """Test accent folding."""
+        self.assertEqual(fold('Énergie Thiès'), 'energie thies')
+
+    def test_accent_insensitive_prefix_search_ranked_by_field(self):
+        """Test accents are folded, prefixes match and title hits rank first."""
+        self.assertEqual(self.search('energie sol'), [self.solar.slug, self.farm.slug])
+        self.assertEqual(self.search('THIES'), [self.solar.slug])
+
+    def test_owner_name_is_searchable(self):
+        """Test projects are found by their owner's name."""
+        self.assertEqual(len(self.search('aissatou')), 2)
+
+    def test_index_follows_saves_and_deletes(self):
+        """Test the index is updated on save and delete."""
+        self.farm.title = 'Ferme piscicole'
+        self.farm.save()
+        self.assertEqual(self.search('piscicole'), [self.farm.slug])
+        self.assertEqual(self.search('avicole'), [])
+
+        self.farm.delete()
+        self.assertEqual(self.search('ferme'), [])
+
+    def test_explicit_ordering_wins_over_rank(self):
+        """Test ?ordering= overrides relevance ordering."""
+        response = self.client.get('/api/projects/', {'search': 'solaire', 'ordering': '-created_at'})
+        self.assertEqual(
+            [item['slug'] for item in response.data['results']],
+            [self.farm.slug, self.solar.slug]
+        )
+
+    def test_rebuild_command(self):
+        """Test the index can be rebuilt from scratch."""
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {SEARCH_TABLE}')
+        self.assertEqual(self.search('ferme'), [])
+
+        out = StringIO()
+        call_command('rebuild_search_index', stdout=out)
+        self.assertIn('2 project(s) indexed', out.getvalue())
+        self.assertEqual(self.search('ferme'), [self.farm.slug])
+
+    def test_failed_rebuild_keeps_the_index(self):
+        """Test a rebuild that fails halfway leaves the previous index in place."""
+        with mock.patch.object(SQLiteSearchBackend, 'index_projects', side_effect=[None, RuntimeError]):
+            with self.assertRaises(RuntimeError):
+                get_search_backend().rebuild(Project.objects.order_by('pk'), batch_size=1)
+        self.assertEqual(self.search('ferme'), [self.farm.slug])
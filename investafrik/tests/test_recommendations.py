@@ -0,0 +1,153 @@
+"""
+Tests for precomputed similar projects.
+"""
+from django.test import TestCase, override_settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from decimal import Decimal
+from datetime import date, timedelta
+from io import StringIO
+from unittest import mock
+
+from apps.categories.models import Category
+from apps.projects.models import Project, SimilarProject
+from apps.projects.recommendations import (
+    INDEX_LOCK_KEY, IndexLocked, SimilarityIndex, index_lock, rebuild_recommendations, tokenize,
+    update_recommendations,
+)
+
+User = get_user_model()
+
+LOCMEM_CACHE = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'recommendations-tests',
+    }
+}
+
+
+@override_settings(PROJECT_RECOMMENDATIONS_TOP_K=2)
+class RecommendationsTest(TestCase):
+    """Test scoring, storage and incremental updates of similar projects."""
+
+    def setUp(self):
+        self.owner = User.objects.create_user(
+            email='owner@example.com',
+            username='owner',
+            password='testpass123',
+            first_name='Project',
+            last_name='Owner',
+            user_type='porteur',
+            country='SN'
+        )
+        self.energy = Category.objects.create(
+            name='Énergie', description='Energy', icon_class='fas fa-sun', color_hex='#FFEB3B'
+        )
+        self.farming = Category.objects.create(
+            name='Agriculture', description='Farming', icon_class='fas fa-leaf', color_hex='#4CAF50'
+        )
+        self.solar = self.create_project('Panneaux solaires à Thiès', 'Énergie solaire pour les écoles', self.energy)
+        self.solar_bis = self.create_project('Kits solaires', 'Énergie solaire pour les villages', self.energy)
+        self.farm = self.create_project('Ferme avicole', 'Élevage de poulets', self.farming)
+
+    def create_project(self, title, short_description, category, status='active', country='SN'):
+        with self.captureOnCommitCallbacks(execute=True):
+            return Project.objects.create(
+                title=title,
+                short_description=short_description,
+                full_description='<p>Full description</p>',
+                owner=self.owner,
+                category=category,
+                goal_amount=Decimal('1000000.00'),
+                country=country,
+                start_date=date.today(),
+                end_date=date.today() + timedelta(days=60),
+                status=status
+            )
+
+    def similar(self, project):
+        return list(
+            SimilarProject.objects.filter(project=project).order_by('rank').values_list('similar__slug', flat=True)
+        )
+
+    def test_tokenize(self):
+        """Test words are folded and stopwords dropped."""
+        self.assertEqual(tokenize('Énergie solaire pour les écoles 2024'), ['energie', 'solaire', 'ecoles'])
+
+    def test_cosine_scores(self):
+        """Test vectors are normalized and shared words weigh more than shared features."""
+        index = SimilarityIndex.from_queryset(Project.objects.all())
+        scores = index.scores(self.solar.pk)
+        self.assertGreater(scores[self.solar_bis.pk], scores[self.farm.pk])
+        self.assertAlmostEqual(sum(w * w for w in index.vectors[self.farm.pk].values()), 1.0)
+
+    def test_created_projects_update_neighbours(self):
+        """Test lists are maintained as projects are created."""
+        self.assertEqual(self.similar(self.solar), [self.solar_bis.slug, self.farm.slug])
+        lamps = self.create_project('Lampes solaires', 'Énergie solaire pour les foyers', self.energy)
+        # The farm only shares its country with the others: any two of them tie.
+        self.assertEqual(len(self.similar(self.farm)), 2)
+        self.assertEqual(set(self.similar(self.solar)), {self.solar_bis.slug, lamps.slug})
+
+    def test_deactivated_projects_leave_lists(self):
+        """Test a project leaving the active status disappears from every list."""
+        self.solar_bis.status = 'successful'
+        with self.captureOnCommitCallbacks(execute=True):
+            self.solar_bis.save()
+        self.assertEqual(self.similar(self.solar_bis), [])
+        self.assertFalse(SimilarProject.objects.filter(similar=self.solar_bis).exists())
+        self.assertEqual(self.similar(self.solar), [self.farm.slug])
+
+    def test_rebuild_command_and_detail_page(self):
+        """Test the batch rebuild and the single lookup on the detail page."""
+        SimilarProject.objects.all().delete()
+        out = StringIO()
+        call_command('rebuild_recommendations', stdout=out)
+        self.assertIn('3 project(s) processed', out.getvalue())
+        self.assertEqual(SimilarProject.objects.count(), 6)
+
+        response = self.client.get(f'/projects/{self.solar.slug}/')
+        self.assertEqual(
+            [p.slug for p in response.context['similar_projects']],
+            [self.solar_bis.slug, self.farm.slug]
+        )
+
+    @override_settings(CACHES=LOCMEM_CACHE)
+    def test_updates_use_the_cached_index(self):
+        """Test an update scores the new project against the cached vectors only."""
+        cache.clear()
+        rebuild_recommendations()
+        with CaptureQueriesContext(connection) as queries:
+            lamps = self.create_project('Lampes solaires', 'Énergie solaire pour les foyers', self.energy)
+        project_reads = [
+            q['sql'] for q in queries
+            if q['sql'].startswith('SELECT') and 'FROM "projects_similarproject"' not in q['sql']
+            and '"projects_project"."status" = ' in q['sql']
+        ]
+        # Only the created project is loaded, not every active project
+        self.assertEqual(len(project_reads), 1)
+        self.assertIn('"projects_project"."id" IN', project_reads[0])
+        self.assertEqual(set(self.similar(self.solar)), {self.solar_bis.slug, lamps.slug})
+        self.assertIn(lamps.pk, cache.get('recommendations:index'))
+
+    @override_settings(CACHES=LOCMEM_CACHE)
+    def test_index_writers_are_serialized(self):
+        """Test updates wait for the index lock instead of overwriting another writer."""
+        cache.clear()
+        rebuild_recommendations()
+        with index_lock():
+            with self.assertRaises(IndexLocked):
+                with index_lock(wait=0):
+                    pass
+        self.assertIsNone(cache.get(INDEX_LOCK_KEY))
+
+        cache.add(INDEX_LOCK_KEY, 'other writer')
+        with mock.patch('apps.projects.recommendations.INDEX_LOCK_WAIT', 0):
+            with self.assertRaises(IndexLocked):
+                update_recommendations([self.farm.pk])
+        cache.delete(INDEX_LOCK_KEY)
+        update_recommendations([self.farm.pk])
+        self.assertEqual(len(self.similar(self.farm)), 2)
@@ -0,0 +1,147 @@
+"""
+Tests for the trending projects ranking.
+"""
+from django.test import TestCase, override_settings
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+from rest_framework.test import APIClient
+from decimal import Decimal
+from datetime import date, timedelta
+
+from apps.categories.models import Category
+from apps.investments.models import Investment
+from apps.projects.models import Project, ProjectTrend
+from apps.projects.trending import refresh_trends
+
+User = get_user_model()
+
+LOCMEM_CACHE = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'trending-tests',
+    }
+}
+
+
+class TrendingTest(TestCase):
+    """Test rolling windows, decay and trending ordering."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.owner = User.objects.create_user(
+            email='owner@example.com',
+            username='owner',
+            password='testpass123',
+            first_name='Project',
+            last_name='Owner',
+            user_type='porteur',
+            country='CM'
+        )
+        self.investor = User.objects.create_user(
+            email='investor@example.com',
+            username='investor',
+            password='testpass123',
+            first_name='Test',
+            last_name='Investor',
+            user_type='investisseur',
+            country='SN'
+        )
+        self.category = Category.objects.create(
+            name='Technology',
+            description='Tech projects',
+            icon_class='fas fa-laptop',
+            color_hex='#2196F3'
+        )
+        self.projects = [
+            Project.objects.create(
+                title=f'Project {i}',
+                short_description='A test project',
+                full_description='<p>Full description</p>',
+                owner=self.owner,
+                category=self.category,
+                goal_amount=Decimal('1000000.00'),
+                country='CM',
+                start_date=date.today(),
+                end_date=date.today() + timedelta(days=30),
+                status='active'
+            )
+            for i in range(4)
+        ]
+
+    def invest(self, project, amount, status='completed'):
+        with self.captureOnCommitCallbacks(execute=True):
+            return Investment.objects.create(
+                project=project,
+                investor=self.investor,
+                amount=Decimal(amount),
+                payment_method='mobile_money',
+                payment_status=status
+            )
+
+    def trend(self, project):
+        return ProjectTrend.objects.get(project=project)
+
+    def test_payments_move_the_windows(self):
+        """Test completed payments count once per backer and refunds go back."""
+        self.invest(self.projects[0], '100000.00')
+        second = self.invest(self.projects[0], '50000.00')
+        trend = self.trend(self.projects[0])
+        self.assertEqual(trend.amount_24h, Decimal('150000.00'))
+        self.assertEqual(trend.amount_7d, Decimal('150000.00'))
+        self.assertEqual((trend.backers_24h, trend.backers_7d), (1, 1))
+        self.assertGreater(trend.score, 0)
+
+        second.payment_status = 'refunded'
+        with self.captureOnCommitCallbacks(execute=True):
+            second.save()
+        trend = self.trend(self.projects[0])
+        self.assertEqual(trend.amount_7d, Decimal('100000.00'))
+        self.assertEqual(trend.backers_7d, 1)
+
+    def test_refresh_decays_old_funding(self):
+        """Test the refresh job matches the incremental rows, then decays them."""
+        self.invest(self.projects[0], '100000.00')
+        incremental = self.trend(self.projects[0])
+        self.assertEqual(refresh_trends(), 0)
+
+        refresh_trends(now=timezone.now() + timedelta(days=2))
+        trend = self.trend(self.projects[0])
+        self.assertEqual(trend.amount_24h, Decimal('0'))
+        self.assertEqual(trend.amount_7d, incremental.amount_7d)
+        self.assertLess(trend.score, incremental.score)
+
+        refresh_trends(now=timezone.now() + timedelta(days=8))
+        self.assertEqual(self.trend(self.projects[0]).score, 0)
+
+    def test_ordering_trending(self):
+        """Test ?ordering=trending pages through projects by score."""
+        self.invest(self.projects[2], '300000.00')
+        self.invest(self.projects[1], '100000.00')
+        response = self.client.get('/api/projects/', {'ordering': 'trending', 'page_size': 2})
+        self.assertEqual(response.status_code, 200)
+        slugs = [item['slug'] for item in response.data['results']]
+        self.assertEqual(slugs, [self.projects[2].slug, self.projects[1].slug])
+
+        response = self.client.get(response.data['next'])
+        self.assertEqual(
+            {item['slug'] for item in response.data['results']},
+            {self.projects[0].slug, self.projects[3].slug},
+        )
+        self.assertIsNone(response.data['next'])
+
+    @override_settings(CACHES=LOCMEM_CACHE)
+    def test_trending_feed_is_cached(self):
+        """Test the feed is served from the cache until the next refresh."""
+        self.invest(self.projects[3], '200000.00')
+        response = self.client.get('/api/projects/trending/', {'limit': 2})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['results'][0]['slug'], self.projects[3].slug)
+        self.assertEqual(len(response.data['results']), 2)
+
+        self.invest(self.projects[1], '900000.00')
+        response = self.client.get('/api/projects/trending/')
+        self.assertEqual(response.data['results'][0]['slug'], self.projects[3].slug)
+
+        refresh_trends()
+        response = self.client.get('/api/projects/trending/')
+        self.assertEqual(response.data['results'][0]['slug'], self.projects[1].slug)
@@ -0,0 +1,102 @@
+"""
+Tests for the buffered project views counter.
+"""
+from django.test import TestCase, RequestFactory, override_settings
+from django.contrib.auth import get_user_model
+from decimal import Decimal
+from datetime import date, timedelta
+
+from apps.categories.models import Category
+from apps.projects.models import Project
+from apps.projects.view_counter import ViewCounter
+
+User = get_user_model()
+
+LOCMEM_CACHE = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'view-counter-tests',
+    }
+}
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class ViewCounterTest(TestCase):
+    """Test buffering, deduplication and batched flushing of views."""
+
+    def setUp(self):
+        owner = User.objects.create_user(
+            email='owner@example.com',
+            username='owner',
+            password='testpass123',
+            first_name='Project',
+            last_name='Owner',
+            user_type='porteur',
+            country='CM'
+        )
+        category = Category.objects.create(
+            name='Technology',
+            description='Tech projects',
+            icon_class='fas fa-laptop',
+            color_hex='#2196F3'
+        )
+        self.projects = [
+            Project.objects.create(
+                title=f'Project {i}',
+                short_description='A test project',
+                full_description='<p>Full description</p>',
+                owner=owner,
+                category=category,
+                goal_amount=Decimal('1000000.00'),
+                country='CM',
+                start_date=date.today(),
+                end_date=date.today() + timedelta(days=60),
+                status='active'
+            )
+            for i in range(3)
+        ]
+        self.counter = ViewCounter()
+        self.factory = RequestFactory()
+
+    def request_from(self, ip):
+        return self.factory.get('/projects/x/', REMOTE_ADDR=ip)
+
+    def test_flush_applies_all_increments_in_one_update(self):
+        """Test buffered views are written with a single UPDATE."""
+        for i, project in enumerate(self.projects):
+            for _ in range(i + 1):
+                self.counter.record_view(project.pk)
+
+        self.assertEqual(self.counter.metrics()['pending_views'], 6)
+        with self.assertNumQueries(1):
+            self.assertEqual(self.counter.flush(), 6)
+
+        counts = [Project.objects.get(pk=p.pk).views_count for p in self.projects]
+        self.assertEqual(counts, [1, 2, 3])
+        metrics = self.counter.metrics()
+        self.assertEqual(metrics['pending_views'], 0)
+        self.assertEqual(metrics['flushed'], 6)
+        self.assertIsNotNone(metrics['last_flush_lag'])
+
+    def test_refreshes_are_deduplicated_per_visitor(self):
+        """Test the same visitor only counts once within the window."""
+        project = self.projects[0]
+        self.assertTrue(self.counter.record_view(project.pk, self.request_from('10.0.0.1')))
+        self.assertFalse(self.counter.record_view(project.pk, self.request_from('10.0.0.1')))
+        self.assertTrue(self.counter.record_view(project.pk, self.request_from('10.0.0.2')))
+        # A forged X-Forwarded-For does not make a new visitor
+        spoofed = self.factory.get('/projects/x/', REMOTE_ADDR='10.0.0.1', HTTP_X_FORWARDED_FOR='192.0.2.7')
+        self.assertFalse(self.counter.record_view(project.pk, spoofed))
+
+        self.counter.flush()
+        project.refresh_from_db()
+        self.assertEqual(project.views_count, 2)
+        self.assertEqual(self.counter.metrics()['deduplicated'], 2)
+
+    @override_settings(PROJECT_VIEWS_MAX_PENDING=1)
+    def test_full_buffer_drops_increments(self):
+        """Test increments for new projects are dropped when the buffer is full."""
+        self.counter.record_view(self.projects[0].pk)
+        self.assertFalse(self.counter.record_view(self.projects[1].pk))
+        self.assertTrue(self.counter.record_view(self.projects[0].pk))
+        self.assertEqual(self.counter.metrics()['dropped'], 1)